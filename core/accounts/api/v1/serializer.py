@@ -4,6 +4,10 @@ from django.contrib.auth.password_validation import validate_password
 from django.core import exceptions
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth import authenticate
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer, TokenVerifySerializer
+from rest_framework_simplejwt.tokens import RefreshToken, UntypedToken
+from ...revocation import is_token_revoked, revoke_token
 
 
 # ======================================================================================================================
@@ -265,3 +269,42 @@ class CustomActivationResendSerializer(serializers.Serializer):
 
 
 # ======================================================================================================================
+
+
+# ======================================================================================================================
+# CustomTokenVerifySerializer: Verifies a JWT locally (signature, expiry, revocation)
+class CustomTokenVerifySerializer(TokenVerifySerializer):
+    """
+    Checks the token without a password hash or a query: TokenViewBase answers 401 on TokenError.
+    """
+
+    def validate(self, attrs):
+        token = UntypedToken(attrs["token"])  # Checks the signature and the expiry
+        if is_token_revoked(token):
+            raise TokenError(_("Token is revoked"))
+        return {}
+
+
+# ======================================================================================================================
+# CustomTokenRefreshSerializer: Refuses to refresh revoked refresh tokens
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        if is_token_revoked(RefreshToken(attrs["refresh"])):
+            raise TokenError(_("Token is revoked"))
+        return super().validate(attrs)
+
+
+# ======================================================================================================================
+# CustomTokenRevokeSerializer: Revokes a JWT (access or refresh) until it expires
+class CustomTokenRevokeSerializer(serializers.Serializer):
+    """
+    Holding the token is what allows revoking it, as with logging out.
+    """
+
+    token = serializers.CharField(write_only=True)  # Token to revoke
+
+    def validate(self, attrs):
+        token = UntypedToken(attrs["token"])
+        revoke_token(token)
+        return {}
+
@@ -8,11 +8,11 @@ from .views import (
     CustomActivationResendView,
     CustomResetPasswordView,
     CustomDeleteToken,
+    CustomTokenRefreshView,
+    CustomTokenRevokeView,
+    CustomTokenVerifyView,
 )
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
+from rest_framework_simplejwt.views import TokenObtainPairView
 
 # ======================================================================================================================
 # Setting the application namespace for URL reversibility and organization
@@ -68,16 +68,22 @@ urlpatterns = [
     # - Generates **access & refresh tokens** using **TokenObtainPairView**.
     path(
         "jwt/token/refresh/",
-        TokenRefreshView.as_view(),
+        CustomTokenRefreshView.as_view(),
         name="token_refresh",
     ),
-    # - Refreshes **access tokens** using **TokenRefreshView**.
+    # - Refreshes **access tokens** using **CustomTokenRefreshView** (not from revoked refresh tokens).
     path(
         "jwt/token/verify/",
-        TokenObtainPairView.as_view(),
+        CustomTokenVerifyView.as_view(),
         name="token_verify",
     ),
-    # - Verifies a JWT token for authentication.
+    # - Verifies a JWT token locally (signature, expiry, revocation) with **CustomTokenVerifyView**.
+    path(
+        "jwt/token/revoke/",
+        CustomTokenRevokeView.as_view(),
+        name="token_revoke",
+    ),
+    # - Revokes a JWT token until it expires (JWT logout) with **CustomTokenRevokeView**.
     # Profile Information
     path("profile/", CustomProfileView.as_view(), name="profile"),
     # - Maps '/profile/' to **CustomProfileView**, displaying user account details.
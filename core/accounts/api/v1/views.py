@@ -12,6 +12,7 @@ from jwt.exceptions import (
 from rest_framework.views import APIView
 from mail_templated import EmailMessage
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenRefreshView, TokenVerifyView, TokenViewBase
 from ...models import User, Profile
 from .serializer import (
     CustomRegistrationApiView,
@@ -20,6 +21,9 @@ from .serializer import (
     CustomChangePasswordSerializer,
     CustomActivationResendSerializer,
     CustomResetPasswordSerializer,
+    CustomTokenRefreshSerializer,
+    CustomTokenRevokeSerializer,
+    CustomTokenVerifySerializer,
 )
 
 
@@ -301,4 +305,31 @@ class CustomActivationResendView(generics.GenericAPIView):
         return {"token": str(refresh.access_token)}
 
 
+# ======================================================================================================================
+# CustomTokenVerifyView: Verifies a JWT locally
+class CustomTokenVerifyView(TokenVerifyView):
+    """
+    This API view checks the signature, expiry and revocation of a token: 200 when valid, 401 otherwise.
+    """
+
+    serializer_class = CustomTokenVerifySerializer
+
+
+# ======================================================================================================================
+# CustomTokenRefreshView: Refreshes access tokens, except from revoked refresh tokens
+class CustomTokenRefreshView(TokenRefreshView):
+    serializer_class = CustomTokenRefreshSerializer
+
+
+# ======================================================================================================================
+# CustomTokenRevokeView: Revokes a JWT (JWT logout)
+class CustomTokenRevokeView(TokenViewBase):
+    """
+    This API view revokes the given access or refresh token until it expires, in every worker within
+    JWT_REVOCATION_SYNC_INTERVAL seconds.
+    """
+
+    serializer_class = CustomTokenRevokeSerializer
+
+
 # ======================================================================================================================
@@ -0,0 +1,285 @@
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import BasicAuthentication, TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from app.metrics import record_cache_lookup
+from .models import User
+from .revocation import is_token_revoked
+
+# Fields kept for authenticated users: the others (password, last_login) are deferred and loaded on first access
+USER_FIELDS = ("id", "email", "is_active", "is_verified", "is_staff", "is_superuser")
+
+
+# ======================================================================================================================
+# LocalCache: LRU of one process whose entries expire after a number of seconds (read from the settings on every set)
+class LocalCache:
+    """
+    Entries live `timeout_setting` seconds at most (0 disables the cache), the least recently used are evicted
+    beyond `size_setting` entries.
+    """
+
+    def __init__(self, timeout_setting, size_setting, default_timeout, default_size=10_000):
+        self.timeout_setting = timeout_setting
+        self.size_setting = size_setting
+        self.default_timeout = default_timeout
+        self.default_size = default_size
+        self._entries = OrderedDict()  # key -> (expiry, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        timeout = getattr(settings, self.timeout_setting, self.default_timeout)
+        if not timeout:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > getattr(settings, self.size_setting, self.default_size):
+                self._entries.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# ======================================================================================================================
+# User cache: a small LRU in each process in front of the shared cache (Redis in production), in front of the database.
+# Saving or deleting a user drops it from the shared cache and from the LRU of the saving process; the other
+# processes may keep it for AUTH_USER_LOCAL_TIMEOUT seconds at most.
+# Basic auth credentials, once verified, are kept by their HMAC in each process with the epoch of their user: saving
+# the user (e.g. after set_password) starts a new epoch in the shared cache, which every process compares on a hit.
+# DRF tokens map to their user id in the LRU and in the shared cache (under a hash of the key); the user itself comes
+# from the user cache. Deleting a token (logout) drops it from the shared cache and the LRU of the deleting process,
+# the other processes may still accept it for AUTH_TOKEN_LOCAL_TIMEOUT seconds.
+
+_local = LocalCache("AUTH_USER_LOCAL_TIMEOUT", "AUTH_USER_LOCAL_SIZE", 5)  # user id -> values of USER_FIELDS
+_credentials = LocalCache("AUTH_CREDENTIALS_TIMEOUT", "AUTH_CREDENTIALS_SIZE", 60)  # HMAC -> (user id, epoch)
+_credentials_key = os.urandom(32)  # Never leaves the process, like the cache it keys
+_tokens = LocalCache("AUTH_TOKEN_LOCAL_TIMEOUT", "AUTH_TOKEN_LOCAL_SIZE", 5)  # DRF token key -> user id
+
+
+def clear_local():
+    _local.clear()
+    _credentials.clear()
+    _tokens.clear()
+
+
+def get_cache():
+    return caches[getattr(settings, "AUTH_USER_CACHE_ALIAS", "default")]
+
+
+def get_cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def get_epoch_key(user_id):
+    return f"auth:credentials:{user_id}"
+
+
+def get_token_cache_key(key):
+    # The shared cache never holds a usable token
+    return "auth:token:" + hashlib.sha256(key.encode()).hexdigest()
+
+
+def get_credentials_key(email, password):
+    # A keyed HMAC: fast, unlike the password hasher, and useless to whoever reads the process memory without the key
+    return hmac.new(_credentials_key, f"{email}\0{password}".encode(), hashlib.sha256).digest()
+
+
+def build_user(values):
+    """
+    Returns a User as loaded from the database with USER_FIELDS only.
+    """
+    values = dict(zip(USER_FIELDS, values))
+    names = [field.attname for field in User._meta.concrete_fields if field.attname in values]
+    return User.from_db(DEFAULT_DB_ALIAS, names, [values[name] for name in names])  # In the model's field order
+
+
+def get_cached_user(user_id):
+    """
+    Returns the user with this id, or None when there is none. Only a miss in both caches queries the database.
+    """
+    values = _local.get(user_id)
+    if values is None:
+        cache = get_cache()
+        key = get_cache_key(user_id)
+        values = cache.get(key)
+        record_cache_lookup("auth_user", values is not None)
+        if values is None:
+            values = User.objects.filter(pk=user_id).values_list(*USER_FIELDS).first()
+            if values is None:
+                return None
+            values = tuple(values)
+            cache.set(key, values, timeout=getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 60))
+        _local.set(user_id, values)
+    return build_user(values)
+
+
+def remember_user(user):
+    """
+    Caches a user loaded by other means (e.g. by the authentication backend).
+    """
+    values = tuple(getattr(user, name) for name in USER_FIELDS)
+    get_cache().set(get_cache_key(user.pk), values, timeout=getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 60))
+    _local.set(user.pk, values)
+
+
+def forget_user(user_id):
+    """
+    Drops the cached user, and the credentials verified for it in every process (through a new epoch).
+    """
+    _local.pop(user_id)
+    cache = get_cache()
+    cache.delete(get_cache_key(user_id))
+    cache.set(get_epoch_key(user_id), time.time_ns(),
+              timeout=getattr(settings, "AUTH_CREDENTIALS_TIMEOUT", 60) or 1)  # Older credentials expire by then
+
+
+@receiver(post_save, sender=User, dispatch_uid="forget_saved_user")
+@receiver(post_delete, sender=User, dispatch_uid="forget_deleted_user")
+def forget_changed_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
+    # A request reading the user before the commit would cache the old row again
+    transaction.on_commit(lambda: forget_user(instance.pk))
+
+
+def get_cached_token_user_id(key):
+    """
+    Returns the id of the user of this token, or None when there is no such token.
+    """
+    user_id = _tokens.get(key)
+    if user_id is None:
+        cache = get_cache()
+        cache_key = get_token_cache_key(key)
+        user_id = cache.get(cache_key)
+        record_cache_lookup("auth_token", user_id is not None)
+        if user_id is None:
+            user_id = Token.objects.filter(key=key).values_list("user_id", flat=True).first()
+            if user_id is None:
+                return None
+            cache.set(cache_key, user_id, timeout=getattr(settings, "AUTH_TOKEN_CACHE_TIMEOUT", 300))
+        _tokens.set(key, user_id)
+    else:
+        record_cache_lookup("auth_token", True)
+    return user_id
+
+
+def forget_token(key):
+    _tokens.pop(key)
+    get_cache().delete(get_token_cache_key(key))
+
+
+@receiver(post_delete, sender=Token, dispatch_uid="forget_deleted_token")
+def forget_deleted_token(sender, instance, **kwargs):
+    forget_token(instance.key)
+
+
+# ======================================================================================================================
+# CachedJWTAuthentication: JWT authentication resolving the user from the user cache
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    Same checks as JWTAuthentication (user exists and is active), without a query per request once the user is cached.
+    The user only has USER_FIELDS loaded: reading its password (e.g. to change it) costs one query.
+    Revoked tokens (accounts/revocation.py) are rejected, without a query either.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if is_token_revoked(validated_token):
+            raise InvalidToken({"detail": _("Token is revoked"), "code": "token_revoked"})
+        return validated_token
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)  # Compares the password hash, which is not cached
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
+
+
+# ======================================================================================================================
+# CachedBasicAuthentication: Basic authentication verifying each email / password pair once
+class CachedBasicAuthentication(BasicAuthentication):
+    """
+    The password hasher runs once per pair and AUTH_CREDENTIALS_TIMEOUT seconds; the next requests cost an HMAC, one
+    shared cache read (the epoch of the user) and the user cache. Failed attempts are never cached.
+    """
+
+    def authenticate_credentials(self, userid, password, request=None):
+        key = get_credentials_key(userid, password)
+        entry = _credentials.get(key)
+        if entry is not None:
+            user_id, epoch = entry
+            if get_cache().get(get_epoch_key(user_id)) == epoch:
+                user = get_cached_user(user_id)
+                if user is not None and user.is_active:
+                    return user, None
+            _credentials.pop(key)
+
+        epoch = None
+        user = User.objects.filter(email=userid).only("pk").first()
+        if user is not None:
+            epoch = get_cache().get(get_epoch_key(user.pk))  # Read first: a change during the check is not missed
+        user, auth = super().authenticate_credentials(userid, password, request)
+        _credentials.set(key, (user.pk, epoch))
+        remember_user(user)
+        return user, auth
+
+
+# ======================================================================================================================
+# CachedTokenAuthentication: DRF token authentication resolving tokens and users from the caches
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Same checks as TokenAuthentication (token exists, user active) without the token / user join on every request.
+    request.auth is the Token, with only its key and user loaded.
+    """
+
+    def authenticate_credentials(self, key):
+        user_id = get_cached_token_user_id(key)
+        if user_id is None:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+        user = get_cached_user(user_id)
+        if user is None or not user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        token = Token.from_db(DEFAULT_DB_ALIAS, ["key", "user_id"], [key, user_id])
+        token.user = user
+        return user, token
+
+
+# ======================================================================================================================
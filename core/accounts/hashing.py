@@ -0,0 +1,229 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from time import perf_counter
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from app.metrics import HASHING_DURATION, HASHING_QUEUE_WAIT, HASHING_QUEUED, HASHING_REJECTED
+
+_service = None
+
+
+# ======================================================================================================================
+# PBKDF2PasswordHasher: Django's PBKDF2 hasher, with its iteration count taken from the settings
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    Same algorithm name as Django's hasher, so existing hashes still verify. Hashes made with another iteration count
+    are flagged by must_update() and rehashed at the next login.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASH_ITERATIONS
+
+
+# ======================================================================================================================
+# HashingBusy: Raised when no hashing slot frees up in time
+class HashingBusy(Exception):
+    """
+    A plain exception, since set_password() and check_password() also run outside DRF (Django's login and admin
+    views, sign up, management commands): HashingBusyMiddleware and exception_handler() turn it into a 503.
+    """
+
+    message = "Too many password checks in progress, try again shortly."
+    retry_after = 1  # Seconds suggested to the client in Retry-After
+
+    def __init__(self, message=None):
+        super().__init__(message or self.message)
+
+
+# HashingUnavailable: The DRF form of HashingBusy
+class HashingUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = HashingBusy.message
+    default_code = "hashing_busy"
+
+
+def setup_worker(nice):
+    # Runs in every pool process (started with 'spawn', so nothing of the parent is inherited)
+    import django
+    django.setup()
+    if nice:
+        os.nice(nice)  # Request workers get the CPU first when both want it
+
+
+# ======================================================================================================================
+# HashingService: Runs password hashes and checks on a bounded process pool
+class HashingService:
+    """
+    At most `concurrency` hashes run in the pool at once, on `workers` processes; up to `queue_size` more callers wait
+    `queue_timeout` seconds at most for a slot, the others get HashingBusy (a 503) right away. A burst of logins then
+    holds a few threads of a worker (gthread, ASGI) at most, and the others keep serving requests.
+    The pool processes run at a lower priority (`nice`), so reads keep their latency even when the hashes compete
+    with them for the same cores. With 0 workers, hashes run in the calling thread, still `concurrency` at once.
+    A pool broken by a dead process (OOM kill, crash) is replaced and the hash tried once more on the new one; when
+    that one breaks as well, the caller gets HashingBusy.
+    """
+
+    def __init__(self, workers, concurrency, queue_size, queue_timeout, nice=0):
+        self.workers = workers
+        self.nice = nice
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._waiting = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def get_executor(self):
+        if not self.workers:
+            return None
+        with self._lock:
+            if self._executor is None:  # Started on first use: after gunicorn forked its workers
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=setup_worker,
+                    initargs=(self.nice,),
+                )
+        return self._executor
+
+    def run(self, operation, function, *args):
+        queued = perf_counter()
+        acquired = self._slots.acquire(blocking=False)
+        if not acquired:
+            with self._lock:
+                full = self._waiting >= self.queue_size
+                if not full:
+                    self._waiting += 1
+            if not full:
+                HASHING_QUEUED.inc()
+                try:
+                    acquired = self._slots.acquire(timeout=self.queue_timeout)
+                finally:
+                    HASHING_QUEUED.dec()
+                    with self._lock:
+                        self._waiting -= 1
+        HASHING_QUEUE_WAIT.labels(operation).observe(perf_counter() - queued)
+        if not acquired:
+            HASHING_REJECTED.labels(operation).inc()
+            raise HashingBusy()
+
+        started = perf_counter()
+        try:
+            for attempt in range(2):
+                executor = self.get_executor()
+                if executor is None:
+                    return function(*args)
+                try:
+                    return executor.submit(function, *args).result()
+                except BrokenProcessPool:
+                    self.discard(executor)
+            raise HashingBusy()
+        finally:
+            self._slots.release()
+            HASHING_DURATION.labels(operation).observe(perf_counter() - started)
+
+    def discard(self, executor):
+        # The next get_executor() starts a new pool, unless another thread already did
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+def get_service():
+    global _service
+    if _service is None:
+        _service = HashingService(
+            settings.PASSWORD_HASHING_WORKERS,
+            settings.PASSWORD_HASHING_CONCURRENCY,
+            settings.PASSWORD_HASHING_QUEUE_SIZE,
+            settings.PASSWORD_HASHING_QUEUE_TIMEOUT,
+            settings.PASSWORD_HASHING_NICE,
+        )
+    return _service
+
+
+@receiver(setting_changed)
+def reset_service(setting, **kwargs):
+    # Tests overriding the pool settings get a new service
+    global _service
+    if setting.startswith("PASSWORD_HASHING_") and _service is not None:
+        _service.shutdown()
+        _service = None
+
+
+# ======================================================================================================================
+# Hash / verify: what User.set_password() and User.check_password() call
+
+def hash_password(password):
+    if password is None:
+        return hashers.make_password(None)  # An unusable password: nothing to hash
+    return get_service().run("hash", hashers.make_password, password)
+
+
+def verify_password(password, encoded, setter=None):
+    """
+    Same as django.contrib.auth.hashers.check_password(), with the hash computed by the service. A correct password
+    hashed with another hasher or iteration count than the preferred one is passed to `setter` to be rehashed.
+    """
+    if password is None or not hashers.is_password_usable(encoded):
+        return False
+    try:
+        hasher = hashers.identify_hasher(encoded)
+    except ValueError:
+        return False
+
+    is_correct = get_service().run("verify", hashers.check_password, password, encoded)
+    preferred = hashers.get_hasher("default")
+    must_update = hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+    if is_correct and must_update and setter is not None:
+        setter(password)
+    return is_correct
+
+
+# ======================================================================================================================
+# Turning HashingBusy into a 503: exception_handler() for DRF views (REST_FRAMEWORK's EXCEPTION_HANDLER),
+# HashingBusyMiddleware for every other view
+
+
+def exception_handler(exc, context):
+    from rest_framework import views  # Imports the authentication classes, which import the User model
+
+    if isinstance(exc, HashingBusy):
+        response = views.exception_handler(HashingUnavailable(), context)
+        response["Retry-After"] = str(HashingBusy.retry_after)
+        return response
+    return views.exception_handler(exc, context)
+
+
+class HashingBusyMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        if isinstance(exception, HashingBusy):
+            response = HttpResponse(str(exception), status=503, content_type="text/plain; charset=utf-8")
+            response["Retry-After"] = str(exception.retry_after)
+            return response
+        return None
+
+
+# ======================================================================================================================
@@ -0,0 +1,52 @@
+from datetime import timedelta
+from time import perf_counter
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+#=======================================================================================================================
+
+class Command(BaseCommand):
+    help = ("Deletes the DRF tokens older than AUTH_TOKEN_MAX_AGE_DAYS in chunks (one short transaction each), "
+            "dropping them from the token cache as well; their users log in again to get a new one")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None,
+                            help="Age in days from which a token is stale (defaults to AUTH_TOKEN_MAX_AGE_DAYS)")
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Tokens read per transaction")
+        parser.add_argument("--dry-run", action="store_true", help="Only counts the stale tokens")
+
+    def handle(self, *args, **options):
+        days = options["days"] if options["days"] is not None else settings.AUTH_TOKEN_MAX_AGE_DAYS
+        cutoff = timezone.now() - timedelta(days=days)
+        if options["dry_run"]:
+            count = Token.objects.filter(created__lt=cutoff).count()
+            self.stdout.write(f"{count} tokens created before {cutoff:%Y-%m-%d %H:%M} would be deleted")
+            return
+
+        # authtoken_token.created has no index: the table is walked once in primary key order, each chunk
+        # reading the next keys from the primary key index, instead of sorting the stale tokens for every chunk
+        started = perf_counter()
+        deleted = chunks = 0
+        last_key = ""
+        while True:
+            with transaction.atomic():
+                rows = list(
+                    Token.objects.filter(key__gt=last_key)
+                    .order_by("key")
+                    .values_list("key", "created")[:options["chunk_size"]]
+                )
+                if not rows:
+                    break
+                stale = [key for key, created in rows if created < cutoff]
+                if stale:
+                    # post_delete drops every token from the token cache (accounts/authentication.py)
+                    deleted += Token.objects.filter(key__in=stale).delete()[0]
+            last_key = rows[-1][0]
+            chunks += 1
+        self.stdout.write(self.style.SUCCESS(
+            f"{deleted} stale tokens deleted in {chunks} chunks ({perf_counter() - started:.1f}s), "
+            f"created before {cutoff:%Y-%m-%d %H:%M}"
+        ))
@@ -6,6 +6,7 @@ from django.contrib.auth.models import (
 )
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from .hashing import hash_password, verify_password
 
 
 # ======================================================================================================================
@@ -96,6 +97,24 @@ class User(AbstractBaseUser, PermissionsMixin):
         """
         return self.email
 
+    def set_password(self, raw_password):
+        """
+        Hashes the password on the hashing service (see accounts/hashing.py) instead of the request worker.
+        """
+        self.password = hash_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        """
+        Checks the password on the hashing service, rehashing it when the hasher policy changed.
+        """
+        def setter(raw_password):
+            self.set_password(raw_password)
+            self._password = None  # Saved right away: no need to report the change to the validators
+            self.save(update_fields=["password"])
+
+        return verify_password(raw_password, self.password, setter)
+
 
 # ======================================================================================================================
 class Profile(models.Model):
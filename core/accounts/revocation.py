@@ -0,0 +1,297 @@
+import fcntl
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework_simplejwt.settings import api_settings
+
+logger = logging.getLogger(__name__)
+
+STORE_CACHE_KEY = "auth:revocation-store"  # Location of the store the last revocation went to (shared cache)
+
+_revocations = None
+
+
+# ======================================================================================================================
+# RevocationUnavailable: Raised when a revocation cannot be stored
+class RevocationUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Tokens cannot be revoked right now, try again shortly."
+    default_code = "revocation_unavailable"
+
+
+# ======================================================================================================================
+# BloomFilter: Set membership in a fixed number of bits, with false positives but no false negatives
+class BloomFilter:
+    """
+    Sized for `capacity` items at `error_rate` false positives; the k bit positions of an item come from one BLAKE2b
+    digest (double hashing). 100 000 items at 0.1% take about 180 KB.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = capacity
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first, step = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * step) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for position in self.positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(item))
+
+
+# ======================================================================================================================
+# Stores: where the revocations of every process meet. read_changes() returns (reset, entries): with reset, the
+# entries replace everything read so far, otherwise they add to it. Entries are (jti, expiry timestamp) pairs.
+# `location` names the store: every process must use the same one (see check_store()).
+
+class FileStore:
+    """
+    An append-only JSON Lines file (a volume shared by the workers): each process reads what was appended since its
+    last offset. prune() rewrites the file without the expired entries and swaps it in; readers notice the new inode
+    and read it again from the start. Writers hold an flock on the file next to it.
+    """
+
+    errors = (OSError, ValueError)  # Unreadable file or line
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.location = f"file://{os.path.abspath(self.path)}"
+        self._inode = None
+        self._offset = 0
+
+    def lock(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        lock = open(self.path + ".lock", "a")
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        return lock  # Released when closed
+
+    def add(self, jti, expires):
+        with self.lock():
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(json.dumps([jti, expires]) + "\n")
+
+    def read_changes(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            reset = self._inode is not None
+            self._inode, self._offset = None, 0
+            return reset, []
+        reset = stat.st_ino != self._inode or stat.st_size < self._offset
+        if reset:
+            self._inode, self._offset = stat.st_ino, 0
+        elif stat.st_size == self._offset:
+            return False, []  # Nothing new: the common case costs one stat()
+        with open(self.path, "rb") as file:
+            file.seek(self._offset)
+            data = file.read()
+        data = data[:data.rfind(b"\n") + 1]  # A line being written is read next time
+        self._offset += len(data)
+        return reset, [tuple(json.loads(line)) for line in data.splitlines() if line.strip()]
+
+    def prune(self, now):
+        with self.lock():
+            try:
+                with open(self.path, encoding="utf-8") as file:
+                    entries = [json.loads(line) for line in file if line.strip()]
+            except FileNotFoundError:
+                return 0
+            kept = [entry for entry in entries if entry[1] > now]
+            with open(self.path + ".tmp", "w", encoding="utf-8") as file:
+                file.writelines(json.dumps(entry) + "\n" for entry in kept)
+            os.replace(self.path + ".tmp", self.path)
+        return len(entries) - len(kept)
+
+
+class RedisStore:
+    """
+    A sorted set of JTIs scored by their expiry, and a stream logging every revocation. A starting process reads the
+    set once; after that it only reads the stream entries added since the last one it saw, so a revocation costs each
+    process one entry, whatever the number of revoked tokens. prune() drops the expired JTIs from the set and the
+    stream entries older than the longest token lifetime, whose tokens have expired as well.
+    """
+
+    key = "auth:revoked"
+    log_key = "auth:revoked:log"
+
+    def __init__(self, url):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.errors = (redis.RedisError, OSError)
+        connection = self.client.connection_pool.connection_kwargs  # Without the password of the URL
+        self.location = f"redis://{connection.get('host')}:{connection.get('port')}/{connection.get('db')}"
+        self._last_id = None  # ID of the last stream entry read
+
+    def add(self, jti, expires):
+        pipeline = self.client.pipeline()
+        pipeline.zadd(self.key, {jti: expires})
+        pipeline.xadd(self.log_key, {"jti": jti, "expires": expires})
+        pipeline.execute()
+
+    def read_changes(self):
+        if self._last_id is None:
+            pipeline = self.client.pipeline()  # MULTI: the end of the log is where the set was read
+            pipeline.xrevrange(self.log_key, count=1)
+            pipeline.zrangebyscore(self.key, time.time(), "+inf", withscores=True)
+            last, entries = pipeline.execute()
+            self._last_id = last[0][0] if last else b"0-0"
+            return True, [(jti.decode(), expires) for jti, expires in entries]
+
+        streams = self.client.xread({self.log_key: self._last_id})
+        if not streams:
+            return False, []
+        log = streams[0][1]
+        self._last_id = log[-1][0]
+        return False, [(fields[b"jti"].decode(), float(fields[b"expires"])) for _, fields in log]
+
+    def prune(self, now):
+        lifetime = max(api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME).total_seconds()
+        pipeline = self.client.pipeline()
+        pipeline.zremrangebyscore(self.key, "-inf", now)
+        pipeline.xtrim(self.log_key, minid=f"{int((now - lifetime) * 1000)}-0")
+        removed, _ = pipeline.execute()
+        return removed
+
+
+# ======================================================================================================================
+# RevocationList: The revoked JTIs of this process, synced with the store
+class RevocationList:
+    """
+    is_revoked() answers from memory: the Bloom filter rules out almost every valid token, the exact map (JTI ->
+    expiry) settles its false positives. The store is read again at most every `sync_interval` seconds, so a
+    revocation reaches the other processes within that time; the revoking process sees it at once.
+    When the store is unreachable, lookups keep answering from memory (logged) and revoke() raises
+    RevocationUnavailable (503): a revocation that was not stored is never reported as done.
+    """
+
+    def __init__(self, store, capacity, sync_interval):
+        self.store = store
+        self.capacity = capacity
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._revoked = {}
+        self._bloom = BloomFilter(capacity)
+        self._synced = None
+
+    def add_entries(self, entries):
+        for jti, expires in entries:
+            self._revoked[jti] = expires
+            self._bloom.add(jti)
+        if len(self._revoked) > self._bloom.capacity:
+            self.rebuild(list(self._revoked.items()))
+
+    def rebuild(self, entries):
+        now = time.time()
+        self._revoked = {jti: expires for jti, expires in entries if expires > now}
+        self._bloom = BloomFilter(max(self.capacity, 2 * len(self._revoked)))
+        for jti in self._revoked:
+            self._bloom.add(jti)
+
+    def sync(self, force=False):
+        now = time.monotonic()
+        if not force and self._synced is not None and now - self._synced < self.sync_interval:
+            return
+        with self._lock:
+            self._synced = now
+            try:
+                reset, entries = self.store.read_changes()
+            except self.store.errors:
+                # Fails open: the revocations read so far still apply, the store is tried again next interval
+                logger.warning(
+                    "Could not read the revoked tokens, checking against the %d known ones", len(self._revoked),
+                    exc_info=True,
+                )
+                return
+            if reset:
+                self.rebuild(entries)
+            else:
+                self.add_entries(entries)
+
+    def is_revoked(self, jti):
+        self.sync()
+        if jti not in self._bloom:
+            return False
+        expires = self._revoked.get(jti)
+        return expires is not None and expires > time.time()
+
+    def revoke(self, jti, expires):
+        try:
+            self.store.add(jti, expires)
+        except self.store.errors as exc:
+            logger.error("Could not store a revoked token", exc_info=True)
+            raise RevocationUnavailable() from exc
+        with self._lock:
+            self.add_entries([(jti, expires)])
+        cache.set(STORE_CACHE_KEY, self.store.location, None)
+
+    def check_store(self):
+        """
+        Raises ImproperlyConfigured when the last revocation went to another store than this one, as when the process
+        lacks the REDIS_URL of the web processes: it would never see their revocations, nor prune them.
+        """
+        location = cache.get(STORE_CACHE_KEY)
+        if location is not None and location != self.store.location:
+            raise ImproperlyConfigured(
+                f"Revoked tokens are stored in {location}, this process uses {self.store.location}: "
+                f"set the same REDIS_URL / JWT_REVOCATION_STORE as the web processes"
+            )
+
+    def prune(self):
+        self.check_store()
+        removed = self.store.prune(time.time())
+        self.sync(force=True)
+        return removed
+
+
+def get_store():
+    if settings.JWT_REVOCATION_STORE == "redis":
+        return RedisStore(settings.REDIS_URL)
+    return FileStore(settings.JWT_REVOCATION_FILE)
+
+
+def get_revocations():
+    global _revocations
+    if _revocations is None:
+        _revocations = RevocationList(
+            get_store(), settings.JWT_REVOCATION_CAPACITY, settings.JWT_REVOCATION_SYNC_INTERVAL
+        )
+    return _revocations
+
+
+def is_token_revoked(token):
+    jti = token.get(api_settings.JTI_CLAIM)
+    return jti is not None and get_revocations().is_revoked(jti)
+
+
+def revoke_token(token):
+    # Kept until the token expires on its own
+    get_revocations().revoke(token[api_settings.JTI_CLAIM], token["exp"])
+
+
+@receiver(setting_changed)
+def reset_revocations(setting, **kwargs):
+    # Tests pointing the store elsewhere get a new list
+    global _revocations
+    if setting.startswith("JWT_REVOCATION_"):
+        _revocations = None
+
+
+# ======================================================================================================================
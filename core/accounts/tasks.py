@@ -1,9 +1,50 @@
 from celery import shared_task
-from app.models import ToDoApp
+from celery.signals import worker_init
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from app.models import PurgeJob
+from app.purge import TaskPurge
+from .revocation import get_revocations
 
+# ======================================================================================================================
+@worker_init.connect
+def check_shared_backends(**kwargs):
+    """
+    Refuses to start a worker that does not share the cache and the push broker of the web processes: a purge would
+    only invalidate the cached responses of the worker, and its events would reach no connection.
+    """
+    cache = caches[settings.TASK_CACHE_ALIAS]
+    if isinstance(cache, (LocMemCache, DummyCache)) or not settings.REDIS_URL:
+        raise ImproperlyConfigured(
+            f"The worker uses a {type(cache).__name__} cache and in-process push events: "
+            f"set the same REDIS_URL as the web processes"
+        )
+# ======================================================================================================================
+@shared_task(bind=True, acks_late=True, reject_on_worker_lost=True)
+def purge_tasks(self, job_id):
+    # Acknowledged only once done: a job whose worker died is redelivered and resumes from its checkpoint
+    job = PurgeJob.objects.get(pk=job_id)
+
+    def report(job):
+        # Progress for AsyncResult(job_id).info while the job runs
+        if self.request.id and not self.request.is_eager:
+            self.update_state(state="PROGRESS", meta=job.get_progress())
+
+    TaskPurge(job, on_progress=report).run()
+    return job.get_progress()
 # ======================================================================================================================
 @shared_task
 def delete_task():
-    ToDoApp.objects.all().delete()
+    # Kept for messages queued before purge_tasks existed: purges every task in chunks
+    job = PurgeJob.objects.create()
+    TaskPurge(job).run()
     return "Completed tasks deleted"
 # ======================================================================================================================
+@shared_task
+def prune_revoked_tokens():
+    # Run by beat every JWT_REVOCATION_PRUNE_INTERVAL seconds: expired tokens no longer need to be revoked
+    return get_revocations().prune()
+# ======================================================================================================================
@@ -1,5 +1,5 @@
 from django.urls import path, include
-from .views import SignUpView,deletetask,data
+from .views import SignUpView,deletetask,purge_status,data
 
 # ======================================================================================================================
 # Setting the application namespace to 'accounts' for better URL reversibility and organization
@@ -12,6 +12,7 @@ urlpatterns = [
     path("signup/", SignUpView.as_view(), name="signup"),
     path("", include("django.contrib.auth.urls")),
     path("email/", deletetask, name="email"),
+    path("purge/<uuid:job_id>/", purge_status, name="purge-status"),
     path("data/", data, name="data"),
 ]
 # ======================================================================================================================
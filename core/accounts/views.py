@@ -1,9 +1,16 @@
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import get_object_or_404, reverse
+from django.utils import timezone
 from django.views.generic import CreateView
 from django.views.decorators.cache import cache_page
-from django.http import HttpResponse
+from django.views.decorators.http import require_POST
+from django.http import HttpResponse, JsonResponse
 import requests
 from django.http import HttpResponse
-from .tasks import delete_task
+from app.models import PurgeJob
+from .tasks import purge_tasks
 from .models import User
 
 # ======================================================================================================================
@@ -27,12 +34,63 @@ class SignUpView(CreateView):
 
 
 # ======================================================================================================================
+@require_POST
+@login_required
 def deletetask(request):
+    """
+    Starts a background purge and returns its job id, to be polled at the returned 'status_url'.
+    POST only (with the CSRF token of the session). Superusers purge all tasks or those of 'author=<id>',
+    other users their own tasks. 'older_than_days=<n>' keeps the tasks created in the last n days.
+    """
+    params = request.POST
+    try:
+        author_id = params.get("author")
+        if not request.user.is_superuser:
+            author_id = request.user.pk
+        elif author_id is not None:
+            author_id = User.objects.only("id").get(pk=int(author_id)).pk
+        older_than_days = params.get("older_than_days")
+        created_before = (
+            timezone.now() - timedelta(days=int(older_than_days))
+            if older_than_days is not None
+            else None
+        )
+    except (ValueError, OverflowError, User.DoesNotExist):
+        return JsonResponse(
+            {"detail": "Invalid 'author' or 'older_than_days'."},
+            status=400,
+        )
+
+    job = PurgeJob.objects.create(
+        author_id=author_id,
+        created_before=created_before,
+        chunk_size=settings.TASK_PURGE_CHUNK_SIZE,
+    )
     try:
-        delete_task.delay()
-        return HttpResponse("Task deletion started!", status=202)
+        purge_tasks.apply_async(args=[str(job.pk)], task_id=str(job.pk))
     except Exception as e:
+        job.delete()
         return HttpResponse(f"Error: {str(e)}", status=500)
+    return JsonResponse(
+        {
+            "job_id": str(job.pk),
+            "status_url": reverse(
+                "accounts:purge-status", kwargs={"job_id": job.pk}
+            ),
+        },
+        status=202,
+    )
+# ======================================================================================================================
+@login_required
+def purge_status(request, job_id):
+    """
+    Returns the progress of a purge job started by the requesting user (superusers see every job).
+    """
+    jobs = PurgeJob.objects.all()
+    if not request.user.is_superuser:
+        jobs = jobs.filter(author=request.user)
+    job = get_object_or_404(jobs, pk=job_id)
+    return JsonResponse(job.get_progress())
 # ======================================================================================================================
 @cache_page(5)
 def data(request):
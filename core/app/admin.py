@@ -12,6 +12,9 @@ class ToDoAppAdmin(admin.ModelAdmin):
     list_display = ("author", "content")
     # Specifies the fields that will be displayed in the admin list view.
 
+    list_select_related = ("author",)
+    # Loads the authors with the tasks: the 'author' column would otherwise query each row's author.
+
     list_filter = ("author", "content")
     # Adds filter options in the admin panel, allowing tasks to be filtered by author and content.
 
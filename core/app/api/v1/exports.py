@@ -0,0 +1,98 @@
+import csv
+from itertools import chain
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+# ======================================================================================================================
+# Streaming writers for task exports: every function takes an iterable and yields byte chunks,
+# so an export never holds more than one chunk of rows in memory.
+
+EXPORT_FIELDS = (
+    "id",
+    "author",
+    "content",
+    "created_date",
+    "updated_date",
+)  # Columns of an exported task, in order
+
+CHUNK_SIZE = 64 * 1024  # Bytes buffered before a chunk is sent
+
+
+class Echo:
+    """
+    A file-like object whose write() returns the value, so csv.writer can format one row at a time.
+    """
+
+    def write(self, value):
+        return value
+
+
+def buffered(pieces):
+    """
+    Joins small string pieces into byte chunks of about CHUNK_SIZE.
+    """
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def iter_ndjson(rows):
+    """
+    Yields the rows (tuples in EXPORT_FIELDS order) as newline-delimited JSON objects.
+    """
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    return buffered(
+        encoder.encode(dict(zip(EXPORT_FIELDS, row))) + "\n"
+        for row in rows
+    )
+
+
+def iter_csv(rows):
+    """
+    Yields the rows (tuples in EXPORT_FIELDS order) as CSV with a header line.
+    """
+    writer = csv.writer(Echo())
+    return buffered(
+        chain(
+            [writer.writerow(EXPORT_FIELDS)],
+            (
+                writer.writerow(
+                    [
+                        value.isoformat()
+                        if hasattr(value, "isoformat")
+                        else value
+                        for value in row
+                    ]
+                )
+                for row in rows
+            ),
+        )
+    )
+
+
+def accepts_gzip(header):
+    """
+    Returns True when an Accept-Encoding header allows gzip: listed, or covered by '*', with a non-zero q-value.
+    """
+    qualities = {}
+    for coding in header.split(","):
+        name, _, params = coding.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.strip().lower()] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+# ======================================================================================================================
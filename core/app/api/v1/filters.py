@@ -0,0 +1,53 @@
+from django_filters import rest_framework as filters
+from rest_framework.filters import SearchFilter
+from ...models import ToDoApp
+from ...search import get_search_backend
+
+
+# ======================================================================================================================
+# FullTextSearchFilter: A SearchFilter that delegates '?search=' to the task search backend
+class FullTextSearchFilter(SearchFilter):
+    """
+    This filter replaces the `icontains` scans of SearchFilter with the full-text search backend.
+    Matches are ordered by relevance unless an explicit ordering is requested.
+    """
+
+    highlight_param = "highlight"  # '?highlight=true' adds a snippet of the matched content
+
+    def filter_queryset(self, request, queryset, view):
+        """
+        Returns the ranked matches of the search terms, or the queryset unchanged without a search.
+        """
+        query = request.query_params.get(self.search_param, "").strip()
+        if not query:
+            return queryset
+
+        highlight = request.query_params.get(
+            self.highlight_param, ""
+        ).lower() in ("1", "true", "yes")
+        return get_search_backend(queryset.db).search(
+            queryset, query, highlight=highlight
+        )
+
+
+# ======================================================================================================================
+# TaskFilterSet: The '?id=', '?content=' and '?author=' filters of the task API
+class TaskFilterSet(filters.FilterSet):
+    """
+    This filter set matches the content through the bounded prefix index of ToDoApp (see ContentPrefix).
+    """
+
+    content = filters.CharFilter(method="filter_content")  # Exact text matching for task content
+
+    class Meta:
+        model = ToDoApp
+        fields = {
+            "id": ["exact"],  # Enables filtering tasks by an exact ID match
+            "author": ["exact", "in"],  # Supports filtering by an exact author or multiple authors
+        }
+
+    def filter_content(self, queryset, name, value):
+        return queryset.content_exact(value)
+
+
+# ======================================================================================================================
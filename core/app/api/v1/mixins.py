@@ -0,0 +1,304 @@
+import hashlib
+from django.conf import settings
+from rest_framework import permissions, status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+from ...caching import get_cache, get_generations
+from ...metrics import record_cache_lookup
+from ...conditional import (
+    get_last_modified,
+    get_not_modified_response,
+    get_object_etag,
+    get_queryset_state,
+    get_state_etag,
+    set_validators,
+)
+
+
+# ======================================================================================================================
+# CachedResponseMixin: Serves list and retrieve responses from the cache until a task they depend on changes
+class CachedResponseMixin:
+    """
+    This mixin caches the data of successful list/retrieve responses. The key combines the user, the full
+    request URL, the negotiated media type and the generation of every scope the response depends on
+    (see app/caching.py), so writes invalidate entries by bumping a counter instead of deleting keys.
+    """
+
+    cache_timeout = None  # Seconds a cached response lives at most (defaults to TASK_CACHE_TIMEOUT)
+
+    def list(self, request, *args, **kwargs):
+        """
+        Returns the cached task list, computing it on a miss.
+        """
+        return self.get_cached_response(
+            request,
+            lambda: super(CachedResponseMixin, self).list(
+                request, *args, **kwargs
+            ),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Returns the cached task, computing it on a miss.
+        """
+        return self.get_cached_response(
+            request,
+            lambda: super(CachedResponseMixin, self).retrieve(
+                request, *args, **kwargs
+            ),
+        )
+
+    def get_cache_scopes(self, request):
+        """
+        Returns the scope of the requested task for retrieve. For list, returns the author scopes
+        of a list filtered by author, otherwise the scope of all tasks.
+        """
+        if self.action == "retrieve":
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            return [f"task:{self.kwargs.get(lookup_url_kwarg)}"]
+
+        params = request.query_params
+        values = []
+        if "author" in params:
+            values.append(params["author"])
+        if "author__in" in params:
+            values += params["author__in"].split(",")
+        try:
+            authors = sorted({int(value) for value in values})
+        except ValueError:
+            authors = []
+        if not authors or len(params.getlist("author")) > 1:
+            return ["all"]
+        return [f"author:{pk}" for pk in authors]
+
+    def get_cache_key(self, request, kind):
+        """
+        Returns the cache key of a value of the given kind for this request under the current generations.
+        """
+        if not hasattr(self, "_cache_generations"):
+            # Read once per request, so every value of a request is keyed consistently
+            self._cache_generations = get_generations(
+                self.get_cache_scopes(request)
+            )
+        user = request.user.pk if request.user.is_authenticated else "anon"
+        fingerprint = hashlib.md5(
+            "|".join(
+                [
+                    request.build_absolute_uri(),
+                    request.accepted_media_type or "",
+                    ",".join(map(str, self._cache_generations)),
+                ]
+            ).encode()
+        ).hexdigest()
+        return f"tasks:{kind}:{user}:{fingerprint}"
+
+    def get_cache_timeout(self):
+        if self.cache_timeout is not None:
+            return self.cache_timeout
+        return getattr(settings, "TASK_CACHE_TIMEOUT", 60)
+
+    def get_cached_value(self, request, kind, compute):
+        """
+        Returns the value of the given kind cached for this request, or stores the one `compute` returns.
+        """
+        cache = get_cache()
+        key = self.get_cache_key(request, kind)
+        value = cache.get(key)
+        record_cache_lookup(kind, value is not None)
+        if value is None:
+            value = compute()
+            if value is not None:
+                cache.set(key, value, self.get_cache_timeout())
+        return value
+
+    def get_cached_response(self, request, compute):
+        """
+        Returns the response data cached for this request, or stores the data of the successful response `compute` returns.
+        """
+        cache = get_cache()
+        key = self.get_cache_key(request, "response")
+
+        cached = cache.get(key)
+        record_cache_lookup("response", cached is not None)
+        if cached is not None:
+            return Response(cached)
+
+        response = compute()
+        if response.status_code == 200:
+            cache.set(key, response.data, self.get_cache_timeout())
+        return response
+
+
+# ======================================================================================================================
+# PreconditionFailed: Raised when If-Match does not match the current version of an object
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = "The object has been modified since it was fetched."
+    default_code = "precondition_failed"
+
+
+# ======================================================================================================================
+# ConditionalResponseMixin: Adds ETag / Last-Modified validators and answers conditional requests
+class ConditionalResponseMixin:
+    """
+    This mixin answers If-None-Match / If-Modified-Since with 304 before anything is serialized, and rejects
+    PUT / PATCH / DELETE whose If-Match does not match the current object with 412.
+    List ETags come from `(max(updated_date), count)` of the filtered queryset, whose count is also given to the
+    paginator as `list_count`. Detail ETags come from the object's updated_date (see app/conditional.py).
+    Both are cached next to the response when the view caches responses.
+    """
+
+    def list(self, request, *args, **kwargs):
+        """
+        Returns 304 when the list did not change, otherwise the list with its ETag.
+        """
+        state = self.get_validator(
+            request,
+            "state",
+            lambda: get_queryset_state(
+                self.filter_queryset(self.get_queryset())
+            ),
+        )
+        self.list_count = state["count"]  # Reused by the paginators instead of a second COUNT
+        etag = get_state_etag(state, request.accepted_media_type)
+        not_modified = get_not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+        response = super().list(request, *args, **kwargs)
+        return set_validators(response, etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Returns 304 when the object did not change, otherwise the object with its ETag and Last-Modified.
+        """
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        pk = kwargs[lookup_url_kwarg]
+        updated_date = self.get_validator(
+            request,
+            "updated",
+            lambda: next(
+                iter(
+                    self.filter_queryset(self.get_queryset())
+                    .filter(**{self.lookup_field: pk})
+                    .values_list("updated_date", flat=True)[:1]
+                ),
+                None,
+            ),
+        )  # Only the timestamp is loaded to decide on a 304
+        if updated_date is None:
+            return super().retrieve(request, *args, **kwargs)  # Raises the usual 404
+
+        etag = get_object_etag(
+            pk, updated_date, request.accepted_media_type
+        )
+        last_modified = get_last_modified(updated_date)
+        not_modified = get_not_modified_response(
+            request, etag, last_modified
+        )
+        if not_modified is not None:
+            return not_modified
+        response = super().retrieve(request, *args, **kwargs)
+        return set_validators(response, etag, last_modified)
+
+    def get_validator(self, request, kind, compute):
+        """
+        Returns a validator, through the response cache when the view has one (CachedResponseMixin).
+        """
+        if hasattr(self, "get_cached_value"):
+            return self.get_cached_value(request, kind, compute)
+        return compute()
+
+    def update(self, request, *args, **kwargs):
+        """
+        Updates the object and returns its new validators.
+        """
+        response = super().update(request, *args, **kwargs)
+        instance = getattr(self, "saved_instance", None)
+        if instance is not None:
+            set_validators(
+                response,
+                get_object_etag(
+                    instance.pk,
+                    instance.updated_date,
+                    request.accepted_media_type,
+                ),
+                get_last_modified(instance.updated_date),
+            )
+        return response
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        self.saved_instance = serializer.instance
+
+    def get_object(self):
+        """
+        Returns the object, raising 412 when a write carries validators that no longer match it.
+        """
+        obj = super().get_object()
+        if self.request.method not in permissions.SAFE_METHODS:
+            etag = get_object_etag(
+                obj.pk,
+                obj.updated_date,
+                self.request.accepted_media_type,
+            )
+            if (
+                get_not_modified_response(
+                    self.request,
+                    etag,
+                    get_last_modified(obj.updated_date),
+                )
+                is not None
+            ):
+                raise PreconditionFailed()
+        return obj
+
+
+# ======================================================================================================================
+# ValuesListMixin: Lists objects from `.values()` rows with a read-only serializer
+class ValuesListMixin:
+    """
+    This mixin skips model instantiation and ModelSerializer field handling on list actions: rows are
+    loaded with `.values()` and rendered by `list_read_serializer_class`, which must produce the same output
+    as the regular serializer. Any other action uses the regular serializer.
+    """
+
+    list_read_serializer_class = None  # Fast serializer for list actions (None disables the fast path)
+
+    def list(self, request, *args, **kwargs):
+        """
+        Returns the (paginated) list rendered from `.values()` rows.
+        """
+        if self.list_read_serializer_class is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.get_list_rows(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(queryset)
+        serializer = self.list_read_serializer_class(
+            queryset if page is None else page,
+            context=self.get_serializer_context(),
+        )
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
+    def get_list_rows(self, queryset):
+        """
+        Returns the `.values()` queryset holding the serializer's columns, the annotations it renders and the
+        columns the paginator needs for its cursors.
+        """
+        fields = list(self.list_read_serializer_class.values_fields)
+        fields += [
+            name
+            for name in getattr(
+                self.paginator, "get_key_fields", lambda *args: ()
+            )(self.request, self)
+            if name not in fields
+        ]
+        if "search_snippet" in queryset.query.annotations:
+            fields.append("search_snippet")
+        return queryset.values(*fields)
+
+
+# ======================================================================================================================
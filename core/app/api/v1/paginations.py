@@ -1,5 +1,28 @@
+import json
+from base64 import b64decode, b64encode
+from functools import partial
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
 from rest_framework import pagination
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+# ======================================================================================================================
+# CountedPaginator: A Paginator that can be given the total count
+class CountedPaginator(Paginator):
+    """
+    This paginator skips the COUNT(*) query when the caller already knows the number of objects,
+    e.g. from the aggregate of the list ETag (`view.list_count`, see ConditionalResponseMixin).
+    """
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            self.count = count  # Shadows the cached property
 
 
 # ======================================================================================================================
@@ -13,6 +36,15 @@ class CustomPagination(pagination.PageNumberPagination):
         2  # Defines the number of objects per page (default: 2)
     )
 
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Paginates with the count the view already has, if any.
+        """
+        self.django_paginator_class = partial(
+            CountedPaginator, count=getattr(view, "list_count", None)
+        )
+        return super().paginate_queryset(queryset, request, view)
+
     def get_paginated_response(self, data):
         """
         Customizes the paginated response format.
@@ -30,4 +62,257 @@ class CustomPagination(pagination.PageNumberPagination):
         )
 
 
+# ======================================================================================================================
+# KeysetPagination: A cursor (keyset) pagination class whose cost does not grow with the page depth
+class KeysetPagination(pagination.CursorPagination):
+    """
+    This class paginates with a `WHERE (key) > (last key)` seek instead of an OFFSET scan.
+    The cursor is an opaque token holding the key of the row at the page boundary.
+    """
+
+    page_size = 20  # Defines the number of objects per page
+    page_size_query_param = "page_size"  # Lets clients choose the page size with '?page_size='
+    max_page_size = 100  # Upper bound for '?page_size='
+
+    count_query_param = "count"  # '?count=false' skips the COUNT(*) query
+    include_count = True  # Whether the total number of objects is reported by default
+
+    ordering = "-created_date"  # Default ordering when no 'ordering' parameter is given
+
+    orderings = {
+        "id": ("id",),
+        "created_date": ("created_date", "id"),
+    }
+    # Maps every supported 'ordering' value to the columns of its key.
+    # `id` is always the last column so that the key is unique.
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Returns one page of objects that follow (or precede) the position stored in the cursor.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.count = None
+        if self.get_include_count(request):
+            # Counting is independent of the cursor, so it can be skipped on demand
+            self.count = getattr(view, "list_count", None)
+            if self.count is None:
+                self.count = queryset.count()
+
+        self.model = queryset.model  # Converts the key values of the cursor
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor["reverse"]
+        descending = self.ordering.startswith("-")
+        fields = self.orderings[self.ordering.lstrip("-")]
+
+        # Walking backwards flips the ordering, the page is reversed again below
+        if descending != reverse:
+            queryset = queryset.order_by(*["-" + field for field in fields])
+        else:
+            queryset = queryset.order_by(*fields)
+
+        if self.cursor is not None:
+            queryset = queryset.filter(
+                self.get_seek_filter(
+                    fields, self.cursor["key"], descending != reverse
+                )
+            )
+
+        results = list(queryset[: self.page_size + 1])
+        self.page = results[: self.page_size]
+        has_more = len(results) > self.page_size
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = True  # We came from the page that follows
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        return self.page
+
+    def get_include_count(self, request):
+        """
+        Returns False when the client opted out of the total count.
+        """
+        value = request.query_params.get(self.count_query_param)
+        if value is None:
+            return self.include_count
+        return value.lower() not in ("0", "false", "no")
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Returns the requested 'ordering' if it has a keyset, otherwise the default ordering.
+        """
+        ordering_param = "ordering"
+        if view is not None:
+            for backend in getattr(view, "filter_backends", ()):
+                if hasattr(backend, "ordering_param"):
+                    ordering_param = backend.ordering_param
+
+        params = request.query_params.get(ordering_param)
+        if params:
+            # Only the first term decides the key, the id tie-breaker is always appended
+            field = params.split(",")[0].strip()
+            if field.lstrip("-") in self.orderings:
+                return field
+        return self.ordering
+
+    @staticmethod
+    def get_seek_filter(fields, key, descending):
+        """
+        Builds the `(a, b) > (x, y)` row comparison as `a >= x AND (a > x OR (a = x AND b > y))`.
+        The leading `a >= x` term lets the database seek into the index instead of scanning it.
+        """
+        lookup = "lt" if descending else "gt"
+        condition = Q()
+        for index, field in enumerate(fields):
+            equal = {fields[i]: key[i] for i in range(index)}
+            condition |= Q(
+                **equal, **{f"{field}__{lookup}": key[index]}
+            )
+        if len(fields) > 1:
+            condition &= Q(**{f"{fields[0]}__{lookup}e": key[0]})
+        return condition
+
+    def get_key_fields(self, request=None, view=None):
+        """
+        Returns the columns of the key for the ordering of the current page, or of `request` when given.
+        """
+        ordering = (
+            self.ordering
+            if request is None
+            else self.get_ordering(request, None, view)
+        )
+        return self.orderings[ordering.lstrip("-")]
+
+    def get_key(self, instance):
+        """
+        Returns the key values of an object (or a `.values()` row), converted to JSON serializable values.
+        """
+        key = []
+        for field in self.get_key_fields():
+            value = (
+                instance[field]
+                if isinstance(instance, dict)
+                else getattr(instance, field)
+            )
+            key.append(
+                value.isoformat()
+                if hasattr(value, "isoformat")
+                else value
+            )
+        return key
+
+    def decode_cursor(self, request):
+        """
+        Decodes the opaque cursor token, raising 404 for tampered or stale tokens.
+        The key values are converted by their model fields, so a malformed value never reaches the query.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            cursor = json.loads(
+                b64decode(encoded.encode("ascii")).decode("utf-8")
+            )
+            fields = self.orderings[cursor["o"].lstrip("-")]
+            if cursor["o"] != self.ordering or len(cursor["k"]) != len(fields):
+                raise ValueError("Cursor does not match the ordering")
+            key = [
+                self.model._meta.get_field(field).to_python(value)
+                for field, value in zip(fields, cursor["k"])
+            ]
+            if None in key:
+                raise ValueError("Cursor key has an empty value")
+        except (TypeError, ValueError, KeyError, AttributeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return {"key": key, "reverse": bool(cursor["r"])}
+
+    def encode_cursor(self, key, reverse):
+        """
+        Encodes a key into an opaque cursor URL.
+        """
+        token = b64encode(
+            json.dumps(
+                {"o": self.ordering, "k": key, "r": int(reverse)},
+                separators=(",", ":"),
+            ).encode("utf-8")
+        ).decode("ascii")
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, token
+        )
+
+    def get_next_link(self):
+        """
+        Returns the URL of the page after the last object on this page.
+        """
+        if not self.has_next:
+            return None
+        if not self.page:
+            # An empty page reached backwards: restart from the beginning
+            return remove_query_param(
+                self.base_url, self.cursor_query_param
+            )
+        return self.encode_cursor(
+            self.get_key(self.page[-1]), reverse=False
+        )
+
+    def get_previous_link(self):
+        """
+        Returns the URL of the page before the first object on this page.
+        """
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(
+                self.base_url, self.cursor_query_param
+            )
+        return self.encode_cursor(
+            self.get_key(self.page[0]), reverse=True
+        )
+
+    def get_paginated_response(self, data):
+        """
+        Customizes the paginated response format, following CustomPagination.
+        """
+        response = {
+            "links": {
+                "next": self.get_next_link(),  # Opaque URL to the next page if available
+                "previous": self.get_previous_link(),  # Opaque URL to the previous page if available
+            },
+        }
+        if self.count is not None:
+            response["total_objects"] = self.count  # Left out when '?count=false' is given
+        response["results"] = data  # Serialized results for the current page
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        """
+        Describes the paginated response format for the schema generators.
+        """
+        return {
+            "type": "object",
+            "properties": {
+                "links": {
+                    "type": "object",
+                    "properties": {
+                        "next": {"type": "string", "nullable": True},
+                        "previous": {"type": "string", "nullable": True},
+                    },
+                },
+                "total_objects": {"type": "integer"},
+                "results": schema,
+            },
+        }
+
+
 # ======================================================================================================================
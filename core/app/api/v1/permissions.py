@@ -21,8 +21,9 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
 
         # Write permissions are restricted to the object’s owner.
         # Assumes the model has an 'author' attribute representing ownership.
+        # Compares the ids: `obj.author` would load the author with one more query.
         return (
-            obj.author == request.user
+            obj.author_id == request.user.pk
         )  # Allow modification only if the requester is the owner
 
 
@@ -0,0 +1,23 @@
+from copy import deepcopy
+from rest_framework.routers import DefaultRouter
+
+
+# ======================================================================================================================
+# BulkRouter: A DefaultRouter that also routes PUT, PATCH and DELETE on the list URL
+class BulkRouter(DefaultRouter):
+    """
+    This router maps writes on the list URL (e.g. /tasks/) to the bulk actions of a ViewSet.
+    ViewSets without these actions are routed exactly like DefaultRouter does.
+    """
+
+    routes = deepcopy(DefaultRouter.routes)
+    routes[0].mapping.update(
+        {
+            "put": "bulk_update",  # Full update of many objects
+            "patch": "partial_bulk_update",  # Partial update of many objects
+            "delete": "bulk_destroy",  # Deletion of many objects
+        }
+    )
+
+
+# ======================================================================================================================
@@ -1,5 +1,7 @@
+from django.utils import timezone
 from rest_framework import serializers
 from ...models import ToDoApp
+from ...search import render_highlight
 
 
 # ======================================================================================================================
@@ -51,7 +53,154 @@ class UserSerializer(serializers.ModelSerializer):
                 "absolute_url"
             )  # Prevents absolute URL from appearing when retrieving a single object
 
+        # Full-text searches with '?highlight=true' annotate a snippet of the matched content
+        if getattr(obj, "search_snippet", None) is not None:
+            rep["highlight"] = render_highlight(obj.search_snippet)
+
         return rep  # Returns the customized response dictionary
 
 
+# ======================================================================================================================
+# BulkTaskListSerializer: A list serializer validating and writing many tasks with a few queries
+class BulkTaskListSerializer(serializers.ListSerializer):
+    """
+    This serializer validates every item on its own, so that one invalid task does not reject the whole
+    request, and writes the valid ones with `bulk_create` / `bulk_update`.
+    """
+
+    batch_size = 500  # Number of rows per INSERT / UPDATE statement
+
+    def validate_items(self, items):
+        """
+        Returns the validated attributes of the valid items and the errors of the invalid ones, both keyed by index.
+        `items` is a list, or a dict of items keyed by their index in the request.
+        """
+        valid, errors = {}, {}
+        if isinstance(items, list):
+            items = dict(enumerate(items))
+        for index, item in items.items():
+            try:
+                valid[index] = self.child.run_validation(item)
+            except serializers.ValidationError as exc:
+                errors[index] = exc.detail
+        return valid, errors
+
+    def create(self, validated_data):
+        """
+        Inserts all tasks with `bulk_create`. Must run inside a transaction.
+        """
+        tasks = [ToDoApp(**attrs) for attrs in validated_data]
+        ToDoApp.stamp_changes(tasks)  # bulk_create skips `save`
+        tasks = ToDoApp.objects.bulk_create(
+            tasks, batch_size=self.batch_size
+        )
+        if tasks and tasks[0].pk is None:
+            # The database cannot return ids from a bulk INSERT (SQLite on Django 3.2). The surrounding
+            # transaction holds SQLite's write lock, so the newest rows are exactly the ones just inserted.
+            ids = ToDoApp.objects.order_by("-id").values_list(
+                "id", flat=True
+            )[: len(tasks)]
+            for task, pk in zip(tasks, reversed(list(ids))):
+                task.pk = pk
+        return tasks
+
+    def update(self, instances, validated_data):
+        """
+        Applies the validated attributes to their tasks and saves them with `bulk_update`. Must run inside a transaction.
+        """
+        fields = {"updated_date", "change_seq"}
+        now = timezone.now()  # bulk_update skips `auto_now`, so updated_date is set here
+        for instance, attrs in zip(instances, validated_data):
+            for attr, value in attrs.items():
+                setattr(instance, attr, value)
+                fields.add(attr)
+            instance.updated_date = now
+        ToDoApp.stamp_changes(instances)  # bulk_update skips `save`
+        ToDoApp.objects.bulk_update(
+            instances, sorted(fields), batch_size=self.batch_size
+        )
+        return instances
+
+
+# ======================================================================================================================
+# BulkTaskSerializer: The UserSerializer used for each item of a bulk request
+class BulkTaskSerializer(UserSerializer):
+    """
+    This serializer only differs from UserSerializer in that the author is read-only: bulk requests always
+    write the tasks of the requesting user, which spares a user lookup per item.
+    """
+
+    author = serializers.PrimaryKeyRelatedField(
+        read_only=True
+    )  # Set from request.user by the view
+
+    class Meta(UserSerializer.Meta):
+        """
+        Meta class plugs in the bulk list serializer.
+        """
+
+        list_serializer_class = BulkTaskListSerializer
+
+
+# ======================================================================================================================
+# TaskListReadSerializer: A read-only serializer for task listings working on `.values()` rows
+class TaskListReadSerializer(serializers.BaseSerializer):
+    """
+    This serializer produces exactly the list items of UserSerializer, but from plain dict rows and
+    with the absolute URL prefix computed once per page instead of once per task.
+    """
+
+    values_fields = ("id", "author_id", "content")  # Columns loaded with `.values()`
+
+    def to_representation(self, rows):
+        """
+        Returns the list of task representations of the given rows.
+        """
+        request = self.context["request"]
+        # build_absolute_uri(pk) resolves the pk against the current path, so its
+        # result for any pk is the result for "0" with the last character replaced
+        prefix = request.build_absolute_uri("0")[:-1]
+
+        data = []
+        for row in rows:
+            rep = {
+                "id": row["id"],
+                "author": row["author_id"],
+                "content": row["content"],
+                "absolute_url": prefix + str(row["id"]),
+            }
+            if row.get("search_snippet") is not None:
+                rep["highlight"] = render_highlight(row["search_snippet"])
+            data.append(rep)
+        return data
+
+
+# ======================================================================================================================
+# TaskChangeReadSerializer: A read-only serializer for the task changes returned by the sync endpoint
+class TaskChangeReadSerializer(serializers.BaseSerializer):
+    """
+    This serializer renders the `.values()` rows of changed tasks with their timestamps and change sequence,
+    which the client keeps as its sync cursor.
+    """
+
+    values_fields = (
+        "id",
+        "author_id",
+        "content",
+        "created_date",
+        "updated_date",
+        "change_seq",
+    )  # Columns loaded with `.values()`
+
+    def to_representation(self, row):
+        return {
+            "id": row["id"],
+            "author": row["author_id"],
+            "content": row["content"],
+            "created_date": row["created_date"],
+            "updated_date": row["updated_date"],
+            "change_seq": row["change_seq"],
+        }
+
+
 # ======================================================================================================================
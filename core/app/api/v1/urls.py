@@ -1,9 +1,10 @@
-from rest_framework.routers import DefaultRouter
+from .routers import BulkRouter
 from .views import TaskViewSet
 
 # ======================================================================================================================
-# Creating a DefaultRouter instance, which automatically generates API URL routes for ViewSets
-router = DefaultRouter()
+# Creating a BulkRouter instance, which automatically generates API URL routes for ViewSets
+# - Same routes as DefaultRouter, plus PUT / PATCH / DELETE on the list URL for bulk requests
+router = BulkRouter()
 
 # Registering the TaskViewSet with the router
 # - This automatically sets up standard API endpoints for task management
@@ -1,18 +1,51 @@
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils.text import compress_sequence
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
-from .serializers import UserSerializer
-from ...models import ToDoApp
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.permissions import (
+    IsAuthenticated,
+    IsAuthenticatedOrReadOnly,
+)
+from .serializers import (
+    UserSerializer,
+    BulkTaskSerializer,
+    TaskListReadSerializer,
+    TaskChangeReadSerializer,
+)
+from ...models import TaskTombstone, ToDoApp
+from ...caching import bump_generations
+from ...imports import PARSERS, TaskImporter
+from rest_framework.filters import OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
-from .paginations import CustomPagination
+from .exports import EXPORT_FIELDS, accepts_gzip, iter_csv, iter_ndjson
+from .filters import FullTextSearchFilter, TaskFilterSet
+from .mixins import (
+    CachedResponseMixin,
+    ConditionalResponseMixin,
+    ValuesListMixin,
+)
+from .paginations import CustomPagination, KeysetPagination
 from .permissions import IsOwnerOrReadOnly
 
 
 # ======================================================================================================================
 # TaskViewSet: A ModelViewSet for managing tasks in the ToDoApp API
-class TaskViewSet(ModelViewSet):
+class TaskViewSet(
+    ConditionalResponseMixin,
+    CachedResponseMixin,
+    ValuesListMixin,
+    ModelViewSet,
+):
     """
     This ViewSet provides full CRUD (Create, Read, Update, Delete) operations for ToDoApp objects.
+    List and retrieve responses are cached per user until a task they depend on changes (CachedResponseMixin),
+    and carry ETag / Last-Modified validators for conditional requests (ConditionalResponseMixin).
+    Lists are rendered from `.values()` rows by TaskListReadSerializer (ValuesListMixin).
     """
 
     queryset = (
@@ -28,36 +61,438 @@ class TaskViewSet(ModelViewSet):
 
     serializer_class = UserSerializer  # Defines the serializer used for transforming tasks into JSON format
 
+    list_read_serializer_class = TaskListReadSerializer  # Fast read-only serializer for list actions
+
+    bulk_serializer_class = BulkTaskSerializer  # Serializer for the items of bulk requests
+    bulk_max_items = 1000  # Maximum number of tasks in one bulk request
+
+    export_formats = {
+        "ndjson": ("application/x-ndjson", iter_ndjson),
+        "csv": ("text/csv", iter_csv),
+    }  # '?output=' values of the export endpoint with their content type and writer
+    export_chunk_size = 2000  # Rows fetched from the database at a time while exporting
+
+    import_batch_size = 1000  # Rows validated and inserted per transaction while importing
+
+    sync_serializer_class = TaskChangeReadSerializer  # Serializer for the changed tasks of the sync endpoint
+    sync_page_size = 500  # Default number of changes per sync response
+    sync_max_page_size = 1000  # Maximum number of changes per sync response
+
     filter_backends = (
-        SearchFilter,
+        FullTextSearchFilter,
         OrderingFilter,
         DjangoFilterBackend,
     )
     # - Enables **search**, **ordering**, and **filtering** functionality.
+    # - Search goes through the full-text backend in `app/search.py` (FTS5 on SQLite, tsvector on PostgreSQL).
 
-    filterset_fields = {
-        "id": [
-            "exact"
-        ],  # Enables filtering tasks by an exact ID match
-        "content": [
-            "exact"
-        ],  # Allows exact text matching for task content
-        "author": [
-            "exact",
-            "in",
-        ],  # Supports filtering by an exact author or multiple authors
-    }
+    filterset_class = TaskFilterSet  # Filters by exact ID, exact content and exact author or authors
 
     pagination_class = CustomPagination  # Specifies a custom pagination class for managing paginated responses
 
+    keyset_pagination_class = KeysetPagination  # Used instead when '?pagination=cursor' is given
+
     search_fields = [
-        "author",
         "content",
-    ]  # Enables search functionality across author and content fields
+        "author__email",
+    ]  # Fields '?search=' matches, through the search backend (`app/search.py`)
 
     ordering_fields = [
-        "id"
-    ]  # Allows tasks to be ordered based on their ID
+        "id",
+        "created_date",
+    ]  # Allows tasks to be ordered based on their ID or creation time
+
+    @property
+    def paginator(self):
+        """
+        Returns the keyset paginator in cursor mode, otherwise the page number paginator.
+        """
+        if not hasattr(self, "_paginator"):
+            request = getattr(self, "request", None)
+            if (
+                request is not None
+                and request.query_params.get("pagination") == "cursor"
+            ):
+                self._paginator = self.keyset_pagination_class()
+            else:
+                self._paginator = (
+                    self.pagination_class()
+                    if self.pagination_class is not None
+                    else None
+                )
+        return self._paginator
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Bulk endpoints: POST / PUT / PATCH / DELETE on the list URL with an array body (see BulkRouter)
+
+    def create(self, request, *args, **kwargs):
+        """
+        Creates one task, or many when the request body is an array.
+        """
+        if isinstance(request.data, list):
+            return self.bulk_create(request)
+        return super().create(request, *args, **kwargs)
+
+    def bulk_create(self, request):
+        """
+        Creates every valid task of the array in one transaction, owned by the requesting user.
+        """
+        items = self.get_bulk_items(request)
+        serializer = self.get_bulk_serializer(data=items)
+        valid, errors = serializer.validate_items(items)
+        results = self.get_error_results(errors)
+
+        with transaction.atomic():
+            tasks = serializer.create(
+                [
+                    dict(attrs, author=request.user)
+                    for attrs in valid.values()
+                ]
+            )
+        # bulk_create sends no post_save, so the cached lists are invalidated here
+        if tasks:
+            bump_generations(author_ids=[request.user.pk])
+        for index, task in zip(valid, tasks):
+            results[index] = {
+                "index": index,
+                "status": status.HTTP_201_CREATED,
+                "data": serializer.child.to_representation(task),
+            }
+        return self.get_bulk_response(results, status.HTTP_201_CREATED)
+
+    def bulk_update(self, request, partial=False):
+        """
+        Updates every valid task of the array (each item carries its 'id') in one transaction.
+        """
+        items = self.get_bulk_items(request)
+        ids, results = self.get_bulk_ids(
+            [item.get("id") if isinstance(item, dict) else None for item in items]
+        )
+        tasks = self.get_owned_tasks(ids, results)
+
+        serializer = self.get_bulk_serializer(
+            data=items, partial=partial
+        )
+        valid, errors = serializer.validate_items(
+            {index: items[index] for index in tasks}
+        )
+        results.update(self.get_error_results(errors))
+
+        with transaction.atomic():
+            updated = serializer.update(
+                [tasks[index] for index in valid], list(valid.values())
+            )
+        # bulk_update sends no post_save, so the cached responses are invalidated here
+        if updated:
+            bump_generations(
+                author_ids=[request.user.pk],
+                task_ids=[task.pk for task in updated],
+            )
+        for index, task in zip(valid, updated):
+            results[index] = {
+                "index": index,
+                "status": status.HTTP_200_OK,
+                "data": serializer.child.to_representation(task),
+            }
+        return self.get_bulk_response(results, status.HTTP_200_OK)
+
+    def partial_bulk_update(self, request):
+        """
+        Same as bulk_update, but items only need the fields they change.
+        """
+        return self.bulk_update(request, partial=True)
+
+    def bulk_destroy(self, request):
+        """
+        Deletes the tasks whose ids are given, as an array or as {"ids": [...]}, with a single DELETE.
+        """
+        data = request.data
+        if isinstance(data, dict):
+            data = data.get("ids")
+        items = self.get_bulk_items(request, data)
+        ids, results = self.get_bulk_ids(items)
+        tasks = self.get_owned_tasks(ids, results, fields=("id",))
+
+        # One transaction with the tombstones (ToDoAppQuerySet.delete)
+        ToDoApp.objects.filter(
+            id__in=[task.id for task in tasks.values()]
+        ).delete()
+        for index, task in tasks.items():
+            results[index] = {
+                "index": index,
+                "id": task.id,
+                "status": status.HTTP_204_NO_CONTENT,
+            }
+        return self.get_bulk_response(results, status.HTTP_200_OK)
+
+    def get_bulk_serializer(self, *args, **kwargs):
+        """
+        Returns the list serializer for a bulk request.
+        """
+        kwargs.setdefault("context", self.get_serializer_context())
+        return self.bulk_serializer_class(*args, many=True, **kwargs)
+
+    def get_bulk_items(self, request, data=None):
+        """
+        Returns the array of a bulk request, or raises a 400 error when it is missing or too long.
+        """
+        data = request.data if data is None else data
+        if not isinstance(data, list) or not data:
+            raise ValidationError(
+                {"detail": "Expected a non-empty list of items."}
+            )
+        if len(data) > self.bulk_max_items:
+            raise ValidationError(
+                {
+                    "detail": f"A bulk request accepts at most {self.bulk_max_items} items."
+                }
+            )
+        return data
+
+    @staticmethod
+    def get_bulk_ids(values):
+        """
+        Returns the valid task ids keyed by item index, and error results for the invalid or repeated ones.
+        """
+        ids, results, seen = {}, {}, set()
+        for index, value in enumerate(values):
+            try:
+                pk = int(value)
+            except (TypeError, ValueError):
+                pk = None
+            if pk is None or isinstance(value, bool) or pk in seen:
+                results[index] = {
+                    "index": index,
+                    "status": status.HTTP_400_BAD_REQUEST,
+                    "errors": {
+                        "id": ["A unique, valid task id is required."]
+                    },
+                }
+                continue
+            seen.add(pk)
+            ids[index] = pk
+        return ids, results
+
+    def get_owned_tasks(self, ids, results, fields=None):
+        """
+        Loads the tasks of all ids with one query and keeps those owned by the requesting user.
+        Missing and foreign tasks are reported in `results` as 404 and 403.
+        """
+        queryset = ToDoApp.objects.filter(id__in=ids.values())
+        if fields is not None:
+            queryset = queryset.only(*fields, "author_id")
+        found = {task.id: task for task in queryset}
+
+        tasks = {}
+        for index, pk in ids.items():
+            task = found.get(pk)
+            if task is None:
+                results[index] = {
+                    "index": index,
+                    "id": pk,
+                    "status": status.HTTP_404_NOT_FOUND,
+                }
+            elif task.author_id != self.request.user.pk:
+                results[index] = {
+                    "index": index,
+                    "id": pk,
+                    "status": status.HTTP_403_FORBIDDEN,
+                }
+            else:
+                tasks[index] = task
+        return tasks
+
+    @staticmethod
+    def get_error_results(errors):
+        """
+        Converts validation errors keyed by index into per-item results.
+        """
+        return {
+            index: {
+                "index": index,
+                "status": status.HTTP_400_BAD_REQUEST,
+                "errors": detail,
+            }
+            for index, detail in errors.items()
+        }
+
+    @staticmethod
+    def get_bulk_response(results, success_status):
+        """
+        Returns the per-item results in request order, with 207 Multi-Status when some items failed.
+        """
+        results = [results[index] for index in sorted(results)]
+        failed = any(result["status"] >= 400 for result in results)
+        return Response(
+            {"results": results},
+            status=status.HTTP_207_MULTI_STATUS
+            if failed
+            else success_status,
+        )
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Export endpoint: GET /tasks/export/?output=ndjson|csv
+
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[IsAuthenticated],
+    )
+    def export(self, request):
+        """
+        Streams every task matching the list filters as NDJSON or CSV, gzip-compressed when the client accepts it.
+        Superusers export all tasks, other users their own.
+        """
+        output = request.query_params.get("output", "ndjson")
+        if output not in self.export_formats:
+            raise ValidationError(
+                {
+                    "output": f"Expected one of: {', '.join(self.export_formats)}."
+                }
+            )
+        content_type, writer = self.export_formats[output]
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if not request.user.is_superuser:
+            queryset = queryset.filter(author=request.user)
+        if not queryset.ordered:
+            queryset = queryset.order_by("id")
+        rows = queryset.values_list(
+            *["author_id" if field == "author" else field for field in EXPORT_FIELDS]
+        ).iterator(chunk_size=self.export_chunk_size)
+
+        stream = writer(rows)
+        filename = f"tasks.{output}"
+        gzip = accepts_gzip(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if gzip:
+            stream = compress_sequence(stream)
+
+        response = StreamingHttpResponse(stream, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        response["Vary"] = "Accept-Encoding"
+        if gzip:
+            response["Content-Encoding"] = "gzip"
+        return response
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Import endpoint: POST /tasks/import/ with a multipart 'file' (NDJSON or CSV)
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        url_name="import",
+        permission_classes=[IsAuthenticated],
+        parser_classes=[MultiPartParser, FormParser],
+    )
+    def import_tasks(self, request):
+        """
+        Imports the tasks of an uploaded NDJSON or CSV file (as written by the export endpoint) for the requesting user.
+        The file is parsed line by line and inserted in batches, rejected rows are listed in the report.
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": "This field is required."})
+
+        input_format = request.query_params.get(
+            "input", upload.name.rsplit(".", 1)[-1].lower()
+        )  # Defaults to the file extension
+        if input_format not in PARSERS:
+            raise ValidationError(
+                {"input": f"Expected one of: {', '.join(PARSERS)}."}
+            )
+
+        importer = TaskImporter(
+            author=request.user, batch_size=self.import_batch_size
+        )
+        report = importer.run(PARSERS[input_format](upload.file))
+        return Response(
+            report,
+            status=status.HTTP_201_CREATED
+            if report["created"]
+            else status.HTTP_400_BAD_REQUEST,
+        )
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Sync endpoint: GET /tasks/sync/?since=<cursor>&limit=<n>
+
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[IsAuthenticated],
+    )
+    def sync(self, request):
+        """
+        Returns the tasks of the requesting user created or updated, and the ids of those deleted, after the
+        cursor `since`, oldest change first and at most `limit` of them. The returned `cursor` is passed as
+        `since` of the next request; `has_more` tells whether more changes are waiting.
+        """
+        since = self.get_sync_param(request, "since", 0)
+        limit = min(
+            self.get_sync_param(request, "limit", self.sync_page_size)
+            or self.sync_page_size,
+            self.sync_max_page_size,
+        )
+
+        # Tasks and tombstones share the author's change sequence, so the first `limit` changes
+        # are among the first `limit` + 1 rows of each
+        tasks = list(
+            ToDoApp.objects.filter(
+                author=request.user, change_seq__gt=since
+            )
+            .order_by("change_seq")
+            .values(*self.sync_serializer_class.values_fields)[
+                : limit + 1
+            ]
+        )
+        tombstones = list(
+            TaskTombstone.objects.filter(
+                author_id=request.user.pk, change_seq__gt=since
+            )
+            .order_by("change_seq")
+            .values("task_id", "change_seq")[: limit + 1]
+        )
+        changes = sorted(
+            [("task", row) for row in tasks]
+            + [("tombstone", row) for row in tombstones],
+            key=lambda change: change[1]["change_seq"],
+        )
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        serializer = self.sync_serializer_class(context={"request": request})
+        return Response(
+            {
+                "changes": [
+                    serializer.to_representation(row)
+                    for kind, row in changes
+                    if kind == "task"
+                ],
+                "deleted": [
+                    {"id": row["task_id"], "change_seq": row["change_seq"]}
+                    for kind, row in changes
+                    if kind == "tombstone"
+                ],
+                "cursor": changes[-1][1]["change_seq"] if changes else since,
+                "has_more": has_more,
+            }
+        )
+
+    @staticmethod
+    def get_sync_param(request, name, default):
+        """
+        Returns a non-negative integer query parameter of the sync endpoint, or raises a 400 error.
+        """
+        value = request.query_params.get(name)
+        if value is None:
+            return default
+        try:
+            value = int(value)
+        except ValueError:
+            value = -1
+        if value < 0:
+            raise ValidationError({name: "Expected a non-negative integer."})
+        return value
 
 
 # ======================================================================================================================
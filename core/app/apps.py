@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class AppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "app"
+
+    def ready(self):
+        from .search import install_search_backend
+        from . import metrics  # noqa: F401 - connects the Celery signal handlers
+        from . import slowqueries
+
+        # Creates the full-text search index once the task table exists
+        post_migrate.connect(install_search_backend, sender=self)
+        # Times the queries of every connection when SLOW_QUERY_THRESHOLD_MS is set
+        slowqueries.install()
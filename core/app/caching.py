@@ -0,0 +1,63 @@
+import time
+from django.conf import settings
+from django.core.cache import caches
+
+
+# ======================================================================================================================
+# Generation counters: cached task responses embed the generation of every scope they depend on.
+# Bumping a generation makes those entries unreachable, so nothing has to be scanned or deleted.
+#   - "all"            changes with any task
+#   - "author:<id>"    changes with the tasks of one author
+#   - "task:<id>"      changes with one task
+
+GENERATION_TIMEOUT = None  # Generations never expire on their own
+
+
+def get_cache():
+    """
+    Returns the cache holding task responses and generations.
+    """
+    return caches[getattr(settings, "TASK_CACHE_ALIAS", "default")]
+
+
+def get_generations(scopes):
+    """
+    Returns the current generation of every scope, initializing the missing ones.
+    """
+    cache = get_cache()
+    keys = [f"tasks:gen:{scope}" for scope in scopes]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            # Starting from the clock instead of 0 keeps an evicted counter from
+            # coming back to a value that older, stale entries were stored under.
+            cache.add(key, time.time_ns(), timeout=GENERATION_TIMEOUT)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def bump_generations(author_ids=(), task_ids=()):
+    """
+    Invalidates the cached responses depending on the given authors and tasks (and every unscoped one).
+    """
+    cache = get_cache()
+    scopes = ["all"]
+    scopes += [f"author:{pk}" for pk in set(author_ids)]
+    for scope in scopes:
+        key = f"tasks:gen:{scope}"
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Never read yet: no response can depend on it
+            cache.add(key, time.time_ns(), timeout=GENERATION_TIMEOUT)
+    if task_ids:
+        # A task generation only has to move on: a new clock value does, for any number of tasks in one
+        # round trip (bulk updates and deletes touch thousands, whose scopes nothing else bumps concurrently)
+        generation = time.time_ns()
+        cache.set_many(
+            {f"tasks:gen:task:{pk}": generation for pk in set(task_ids)},
+            timeout=GENERATION_TIMEOUT,
+        )
+
+
+# ======================================================================================================================
@@ -0,0 +1,86 @@
+import hashlib
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+# ======================================================================================================================
+# Validators for conditional requests on tasks (ETag / Last-Modified)
+
+
+def make_etag(*parts):
+    """
+    Returns a strong, quoted ETag built from the given parts.
+    """
+    digest = hashlib.md5(
+        "|".join(str(part) for part in parts).encode()
+    ).hexdigest()
+    return quote_etag(digest)
+
+
+def get_queryset_state(queryset):
+    """
+    Returns `{"last": max(updated_date), "count": count}` of a task queryset, in a single aggregate query.
+    The count also serves the paginator, which then does not count the same rows again.
+    """
+    return queryset.order_by().aggregate(
+        last=Max("updated_date"), count=Count("id")
+    )
+
+
+def get_state_etag(state, *extra):
+    """
+    Returns the ETag of a task list from its state (see get_queryset_state).
+    Any insert or update moves the maximum and any delete moves the count.
+    """
+    return make_etag(
+        state["last"].isoformat() if state["last"] else "",
+        state["count"],
+        *extra,
+    )
+
+
+def get_queryset_etag(queryset, *extra):
+    """
+    Returns the ETag of a task list from `(max(updated_date), count)` of its queryset.
+    """
+    return get_state_etag(get_queryset_state(queryset), *extra)
+
+
+def get_object_etag(pk, updated_date, *extra):
+    """
+    Returns the ETag of a single task.
+    """
+    return make_etag(pk, updated_date.isoformat(), *extra)
+
+
+def get_last_modified(updated_date):
+    """
+    Returns the timestamp Django's conditional helpers expect for Last-Modified.
+    """
+    return int(updated_date.timestamp())
+
+
+def get_not_modified_response(request, etag, last_modified=None):
+    """
+    Returns a 304 (GET/HEAD) or 412 response when the request's validators say so, otherwise None.
+    """
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified=None):
+    """
+    Adds the ETag and Last-Modified headers to a response.
+    """
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+# ======================================================================================================================
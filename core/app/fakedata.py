@@ -0,0 +1,38 @@
+from faker import Faker
+
+
+# ======================================================================================================================
+# Synthetic data for the insert_data command. This module only depends on Faker, so that multiprocessing
+# workers can import it without setting up Django (they generate rows, the parent process writes them).
+
+
+def generate_users(chunk):
+    """
+    Returns `(email, first name, last name, description, [task contents])` for the users of a chunk.
+    `chunk` is `(seed, first index, user count, tasks per user)`; the same chunk always gives the same rows
+    for a given seed, whichever worker generates it.
+    """
+    seed, first, count, tasks_per_user = chunk
+    fake = Faker()
+    if seed is not None:
+        fake.seed_instance(seed * 1_000_003 + first)
+    users = []
+    for index in range(first, first + count):
+        first_name, last_name = fake.first_name(), fake.last_name()
+        users.append(
+            (
+                # The index keeps emails unique, Faker alone repeats them
+                f"{first_name}.{last_name}.{index}@{fake.free_email_domain()}".lower(),
+                first_name,
+                last_name,
+                fake.paragraph(nb_sentences=1),
+                [
+                    fake.paragraph(nb_sentences=1)
+                    for _ in range(tasks_per_user)
+                ],
+            )
+        )
+    return users
+
+
+# ======================================================================================================================
@@ -0,0 +1,166 @@
+import csv
+import io
+import json
+from itertools import islice
+from django.db import transaction
+from rest_framework import serializers
+from .caching import bump_generations
+from .models import ToDoApp, User
+
+
+# ======================================================================================================================
+# TaskImportSerializer: Validates one imported task
+class TaskImportSerializer(serializers.Serializer):
+    """
+    This serializer validates the columns of an imported row. The author is optional: it is only read
+    when the importer is not given one author for the whole file.
+    """
+
+    author = serializers.IntegerField(required=False)  # ID of the task owner
+    content = serializers.CharField(
+        trim_whitespace=False
+    )  # Task content, as for the API
+
+
+# ======================================================================================================================
+# Parsers: turn a binary file into `(line number, record)` pairs, one at a time. A record that cannot
+# be parsed is returned as an error message instead of a dict.
+
+
+def parse_ndjson(file):
+    """
+    Yields one record per non-empty line of a newline-delimited JSON file.
+    """
+    for line_number, line in enumerate(
+        io.TextIOWrapper(file, encoding="utf-8", errors="replace"), 1
+    ):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield line_number, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, "Expected a JSON object."
+            continue
+        yield line_number, record
+
+
+def parse_csv(file):
+    """
+    Yields one record per row of a CSV file with a header line.
+    """
+    reader = csv.DictReader(
+        io.TextIOWrapper(
+            file, encoding="utf-8", errors="replace", newline=""
+        )
+    )
+    for record in reader:
+        record.pop(None, None)  # Values beyond the header
+        yield reader.line_num, {
+            key: value for key, value in record.items() if value != ""
+        }
+
+
+PARSERS = {
+    "ndjson": parse_ndjson,
+    "csv": parse_csv,
+}  # Supported input formats
+
+
+# ======================================================================================================================
+# TaskImporter: Validates and inserts parsed records in batches
+class TaskImporter:
+    """
+    This class imports records in batches of `batch_size`: each batch is validated (authors with one query)
+    and written with one `bulk_create` in its own short transaction. Only the first `max_reported` rejected
+    rows are kept for the report, so memory does not depend on the size of the input.
+    """
+
+    def __init__(self, author=None, batch_size=1000, max_reported=100):
+        self.author = author  # Owner of every task, or None to read the 'author' column
+        self.batch_size = batch_size
+        self.max_reported = max_reported
+        self.created = 0
+        self.rejected = 0
+        self.errors = []
+
+    def run(self, records):
+        """
+        Imports `(line number, record)` pairs and returns the report.
+        """
+        records = iter(records)
+        while True:
+            batch = list(islice(records, self.batch_size))
+            if not batch:
+                break
+            self.import_batch(batch)
+        return self.get_report()
+
+    def import_batch(self, batch):
+        """
+        Validates one batch and inserts its valid rows.
+        """
+        valid = []
+        for line_number, record in batch:
+            if not isinstance(record, dict):
+                self.reject(line_number, {"detail": [record]})
+                continue
+            serializer = TaskImportSerializer(data=record)
+            if not serializer.is_valid():
+                self.reject(line_number, serializer.errors)
+                continue
+            valid.append((line_number, serializer.validated_data))
+
+        if self.author is not None:
+            authors = {self.author.pk}
+            tasks = [
+                ToDoApp(author=self.author, content=data["content"])
+                for _, data in valid
+            ]
+        else:
+            authors = set(
+                User.objects.filter(
+                    pk__in={data.get("author") for _, data in valid}
+                ).values_list("pk", flat=True)
+            )  # One query for the authors of the whole batch
+            tasks = []
+            for line_number, data in valid:
+                if data.get("author") not in authors:
+                    self.reject(
+                        line_number,
+                        {"author": ["Unknown or missing author."]},
+                    )
+                    continue
+                tasks.append(
+                    ToDoApp(
+                        author_id=data["author"],
+                        content=data["content"],
+                    )
+                )
+
+        if tasks:
+            with transaction.atomic():
+                ToDoApp.stamp_changes(tasks)
+                ToDoApp.objects.bulk_create(tasks)
+            self.created += len(tasks)
+            # bulk_create sends no post_save, so the cached responses are invalidated here
+            bump_generations(
+                author_ids={task.author_id for task in tasks}
+            )
+
+    def reject(self, line_number, errors):
+        self.rejected += 1
+        if len(self.errors) < self.max_reported:
+            self.errors.append({"line": line_number, "errors": errors})
+
+    def get_report(self):
+        return {
+            "created": self.created,
+            "rejected": self.rejected,
+            "errors": self.errors,  # The first `max_reported` rejected rows
+        }
+
+
+# ======================================================================================================================
@@ -0,0 +1,72 @@
+from time import perf_counter
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from faker import Faker
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from accounts.models import User
+from app.models import ToDoApp
+from app.api.v1.serializers import UserSerializer, TaskListReadSerializer
+
+#=======================================================================================================================
+
+class Command(BaseCommand):
+    help = "Compares UserSerializer with the .values() based TaskListReadSerializer on task listings"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000],
+                            help="Numbers of tasks to serialize")
+        parser.add_argument("--repeat", type=int, default=5,
+                            help="Runs per measurement, the best one is reported")
+
+    def handle(self, *args, **options):
+        sizes = options["sizes"]
+        fake = Faker()
+        request = Request(
+            APIRequestFactory().get("/api/v1/tasks/", HTTP_HOST=settings.ALLOWED_HOSTS[0].lstrip("*.") or "localhost"),
+            parser_context={"kwargs": {}},
+        )
+        context = {"request": request}
+        renderer = JSONRenderer()
+
+        # The dataset only lives inside this transaction, which is rolled back at the end
+        with transaction.atomic():
+            user = User.objects.create_user(email=fake.unique.email(), password=None)
+            ToDoApp.objects.bulk_create(
+                [ToDoApp(author=user, content=fake.paragraph(nb_sentences=1)) for _ in range(max(sizes))],
+                batch_size=1000,
+            )
+            queryset = ToDoApp.objects.filter(author=user).order_by("id")
+
+            self.stdout.write(f"{'rows':>8} {'UserSerializer':>16} {'values() path':>16} {'speedup':>8}")
+            for size in sizes:
+                slow, slow_body = self.measure(
+                    lambda: renderer.render(UserSerializer(list(queryset[:size]), many=True, context=context).data),
+                    options["repeat"],
+                )
+                fast, fast_body = self.measure(
+                    lambda: renderer.render(TaskListReadSerializer(
+                        queryset.values(*TaskListReadSerializer.values_fields)[:size], context=context).data),
+                    options["repeat"],
+                )
+                if fast_body != slow_body:
+                    self.stderr.write(self.style.ERROR(f"Output differs at {size} rows"))
+                self.stdout.write(f"{size:>8} {slow * 1000:>13.1f} ms {fast * 1000:>13.1f} ms {slow / fast:>7.1f}x")
+
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def measure(function, repeat):
+        """
+        Returns the best wall time of `repeat` runs (query, serialization and JSON rendering) and the last output.
+        """
+        best, output = None, None
+        for _ in range(repeat):
+            start = perf_counter()
+            output = function()
+            elapsed = perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, output
+#=======================================================================================================================
@@ -0,0 +1,48 @@
+import sys
+from time import perf_counter
+from django.core.management.base import BaseCommand, CommandError
+from accounts.models import User
+from app.imports import PARSERS, TaskImporter
+
+#=======================================================================================================================
+
+class Command(BaseCommand):
+    help = "Imports tasks from an NDJSON or CSV file, streaming it in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, '-' for standard input")
+        parser.add_argument("--format", choices=sorted(PARSERS), default=None,
+                            help="Input format (defaults to the file extension)")
+        parser.add_argument("--author", default=None,
+                            help="Email of the owner of every task (defaults to the 'author' column of each row)")
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Rows validated and inserted per transaction")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        input_format = options["format"] or path.rsplit(".", 1)[-1].lower()
+        if input_format not in PARSERS:
+            raise CommandError(f"Unknown format '{input_format}', use --format")
+
+        author = None
+        if options["author"]:
+            author = User.objects.filter(email=options["author"]).first()
+            if author is None:
+                raise CommandError(f"No user with email {options['author']}")
+
+        importer = TaskImporter(author=author, batch_size=options["batch_size"])
+        start = perf_counter()
+        if path == "-":
+            report = importer.run(PARSERS[input_format](sys.stdin.buffer))
+        else:
+            with open(path, "rb") as file:
+                report = importer.run(PARSERS[input_format](file))
+        elapsed = perf_counter() - start
+
+        for error in report["errors"]:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['created']} tasks imported, {report['rejected']} rejected "
+            f"in {elapsed:.1f}s ({report['created'] / max(elapsed, 1e-9):.0f} rows/s)"
+        ))
+#=======================================================================================================================
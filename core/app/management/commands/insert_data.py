@@ -1,28 +1,128 @@
+import multiprocessing
+import os
+from time import perf_counter
+from django.contrib.auth.hashers import make_password
 from django.core.management.base import BaseCommand
-from faker import Faker
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
 from accounts.models import User,Profile
-from app.models import ToDoApp
+from app.caching import bump_generations
+from app.fakedata import generate_users
+from app.models import SyncCounter, ToDoApp
 
 #=======================================================================================================================
 
 class Command(BaseCommand):
-    help = "Creates and inserts test users into the database"
-    def __init__(self):
-        super(Command, self).__init__()
-        self.fake = Faker()
+    help = "Creates and inserts test users with their profiles and tasks into the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1, help="Number of users to create")
+        parser.add_argument("--tasks-per-user", type=int, default=5, help="Number of tasks created for each user")
+        parser.add_argument("--seed", type=int, default=None, help="Seed making the generated data reproducible")
+        parser.add_argument("--batch-size", type=int, default=5000,
+                            help="Approximate number of tasks generated and inserted per transaction")
+        parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                            help="Processes generating the data (1 generates in this process)")
+        parser.add_argument("--password", default="m1387m2008m", help="Password of every created user")
+        parser.add_argument("--password-hash", default=None,
+                            help="Precomputed hash (from make_password) stored for every user instead of --password")
+        parser.add_argument("--accounts-file", default=None,
+                            help="Writes the emails of the created users to this file, one per line (Locust accounts)")
 
     def handle(self, *args, **options):
-        user=User.objects.create_user(email=self.fake.email(),password='m1387m2008m')
-        profile=Profile.objects.create(user=user)
-        profile.first_name=self.fake.first_name()
-        profile.last_name=self.fake.last_name()
-        profile.description=self.fake.paragraph(nb_sentences=1)
-        profile.save()
-        self.stdout.write(self.style.SUCCESS('Data inserted successfully!'))
-
-        for _ in range(5):
-            ToDoApp.objects.create(
-                author=user,
-                content=self.fake.paragraph(nb_sentences=1),
-            )
-#=======================================================================================================================
\ No newline at end of file
+        # Hashing is deliberately slow, so it is done once and shared by every user
+        password = options["password_hash"] or make_password(options["password"])
+        tasks_per_user = options["tasks_per_user"]
+        users_per_chunk = max(1, options["batch_size"] // max(tasks_per_user, 1))
+
+        # Indexes continue after the existing users, so that the emails of a new run never collide
+        first = (User.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+        chunks = [
+            (options["seed"], start, min(users_per_chunk, first + options["users"] - start), tasks_per_user)
+            for start in range(first, first + options["users"], users_per_chunk)
+        ]
+
+        counts = {"users": 0, "profiles": 0, "tasks": 0}
+        started = perf_counter()
+        self.accounts = open(options["accounts_file"], "w") if options["accounts_file"] else None
+        try:
+            if options["workers"] > 1 and len(chunks) > 1:
+                with multiprocessing.Pool(options["workers"]) as pool:
+                    for users in pool.imap(generate_users, chunks):
+                        self.write_chunk(users, password, counts)
+                        self.report(counts, started)
+            else:
+                for chunk in chunks:
+                    self.write_chunk(generate_users(chunk), password, counts)
+                    self.report(counts, started)
+        finally:
+            if self.accounts:
+                self.accounts.close()
+
+        self.stderr.write("")  # Ends the progress line
+        bump_generations()  # Cached responses covering all tasks are stale
+        elapsed = perf_counter() - started
+        rows = sum(counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Data inserted successfully! {counts['users']} users, {counts['profiles']} profiles, "
+            f"{counts['tasks']} tasks in {elapsed:.1f}s ({rows / elapsed if elapsed else rows:,.0f} rows/s)"
+        ))
+
+    def write_chunk(self, users, password, counts):
+        """
+        Inserts the users of one chunk with their profile and tasks, in one transaction.
+        """
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        with transaction.atomic():
+            # Plain INSERTs (no post_save, so save_profile does not run: the profiles are written below)
+            self.insert(User, ["email", "password", "is_superuser", "is_staff", "is_active", "is_verified"],
+                        [(email, password, False, True, True, False) for email, *_ in users])
+            ids = dict(User.objects.filter(email__in=[email for email, *_ in users]).values_list("email", "id"))
+
+            self.insert(Profile, ["user_id", "first_name", "last_name", "description", "created_date",
+                                  "modified_date"],
+                        [(ids[email], first_name, last_name, description, now, now)
+                         for email, first_name, last_name, description, _ in users])
+
+            # The users are new, so their change sequences start here (see SyncCounter)
+            tasks = [
+                (ids[email], content, now, now, seq)
+                for email, *_, contents in users
+                for seq, content in enumerate(contents, 1)
+            ]
+            self.insert(ToDoApp, ["author_id", "content", "created_date", "updated_date", "change_seq"], tasks)
+            self.insert(SyncCounter, ["author_id", "value"],
+                        [(ids[email], len(contents)) for email, *_, contents in users if contents])
+
+        if self.accounts:
+            self.accounts.writelines(f"{email}\n" for email, *_ in users)
+        counts["users"] += len(users)
+        counts["profiles"] += len(users)
+        counts["tasks"] += len(tasks)
+
+    @staticmethod
+    def insert(model, columns, rows):
+        """
+        Inserts already adapted rows with multi-row INSERT statements. bulk_create spends most of its time
+        preparing every value of every row, which dominates at millions of rows.
+        """
+        if not rows:
+            return
+        quote = connection.ops.quote_name
+        batch_size = connection.ops.bulk_batch_size(columns, rows)
+        placeholders = f"({', '.join(['%s'] * len(columns))})"
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                cursor.execute(
+                    f"INSERT INTO {quote(model._meta.db_table)} ({', '.join(quote(column) for column in columns)}) "
+                    f"VALUES {', '.join([placeholders] * len(batch))}",
+                    [value for row in batch for value in row],
+                )
+
+    def report(self, counts, started):
+        elapsed = perf_counter() - started
+        rows = sum(counts.values())
+        self.stderr.write(f"\r{counts['users']} users, {counts['tasks']} tasks, {rows / elapsed:,.0f} rows/s", ending="")
+#=======================================================================================================================
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import resource
+from time import perf_counter
+from urllib.parse import urlsplit
+from urllib.request import Request, urlopen
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+#=======================================================================================================================
+
+class Command(BaseCommand):
+    help = ("Opens many idle task event streams (SSE) against a running ASGI server and reports "
+            "the connections held by each server process")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of the ASGI server")
+        parser.add_argument("--connections", type=int, default=1000, help="Number of streams to open")
+        parser.add_argument("--concurrency", type=int, default=100, help="Streams being opened at the same time")
+        parser.add_argument("--hold", type=float, default=10, help="Seconds the streams are kept open")
+        parser.add_argument("--samples", type=int, default=20,
+                            help="Stats requests sent while holding, to reach every server process")
+        parser.add_argument("--token", help="JWT access token of a superuser, who may read the stats of the processes "
+                                            "(otherwise obtained with --email / --password)")
+        parser.add_argument("--email")
+        parser.add_argument("--password")
+
+    def handle(self, *args, **options):
+        base = options["url"].rstrip("/")
+        token = options["token"] or self.get_token(base, options["email"], options["password"])
+
+        # Every stream is a socket on this side too
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        if options["connections"] + 100 > hard:
+            raise CommandError(f"The open file limit ({hard}) is too low for {options['connections']} connections.")
+
+        asyncio.run(self.run(base, token, options))
+
+    def get_token(self, base, email, password):
+        if not email or not password:
+            raise CommandError("Give --token, or --email and --password.")
+        request = Request(
+            f"{base}/accounts/api/v1/jwt/token/create/",
+            data=json.dumps({"email": email, "password": password}).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        with urlopen(request) as response:
+            return json.load(response)["access"]
+
+    async def run(self, base, token, options):
+        url = urlsplit(base)
+        semaphore = asyncio.Semaphore(options["concurrency"])
+        request = (
+            f"GET {settings.TASK_PUSH_SSE_PATH} HTTP/1.1\r\n"
+            f"Host: {url.netloc}\r\n"
+            f"Authorization: Bearer {token}\r\n"
+            f"Accept: text/event-stream\r\n\r\n"
+        ).encode()
+
+        async def open_stream():
+            async with semaphore:
+                try:
+                    reader, writer = await asyncio.open_connection(url.hostname, url.port or 80)
+                    writer.write(request)
+                    status = await reader.readline()
+                    await reader.readuntil(b"\r\n\r\n")
+                    if b" 200 " not in status:
+                        writer.close()
+                        return None
+                    await reader.readuntil(b"\n\n")  # First event: the current cursor
+                    return writer
+                except (OSError, asyncio.IncompleteReadError):
+                    return None
+
+        loop = asyncio.get_running_loop()
+
+        async def sample(duration):
+            # Each request is answered by one process, so several are needed to see all of them
+            processes = {}
+            for _ in range(options["samples"]):
+                stats = await loop.run_in_executor(None, self.get_stats, base, token)
+                processes[stats["pid"]] = stats
+                await asyncio.sleep(duration / options["samples"])
+            return processes
+
+        baseline = await sample(0)
+        started = perf_counter()
+        writers = await asyncio.gather(*[open_stream() for _ in range(options["connections"])])
+        opened = [writer for writer in writers if writer is not None]
+        self.stdout.write(
+            f"opened {len(opened)}/{options['connections']} streams in {perf_counter() - started:.2f}s"
+        )
+        holding = await sample(options["hold"])
+
+        self.stdout.write(f"{'pid':>8} {'connections':>12} {'users':>6} {'max rss (MB)':>13} {'KB/conn':>8}")
+        for pid, stats in sorted(holding.items()):
+            # Memory added by the streams, when the process was also seen before opening them
+            growth = stats["max_rss_kb"] - baseline[pid]["max_rss_kb"] if pid in baseline else None
+            per_connection = (
+                f"{growth / stats['connections']:.1f}" if growth is not None and stats["connections"] else "-"
+            )
+            self.stdout.write(
+                f"{pid:>8} {stats['connections']:>12} {stats['users']:>6} "
+                f"{stats['max_rss_kb'] / 1024:>13.1f} {per_connection:>8}"
+            )
+
+        for writer in opened:
+            writer.close()
+
+    @staticmethod
+    def get_stats(base, token):
+        request = Request(f"{base}{settings.TASK_PUSH_STATS_PATH}", headers={"Authorization": f"Bearer {token}"})
+        with urlopen(request) as response:
+            return json.load(response)
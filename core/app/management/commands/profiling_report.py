@@ -0,0 +1,45 @@
+import io
+import pstats
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from app.profiling import slugify_view_name
+
+#=======================================================================================================================
+
+class Command(BaseCommand):
+    help = ("Aggregates the request profiles sampled by ProfilingMiddleware (PROFILING_SAMPLE_RATE): "
+            "lists the profiled views, or merges the profiles of one view and prints its slowest functions")
+
+    def add_arguments(self, parser):
+        parser.add_argument("view", nargs="?", help="URL name of the view, e.g. app:tasks-list (omit to list them)")
+        parser.add_argument("--dir", default=None, help="Profile directory (defaults to PROFILING_DIR)")
+        parser.add_argument("--sort", default="cumulative", choices=["cumulative", "tottime", "calls"],
+                            help="Order of the functions")
+        parser.add_argument("--limit", type=int, default=30, help="Number of functions printed")
+        parser.add_argument("--output", default=None, help="Also writes the merged profile to this .prof file")
+
+    def handle(self, *args, **options):
+        root = Path(options["dir"] or settings.PROFILING_DIR)
+        if not root.is_dir():
+            raise CommandError(f"No profiles in {root}")
+
+        if not options["view"]:
+            self.stdout.write(f"{'profiles':>8}  view")
+            for directory in sorted(path for path in root.iterdir() if path.is_dir()):
+                self.stdout.write(f"{len(list(directory.glob('*.prof'))):>8}  {directory.name}")
+            return
+
+        directory = root / slugify_view_name(options["view"])
+        files = sorted(directory.glob("*.prof"))
+        if not files:
+            raise CommandError(f"No profiles of {options['view']} in {root}")
+
+        output = io.StringIO()
+        stats = pstats.Stats(*map(str, files), stream=output)
+        if options["output"]:
+            stats.dump_stats(options["output"])
+        stats.strip_dirs().sort_stats(options["sort"]).print_stats(options["limit"])
+        self.stdout.write(f"{len(files)} requests of {options['view']}, "
+                          f"{stats.total_tt / len(files) * 1000:.1f}ms profiled per request")
+        self.stdout.write(output.getvalue())
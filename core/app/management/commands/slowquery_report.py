@@ -0,0 +1,57 @@
+import glob
+import json
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+#=======================================================================================================================
+
+class Command(BaseCommand):
+    help = ("Summarizes the slow query log (SLOW_QUERY_LOG and its rotated files): the queries, or the views and "
+            "tasks issuing them, that spent the most time in the database")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--log", default=None, help="Log file (defaults to SLOW_QUERY_LOG)")
+        parser.add_argument("--by", choices=["sql", "source"], default="sql",
+                            help="Groups by normalized SQL, or by view / task")
+        parser.add_argument("--limit", type=int, default=10, help="Number of offenders printed")
+
+    def handle(self, *args, **options):
+        path = options["log"] or settings.SLOW_QUERY_LOG
+        files = sorted(glob.glob(glob.escape(path) + ".*")) + glob.glob(glob.escape(path))
+        if not files:
+            raise CommandError(f"No slow query log at {path}")
+
+        groups = defaultdict(lambda: {"count": 0, "total": 0.0, "max": 0.0, "sql": None,
+                                      "sources": Counter(), "stacks": Counter()})
+        skipped = 0
+        for name in files:
+            with open(name, encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        skipped += 1  # A line cut by a crash or a rotation
+                        continue
+                    group = groups[record["fingerprint"] if options["by"] == "sql" else record["source"]]
+                    group["count"] += 1
+                    group["total"] += record["duration_ms"]
+                    group["max"] = max(group["max"], record["duration_ms"])
+                    group["sql"] = group["sql"] or record["sql"]
+                    group["sources"][record["source"]] += 1
+                    group["stacks"][" <- ".join(reversed(record["stack"][-3:]))] += 1
+
+        offenders = sorted(groups.items(), key=lambda item: item[1]["total"], reverse=True)[:options["limit"]]
+        self.stdout.write(f"{sum(group['count'] for group in groups.values())} slow queries in {len(files)} file(s), "
+                          f"top {len(offenders)} by total time" + (f" ({skipped} unreadable lines)" if skipped else ""))
+        for key, group in offenders:
+            self.stdout.write("")
+            self.stdout.write(f"{group['total']:>10.1f}ms total {group['count']:>6}x "
+                              f"avg {group['total'] / group['count']:.1f}ms max {group['max']:.1f}ms  [{key}]")
+            if options["by"] == "sql":
+                self.stdout.write(f"  {group['sql'][:300]}")
+            for source, count in group["sources"].most_common(3):
+                self.stdout.write(f"  {count:>6}x from {source}")
+            stack, count = group["stacks"].most_common(1)[0]
+            if stack:
+                self.stdout.write(f"  at {stack}")
@@ -0,0 +1,237 @@
+import os
+import time
+from celery.signals import (
+    before_task_publish,
+    task_postrun,
+    task_prerun,
+    worker_init,
+)
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail import get_connection
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from .querycount import QueryCounter
+
+# ======================================================================================================================
+# Metrics: every process writes its samples to PROMETHEUS_MULTIPROC_DIR (memory-mapped files) when it is set, and
+# /metrics merges the files of all processes: gunicorn workers each answer only some scrapes, but every scrape
+# reports the totals. The directory must be emptied when the server starts (see gunicorn.conf.py).
+
+if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    # Unlabelled metrics open their file as soon as they are defined below
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+TASK_BUCKETS = (0.01, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0)
+
+REQUEST_LATENCY = Histogram(
+    "todoapp_http_request_duration_seconds",
+    "Request latency, by URL name, method and status code",
+    ["view", "method", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_QUERIES = Histogram(
+    "todoapp_http_request_db_queries",
+    "Database queries run by one request, by URL name",
+    ["view"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_TIME = Histogram(
+    "todoapp_http_request_db_duration_seconds",
+    "Time spent in the database by one request, by URL name",
+    ["view"],
+    buckets=LATENCY_BUCKETS,
+)
+CACHE_LOOKUPS = Counter(
+    "todoapp_cache_lookups_total",
+    "Cache lookups (task responses, authenticated users and tokens), by kind of cached value and result (hit / miss)",
+    ["kind", "result"],
+)
+TASK_RUNTIME = Histogram(
+    "todoapp_celery_task_duration_seconds",
+    "Celery task run time, by task name and final state",
+    ["task", "state"],
+    buckets=TASK_BUCKETS,
+)
+TASK_QUEUE_WAIT = Histogram(
+    "todoapp_celery_task_queue_wait_seconds",
+    "Time between publishing a Celery task and a worker starting it, by task name",
+    ["task"],
+    buckets=TASK_BUCKETS,
+)
+EMAIL_SEND = Histogram(
+    "todoapp_email_send_duration_seconds",
+    "Time to hand emails to the mail server, by outcome",
+    ["outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+HASHING_QUEUE_WAIT = Histogram(
+    "todoapp_password_hashing_queue_wait_seconds",
+    "Time a password hash or check waited for a slot of the hashing service, by operation (hash / verify)",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+HASHING_DURATION = Histogram(
+    "todoapp_password_hashing_duration_seconds",
+    "Time to hash or check a password once it has a slot, by operation",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+HASHING_QUEUED = Gauge(
+    "todoapp_password_hashing_queued",
+    "Password hashes and checks waiting for a slot of the hashing service",
+    multiprocess_mode="livesum",
+)
+HASHING_REJECTED = Counter(
+    "todoapp_password_hashing_rejected_total",
+    "Password hashes and checks refused (503) after waiting PASSWORD_HASHING_QUEUE_TIMEOUT, by operation",
+    ["operation"],
+)
+
+
+def get_registry():
+    """
+    Returns the registry /metrics reports: the merged files of every process in multiprocess mode.
+    """
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def metrics_view(request):
+    """
+    Returns every metric in the Prometheus text format.
+    """
+    return HttpResponse(generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST)
+
+
+def record_cache_lookup(kind, hit):
+    CACHE_LOOKUPS.labels(kind=kind, result="hit" if hit else "miss").inc()
+
+
+# ======================================================================================================================
+# MetricsMiddleware: Observes the latency and database work of every request
+class MetricsMiddleware:
+    """
+    This middleware labels requests with the name of their URL pattern (e.g. 'app:tasks-list') rather than their
+    path, so the number of series does not grow with ids and query strings. Unmatched requests are labelled
+    '<unresolved>'. It is only installed when METRICS_ENABLED is on.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "METRICS_ENABLED", True):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        with QueryCounter() as counter:
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match is not None else "<unresolved>"
+        REQUEST_LATENCY.labels(view=view, method=request.method, status=response.status_code).observe(duration)
+        REQUEST_QUERIES.labels(view=view).observe(counter.count)
+        REQUEST_DB_TIME.labels(view=view).observe(counter.duration)
+        return response
+
+
+# ======================================================================================================================
+# InstrumentedEmailBackend: Times the emails sent through the configured backend
+class InstrumentedEmailBackend(BaseEmailBackend):
+    """
+    This backend sends through METRICS_EMAIL_BACKEND (SMTP by default) and observes how long each batch takes.
+    """
+
+    def __init__(self, fail_silently=False, **kwargs):
+        super().__init__(fail_silently=fail_silently)
+        self.backend = get_connection(
+            getattr(settings, "METRICS_EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend"),
+            fail_silently=fail_silently,
+            **kwargs,
+        )
+
+    def open(self):
+        return self.backend.open()
+
+    def close(self):
+        return self.backend.close()
+
+    def send_messages(self, email_messages):
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            sent = self.backend.send_messages(email_messages)
+            outcome = "sent"
+            return sent
+        finally:
+            EMAIL_SEND.labels(outcome=outcome).observe(time.perf_counter() - started)
+
+
+# ======================================================================================================================
+# Celery: run time and queue wait of every task (purge_tasks, delete_task, ...). The publisher stamps the message
+# with the time it was sent, so the wait also covers the time spent in the broker.
+
+PUBLISHED_HEADER = "published_at"
+_task_started = {}  # Start time by task id, within the worker process running the task
+
+
+@before_task_publish.connect
+def stamp_published_at(headers=None, **kwargs):
+    if headers is not None:
+        headers.setdefault(PUBLISHED_HEADER, time.time())
+
+
+@task_prerun.connect
+def observe_task_start(task_id=None, task=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+    published_at = task.request.get(PUBLISHED_HEADER) if task is not None else None
+    if published_at is not None:
+        TASK_QUEUE_WAIT.labels(task=task.name).observe(max(time.time() - published_at, 0))
+
+
+@task_postrun.connect
+def observe_task_end(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None and task is not None:
+        TASK_RUNTIME.labels(task=task.name, state=state or "UNKNOWN").observe(time.perf_counter() - started)
+
+
+@worker_init.connect
+def start_worker_exporter(**kwargs):
+    # The pool processes of a worker serve no HTTP: the main process exports their merged metrics
+    port = getattr(settings, "CELERY_METRICS_PORT", None)
+    if port:
+        clear_multiprocess_dir()
+        start_http_server(int(port), registry=get_registry())
+
+
+def clear_multiprocess_dir():
+    """
+    Removes the samples left by the processes of a previous run.
+    """
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        os.makedirs(path, exist_ok=True)
+        for name in os.listdir(path):
+            if name.endswith(".db"):
+                os.remove(os.path.join(path, name))
+
+
+# ======================================================================================================================
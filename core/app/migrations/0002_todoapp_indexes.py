@@ -0,0 +1,38 @@
+# Generated by Django 3.2 on 2026-10-18 13:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="todoapp",
+            index=models.Index(
+                fields=["author", "created_date", "id"],
+                name="todo_author_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="todoapp",
+            index=models.Index(
+                fields=["author", "id"], name="todo_author_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="todoapp",
+            index=models.Index(
+                fields=["created_date", "id"], name="todo_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="todoapp",
+            index=models.Index(
+                fields=["content"], name="todo_content_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 3.2 on 2026-10-18 13:31
+
+from django.db import migrations, models
+
+
+def backfill_change_seq(apps, schema_editor):
+    # Numbers the existing tasks of every author in update order and starts their counters after them
+    ToDoApp = apps.get_model("app", "ToDoApp")
+    SyncCounter = apps.get_model("app", "SyncCounter")
+    db = schema_editor.connection.alias
+
+    counters = {}
+    batch = []
+    for task in (
+        ToDoApp.objects.using(db)
+        .only("id", "author_id")
+        .order_by("updated_date", "id")
+        .iterator()
+    ):
+        counters[task.author_id] = counters.get(task.author_id, 0) + 1
+        task.change_seq = counters[task.author_id]
+        batch.append(task)
+        if len(batch) == 1000:
+            ToDoApp.objects.using(db).bulk_update(
+                batch, ["change_seq"]
+            )
+            batch = []
+    ToDoApp.objects.using(db).bulk_update(batch, ["change_seq"])
+    SyncCounter.objects.using(db).bulk_create(
+        [
+            SyncCounter(author_id=author_id, value=value)
+            for author_id, value in counters.items()
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0002_todoapp_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SyncCounter",
+            fields=[
+                (
+                    "author_id",
+                    models.BigIntegerField(
+                        primary_key=True, serialize=False
+                    ),
+                ),
+                ("value", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="TaskTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("task_id", models.BigIntegerField()),
+                ("author_id", models.BigIntegerField()),
+                ("change_seq", models.BigIntegerField()),
+                (
+                    "deleted_date",
+                    models.DateTimeField(auto_now_add=True),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="todoapp",
+            name="change_seq",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(
+            backfill_change_seq, migrations.RunPython.noop
+        ),
+        migrations.AddIndex(
+            model_name="todoapp",
+            index=models.Index(
+                fields=["author", "change_seq"],
+                name="todo_author_change_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tasktombstone",
+            index=models.Index(
+                fields=["author_id", "change_seq"],
+                name="tombstone_author_change_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 3.2 on 2026-10-18 13:39
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("app", "0003_todoapp_sync"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PurgeJob",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_before",
+                    models.DateTimeField(blank=True, null=True),
+                ),
+                (
+                    "chunk_size",
+                    models.PositiveIntegerField(default=1000),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("finished", "Finished"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "total",
+                    models.PositiveIntegerField(
+                        blank=True, null=True
+                    ),
+                ),
+                ("deleted", models.PositiveIntegerField(default=0)),
+                ("last_id", models.BigIntegerField(default=0)),
+                (
+                    "created_date",
+                    models.DateTimeField(auto_now_add=True),
+                ),
+                ("updated_date", models.DateTimeField(auto_now=True)),
+                (
+                    "finished_date",
+                    models.DateTimeField(blank=True, null=True),
+                ),
+                (
+                    "author",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.2 on 2026-10-18 14:40
+
+import app.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0004_purgejob"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="todoapp",
+            name="todo_content_idx",
+        ),
+        migrations.AddIndex(
+            model_name="todoapp",
+            index=models.Index(
+                app.models.ContentPrefix("content"),
+                name="todo_content_prefix_idx",
+            ),
+        ),
+    ]
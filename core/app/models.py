@@ -1,9 +1,72 @@
-from django.db import models
+import uuid
+from contextvars import ContextVar
+from django.db import IntegrityError, models, router, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Cast
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.contrib.auth import get_user_model
+from .caching import bump_generations
+from .push import publish_task_change
 
 # Dynamically fetches the user model, ensuring flexibility in case of custom user models
 User = get_user_model()
 
+# Set while ToDoAppQuerySet.delete runs: it invalidates the cache for the whole queryset itself
+deleting_in_bulk = ContextVar("deleting_in_bulk", default=False)
+
+
+# ======================================================================================================================
+# ContentPrefix: The first characters of the task content, as indexed by todo_content_prefix_idx
+class ContentPrefix(models.Func):
+    """
+    This expression renders its bounds as literals, so the index definition and the filters compare equal on every
+    database (SQLite only matches an expression index written exactly like the query).
+    """
+
+    length = 100  # Characters of the content kept in the index, well below the index row limits
+    template = f"SUBSTR(%(expressions)s, 1, {length})"
+    output_field = models.TextField()
+
+
+# ======================================================================================================================
+# ToDoAppQuerySet: The queryset of ToDoApp, recording tombstones for bulk deletes
+class ToDoAppQuerySet(models.QuerySet):
+    """
+    This queryset records the tombstones of the deleted tasks in the deleting transaction,
+    and invalidates the cached responses of all of them at once.
+    """
+
+    def content_exact(self, content):
+        """
+        Filters on the whole content through the prefix index.
+        The cast keeps SQLite from propagating `content = %s` into the prefix, which would no longer match the index.
+        """
+        return self.alias(content_prefix=ContentPrefix("content")).filter(
+            content_prefix=content[: ContentPrefix.length],
+            content=Cast(Value(content), output_field=models.TextField()),
+        )
+
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            tasks = list(self.order_by().only("id", "author_id"))
+            TaskTombstone.record(tasks, using=self.db)
+            token = deleting_in_bulk.set(True)
+            try:
+                deleted = super().delete()
+            finally:
+                deleting_in_bulk.reset(token)
+            # Once for the whole queryset instead of once per row in post_delete
+            if tasks:
+                bump_generations(
+                    author_ids={task.author_id for task in tasks},
+                    task_ids=[task.pk for task in tasks],
+                )
+            return deleted
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
 
 # ======================================================================================================================
 # ToDoApp: A model representing tasks or notes created by users
@@ -25,6 +88,100 @@ class ToDoApp(models.Model):
     updated_date = models.DateTimeField(auto_now=True)
     # Updates the timestamp whenever the task is modified.
 
+    change_seq = models.BigIntegerField(default=0)
+    # Position of the last change of the task in its author's change sequence (see SyncCounter).
+
+    objects = ToDoAppQuerySet.as_manager()
+
+    class Meta:
+        """
+        Meta class defines the indexes matching the access paths of the task views and API.
+        """
+
+        indexes = [
+            models.Index(
+                fields=["author", "created_date", "id"],
+                name="todo_author_created_idx",
+            ),  # Tasks of one author in creation order (HTML list, cursor pagination)
+            models.Index(
+                fields=["author", "id"], name="todo_author_id_idx"
+            ),  # Tasks of one or more authors ordered by ID (API filters)
+            models.Index(
+                fields=["created_date", "id"],
+                name="todo_created_idx",
+            ),  # All tasks in creation order without a sort step
+            models.Index(
+                ContentPrefix("content"), name="todo_content_prefix_idx"
+            ),  # Exact match on content (API 'content' filter), bounded for unlimited content
+            models.Index(
+                fields=["author", "change_seq"],
+                name="todo_author_change_idx",
+            ),  # Changes of one author since a sync cursor
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remembers the author the task was loaded with, so that moving it to another author
+        also invalidates the cached responses of the previous one.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_author_id = instance.__dict__.get("author_id")
+        return instance
+
+    def save(self, *args, **kwargs):
+        """
+        Stamps the task with the next change sequence of its author, in the same transaction as the write.
+        A task moved to another author leaves a tombstone in the sequence of the previous one.
+        """
+        using = kwargs.get("using") or router.db_for_write(
+            type(self), instance=self
+        )
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "change_seq"}
+
+        with transaction.atomic(using=using):
+            self.change_seq = SyncCounter.allocate(
+                self.author_id, using=using
+            )
+            previous_author_id = getattr(
+                self, "_loaded_author_id", None
+            )
+            if previous_author_id not in (None, self.author_id):
+                TaskTombstone.record(
+                    [self], author_id=previous_author_id, using=using
+                )
+            super().save(*args, **kwargs)
+            self._loaded_author_id = self.author_id
+
+    def delete(self, using=None, keep_parents=False):
+        """
+        Deletes the task and records its tombstone in the same transaction.
+        """
+        using = using or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            TaskTombstone.record([self], using=using)
+            return super().delete(using=using, keep_parents=keep_parents)
+
+    @classmethod
+    def stamp_changes(cls, tasks, using="default"):
+        """
+        Assigns change sequences to tasks written in bulk (bulk_create / bulk_update skip `save`)
+        or to tombstones, with one counter update per author. Must run inside the transaction writing the tasks.
+        """
+        by_author = {}
+        for task in tasks:
+            by_author.setdefault(task.author_id, []).append(task)
+        for author_id, author_tasks in by_author.items():
+            last = SyncCounter.allocate(
+                author_id, count=len(author_tasks), using=using
+            )
+            for seq, task in enumerate(
+                author_tasks, last - len(author_tasks) + 1
+            ):
+                task.change_seq = seq
+
     def __str__(self):
         """
         Returns the task content as the string representation of the object.
@@ -32,4 +189,184 @@ class ToDoApp(models.Model):
         return self.content
 
 
+# ======================================================================================================================
+# SyncCounter: The change sequence of one author
+class SyncCounter(models.Model):
+    """
+    This model holds the last change sequence number handed out for the tasks of an author. Every task write
+    increments it in the writing transaction, whose row lock orders the commits of one author like their
+    numbers, so a sync cursor never skips a change committed late.
+    """
+
+    author_id = models.BigIntegerField(primary_key=True)
+    # ID of the author the sequence belongs to.
+
+    value = models.BigIntegerField(default=0)
+    # Last change sequence number handed out.
+
+    @classmethod
+    def allocate(cls, author_id, count=1, using="default"):
+        """
+        Reserves `count` sequence numbers for the author and returns the last one. Must run inside a transaction.
+        """
+        counters = cls.objects.using(using).filter(author_id=author_id)
+        if not counters.update(value=F("value") + count):
+            try:
+                with transaction.atomic(using=using):
+                    cls.objects.using(using).create(
+                        author_id=author_id, value=count
+                    )
+            except IntegrityError:  # Created by a concurrent transaction
+                counters.update(value=F("value") + count)
+                value = counters.values_list("value", flat=True).get()
+            else:
+                value = count
+        else:
+            value = counters.values_list("value", flat=True).get()
+        # Connected clients of the author are told once the change is visible to them
+        transaction.on_commit(
+            lambda: publish_task_change(author_id, value), using=using
+        )
+        return value
+
+
+# ======================================================================================================================
+# TaskTombstone: A deleted task, kept for the clients that have not synced since
+class TaskTombstone(models.Model):
+    """
+    This model records that a task left the task list of an author (deleted, or moved to another author),
+    at which position of the author's change sequence.
+    """
+
+    task_id = models.BigIntegerField()
+    # ID of the deleted task.
+
+    author_id = models.BigIntegerField()
+    # ID of the author whose list the task left.
+
+    change_seq = models.BigIntegerField()
+    # Position of the deletion in the author's change sequence.
+
+    deleted_date = models.DateTimeField(auto_now_add=True)
+    # Date and time of the deletion.
+
+    class Meta:
+        """
+        Meta class defines the index read by the sync endpoint.
+        """
+
+        indexes = [
+            models.Index(
+                fields=["author_id", "change_seq"],
+                name="tombstone_author_change_idx",
+            ),  # Deletions of one author since a sync cursor
+        ]
+
+    @classmethod
+    def record(cls, tasks, author_id=None, using="default"):
+        """
+        Records the tombstones of `tasks` (in the list of `author_id`, by default their own author).
+        Must run inside the transaction deleting them.
+        """
+        tombstones = [
+            cls(
+                task_id=task.pk,
+                author_id=task.author_id if author_id is None else author_id,
+            )
+            for task in tasks
+        ]
+        ToDoApp.stamp_changes(tombstones, using=using)
+        return cls.objects.using(using).bulk_create(tombstones)
+
+
+# ======================================================================================================================
+# PurgeJob: A background deletion of tasks, with its progress
+class PurgeJob(models.Model):
+    """
+    This model holds the criteria and the checkpoint of a purge run by the Celery task `purge_tasks`
+    (see app/purge.py). The checkpoint is saved in the transaction deleting each chunk, so a job
+    picked up again after a worker crash continues exactly where the last committed chunk ended.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    FINISHED = "finished"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (FINISHED, "Finished"),
+    ]
+
+    id = models.UUIDField(
+        primary_key=True, default=uuid.uuid4, editable=False
+    )
+    # Also the Celery task id, so the job can be polled through the result backend as well.
+
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE, null=True, blank=True
+    )
+    # Only the tasks of this author are deleted, all tasks when empty.
+
+    created_before = models.DateTimeField(null=True, blank=True)
+    # Only the tasks created before this date are deleted, regardless of age when empty.
+
+    chunk_size = models.PositiveIntegerField(default=1000)
+    # Number of tasks deleted per transaction.
+
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=PENDING
+    )
+    # Current state of the job.
+
+    total = models.PositiveIntegerField(null=True, blank=True)
+    # Number of matching tasks when the job started.
+
+    deleted = models.PositiveIntegerField(default=0)
+    # Number of tasks deleted so far.
+
+    last_id = models.BigIntegerField(default=0)
+    # Checkpoint: every matching task up to this ID has been deleted.
+
+    created_date = models.DateTimeField(auto_now_add=True)
+    # Date and time the job was requested.
+
+    updated_date = models.DateTimeField(auto_now=True)
+    # Date and time of the last checkpoint.
+
+    finished_date = models.DateTimeField(null=True, blank=True)
+    # Date and time the job completed.
+
+    def get_progress(self):
+        """
+        Returns the progress reported to the result backend and by the polling view.
+        """
+        return {
+            "job_id": str(self.pk),
+            "status": self.status,
+            "total": self.total,
+            "deleted": self.deleted,
+            "last_id": self.last_id,
+            "finished_date": self.finished_date.isoformat()
+            if self.finished_date
+            else None,
+        }
+
+    def __str__(self):
+        return f"Purge {self.pk} ({self.status})"
+
+
+# ======================================================================================================================
+@receiver(post_save, sender=ToDoApp)
+@receiver(post_delete, sender=ToDoApp)
+def invalidate_task_cache(sender, instance, signal, **kwargs):
+    # Makes every cached response that may contain this task stale
+    if signal is post_delete and deleting_in_bulk.get():
+        return
+    author_ids = {
+        instance.author_id,
+        getattr(instance, "_loaded_author_id", None),
+    } - {None}
+    bump_generations(author_ids=author_ids, task_ids=[instance.pk])
+
+
 # ======================================================================================================================
@@ -0,0 +1,203 @@
+import cProfile
+import hashlib
+import hmac
+import marshal
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+
+PROFILE_PARAM = "profile"  # '?profile=cprofile|stacks'
+PROFILE_HEADER = "HTTP_X_PROFILE"  # 'X-Profile: cprofile|stacks', same values
+SIGNATURE_HEADER = "HTTP_X_PROFILE_SIGNATURE"  # 'X-Profile-Signature: <timestamp>:<hmac>'
+SIGNATURE_MAX_AGE = 300  # Seconds a signature stays valid
+
+
+# ======================================================================================================================
+# Signed requests: 'X-Profile-Signature: <unix time>:<hex HMAC-SHA256 of "<unix time>:<METHOD>:<full path>">', keyed
+# with PROFILING_SECRET. The timestamp limits replays of a leaked header to SIGNATURE_MAX_AGE.
+
+
+def sign_profile_request(secret, method, full_path, timestamp=None):
+    """
+    Returns the X-Profile-Signature value for a request.
+    """
+    timestamp = int(time.time() if timestamp is None else timestamp)
+    digest = hmac.new(
+        secret.encode(), f"{timestamp}:{method}:{full_path}".encode(), hashlib.sha256
+    ).hexdigest()
+    return f"{timestamp}:{digest}"
+
+
+def has_valid_signature(request, secret):
+    value = request.META.get(SIGNATURE_HEADER, "")
+    timestamp, _, _ = value.partition(":")
+    if not secret or not timestamp.isdigit() or abs(time.time() - int(timestamp)) > SIGNATURE_MAX_AGE:
+        return False
+    expected = sign_profile_request(secret, request.method, request.get_full_path(), int(timestamp))
+    return hmac.compare_digest(value, expected)
+
+
+def is_superuser_request(request):
+    """
+    Returns True for superusers, logged in with a session or authenticated by the API authentication classes
+    (JWT, DRF token, Basic). Only called when a profile is asked for, so the lookup costs nothing to other requests.
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user.is_superuser
+    from rest_framework.exceptions import APIException
+    from rest_framework.request import Request
+    from rest_framework.settings import api_settings
+
+    drf_request = Request(
+        request, authenticators=[authentication() for authentication in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    )
+    try:
+        return drf_request.user.is_superuser
+    except APIException:  # Invalid, expired or revoked credentials
+        return False
+
+
+# ======================================================================================================================
+# Profilers: both run around one call and return the profile as bytes
+
+
+def run_cprofile(call):
+    """
+    Runs `call` under cProfile and returns its result with the stats in the `.prof` format (pstats / snakeviz).
+    """
+    profiler = cProfile.Profile()
+    result = profiler.runcall(call)
+    profiler.create_stats()
+    return result, marshal.dumps(profiler.stats)
+
+
+# StackSampler: Samples the stack of one thread at a fixed interval
+class StackSampler:
+    """
+    This sampler runs in its own thread and records the stack of the profiled thread every `interval` seconds,
+    so the profiled code runs at full speed. The result is in the collapsed format of flamegraph.pl and
+    speedscope: one 'outermost;...;innermost count' line per distinct stack.
+    """
+
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+
+    def run(self, call):
+        thread_id = threading.get_ident()
+        sampler = threading.Thread(target=self.sample, args=(thread_id,), daemon=True)
+        sampler.start()
+        try:
+            result = call()
+        finally:
+            self._stop.set()
+            sampler.join()
+        return result, self.get_collapsed().encode()
+
+    def sample(self, thread_id):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({shorten_path(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def get_collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def shorten_path(path):
+    # Keeps the package part of a path: '.../site-packages/django/core/handlers/base.py' -> 'django/core/...'
+    for marker in ("site-packages" + os.sep, str(settings.BASE_DIR) + os.sep):
+        if marker in path:
+            return path.split(marker, 1)[1]
+    return path
+
+
+# ======================================================================================================================
+# ProfilingMiddleware: Profiles single requests on demand and 1-in-N requests to disk
+class ProfilingMiddleware:
+    """
+    This middleware profiles a request when:
+      - it asks for it with '?profile=' or 'X-Profile:' ('cprofile' or 'stacks') and comes from a superuser or
+        carries a valid X-Profile-Signature: the response is then the profile itself, as a `.prof` file
+        (cProfile) or as collapsed stacks (sampling profiler), and the view's status is in X-Profiled-Status;
+      - it is drawn by PROFILING_SAMPLE_RATE (1 in N): its cProfile stats are written to
+        PROFILING_DIR/<view name>/, where `manage.py profiling_report` aggregates them per view.
+    Other requests only pay for a dictionary lookup and, with sampling on, one random number.
+    """
+
+    def __init__(self, get_response):
+        self.sample_rate = getattr(settings, "PROFILING_SAMPLE_RATE", 0)
+        self.allow_superusers = getattr(settings, "PROFILING_SUPERUSERS", True)
+        self.secret = getattr(settings, "PROFILING_SECRET", None)
+        if not (self.sample_rate or self.allow_superusers or self.secret):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = request.META.get(PROFILE_HEADER)
+        if mode is None and PROFILE_PARAM in request.META.get("QUERY_STRING", ""):
+            mode = request.GET.get(PROFILE_PARAM)  # The query string is only parsed when it may ask for a profile
+        if mode in ("cprofile", "stacks") and self.is_allowed(request):
+            return self.profile_request(request, mode)
+        if self.sample_rate and random.random() * self.sample_rate < 1:
+            return self.sample_request(request)
+        return self.get_response(request)
+
+    def is_allowed(self, request):
+        if self.secret and has_valid_signature(request, self.secret):
+            return True
+        return self.allow_superusers and is_superuser_request(request)
+
+    def profile_request(self, request, mode):
+        call = lambda: self.get_response(request)  # noqa: E731
+        if mode == "cprofile":
+            response, profile = run_cprofile(call)
+            content_type, extension = "application/octet-stream", "prof"
+        else:
+            sampler = StackSampler(getattr(settings, "PROFILING_SAMPLE_INTERVAL", 0.001))
+            response, profile = sampler.run(call)
+            content_type, extension = "text/plain; charset=utf-8", "collapsed"
+
+        result = HttpResponse(profile, content_type=content_type)
+        filename = f"{get_view_slug(request)}-{time.strftime('%Y%m%d-%H%M%S')}.{extension}"
+        result["Content-Disposition"] = f'attachment; filename="{filename}"'
+        result["X-Profiled-Status"] = str(response.status_code)
+        return result
+
+    def sample_request(self, request):
+        response, profile = run_cprofile(lambda: self.get_response(request))
+        directory = os.path.join(getattr(settings, "PROFILING_DIR", "profiles"), get_view_slug(request))
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{time.time():.6f}-{os.getpid()}.prof")
+        with open(path, "wb") as file:
+            file.write(profile)
+        return response
+
+
+def get_view_slug(request):
+    """
+    Returns the URL name of the request as a file name ('app:tasks-list' -> 'app.tasks-list').
+    """
+    match = getattr(request, "resolver_match", None)
+    return slugify_view_name(match.view_name if match is not None else "unresolved")
+
+
+def slugify_view_name(view_name):
+    return re.sub(r"[^\w.-]", ".", view_name)
+
+
+# ======================================================================================================================
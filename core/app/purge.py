@@ -0,0 +1,76 @@
+from django.db import transaction
+from django.utils import timezone
+from .models import PurgeJob, ToDoApp
+
+
+# ======================================================================================================================
+# TaskPurge: Deletes the tasks matching a PurgeJob in primary key order, one short transaction per chunk
+class TaskPurge:
+    """
+    This class runs a purge job chunk by chunk. Each chunk selects the next `chunk_size` matching ids after
+    the checkpoint, deletes them (Django's collector only loads that chunk) and moves the checkpoint, all in
+    one transaction, so database locks are held briefly and a restarted job never deletes or skips a chunk twice.
+    """
+
+    def __init__(self, job, on_progress=None):
+        self.job = job
+        self.on_progress = on_progress  # Called with the job after every chunk
+
+    def get_queryset(self):
+        """
+        Returns the tasks matching the criteria of the job.
+        """
+        queryset = ToDoApp.objects.all()
+        if self.job.author_id is not None:
+            queryset = queryset.filter(author_id=self.job.author_id)
+        if self.job.created_before is not None:
+            queryset = queryset.filter(
+                created_date__lt=self.job.created_before
+            )
+        return queryset
+
+    def run(self):
+        """
+        Deletes every remaining chunk and returns the finished job.
+        """
+        job = self.job
+        if job.status == PurgeJob.FINISHED:
+            return job
+        if job.total is None:
+            job.total = self.get_queryset().count()
+        job.status = PurgeJob.RUNNING
+        job.save(update_fields=["status", "total", "updated_date"])
+
+        while self.delete_chunk():
+            if self.on_progress is not None:
+                self.on_progress(job)
+
+        job.status = PurgeJob.FINISHED
+        job.finished_date = timezone.now()
+        job.save(
+            update_fields=["status", "finished_date", "updated_date"]
+        )
+        return job
+
+    def delete_chunk(self):
+        """
+        Deletes the next chunk and saves the checkpoint. Returns False when nothing was left.
+        """
+        job = self.job
+        with transaction.atomic():
+            ids = list(
+                self.get_queryset()
+                .filter(id__gt=job.last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[: job.chunk_size]
+            )
+            if not ids:
+                return False
+            ToDoApp.objects.filter(id__in=ids).delete()
+            job.last_id = ids[-1]
+            job.deleted += len(ids)
+            job.save(update_fields=["last_id", "deleted", "updated_date"])
+        return True
+
+
+# ======================================================================================================================
@@ -0,0 +1,463 @@
+import asyncio
+import json
+import logging
+import os
+import resource
+from importlib import import_module
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlsplit
+from http.cookies import SimpleCookie
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http.request import split_domain_port, validate_host
+
+logger = logging.getLogger(__name__)
+
+
+# ======================================================================================================================
+# Push channel: every committed task write publishes a `tasks_changed` event carrying the new sync cursor
+# of the author (see SyncCounter). Connected clients receive it over SSE or WebSocket and fetch the changes
+# from /api/v1/tasks/sync/?since=<their cursor>, so an event never has to carry the tasks themselves.
+
+
+# ======================================================================================================================
+# ConnectionHub: The open push connections of this process
+class ConnectionHub:
+    """
+    This class keeps one bounded queue per open connection, grouped by user. An idle connection costs a queue
+    and two suspended tasks, so one process holds thousands of them. Events only carry the latest cursor,
+    so a full queue drops its oldest event instead of blocking the publisher.
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self.queues = {}  # User ID -> set of the queues of its connections
+        self.loop = None  # Event loop serving the connections
+
+    def subscribe(self, user_id):
+        self.loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(self.queue_size)
+        self.queues.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        queues = self.queues.get(user_id, set())
+        queues.discard(queue)
+        if not queues:
+            self.queues.pop(user_id, None)
+
+    def dispatch(self, user_id, event):
+        """
+        Puts the event in the queue of every connection of the user. Must run in the event loop.
+        """
+        for queue in self.queues.get(user_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def dispatch_threadsafe(self, user_id, event):
+        """
+        Same as dispatch, from any thread (Django views and signals run outside the event loop).
+        """
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return  # No connection was ever opened in this process
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self.dispatch(user_id, event)
+        else:
+            loop.call_soon_threadsafe(self.dispatch, user_id, event)
+
+    def get_stats(self):
+        return {
+            "pid": os.getpid(),
+            "connections": sum(
+                len(queues) for queues in self.queues.values()
+            ),
+            "users": len(self.queues),
+            "max_rss_kb": resource.getrusage(
+                resource.RUSAGE_SELF
+            ).ru_maxrss,
+        }
+
+
+# ======================================================================================================================
+# InProcessBroker: Delivers events to the connections of the publishing process only
+class InProcessBroker:
+    """
+    This broker is used when REDIS_URL is not set. It only reaches clients connected to the process
+    where the task was written, which is enough for a single ASGI process serving both.
+    """
+
+    def __init__(self, hub):
+        self.hub = hub
+
+    def publish(self, user_id, event):
+        self.hub.dispatch_threadsafe(user_id, event)
+
+    async def start(self):
+        """
+        Starts receiving events for this process. Called before every subscription, must be idempotent.
+        """
+
+
+# ======================================================================================================================
+# RedisBroker: Fans events out to every process through Redis pub/sub
+class RedisBroker(InProcessBroker):
+    """
+    This broker publishes to one Redis channel per user. Each ASGI process holds a single pattern
+    subscription, whatever its number of connections, and dispatches the messages to its local hub.
+    """
+
+    channel_prefix = "tasks:events:"  # Followed by the user ID
+
+    def __init__(self, hub, url):
+        super().__init__(hub)
+        self.url = url
+        self.client = None  # Synchronous client used by publishers
+        self.listener = None  # Task reading the subscription
+
+    def publish(self, user_id, event):
+        import redis
+
+        if self.client is None:
+            self.client = redis.Redis.from_url(self.url)
+        self.client.publish(
+            f"{self.channel_prefix}{user_id}", json.dumps(event)
+        )
+
+    async def start(self):
+        if self.listener is None or self.listener.done():
+            self.listener = asyncio.ensure_future(self.listen())
+
+    async def listen(self):
+        import redis.asyncio
+
+        while True:
+            try:
+                client = redis.asyncio.Redis.from_url(self.url)
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                await pubsub.psubscribe(f"{self.channel_prefix}*")
+                async for message in pubsub.listen():
+                    user_id = int(message["channel"].rsplit(b":", 1)[-1])
+                    self.hub.dispatch(user_id, json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Task event subscription lost, reconnecting")
+                await asyncio.sleep(1)
+
+
+# ======================================================================================================================
+# Module level broker of the process
+
+_broker = None
+
+
+def get_broker():
+    """
+    Returns the broker of this process: Redis pub/sub when REDIS_URL is set, otherwise in-process delivery.
+    """
+    global _broker
+    if _broker is None:
+        hub = ConnectionHub(
+            queue_size=getattr(settings, "TASK_PUSH_QUEUE_SIZE", 100)
+        )
+        url = getattr(settings, "REDIS_URL", None)
+        _broker = RedisBroker(hub, url) if url else InProcessBroker(hub)
+    return _broker
+
+
+def publish_task_change(author_id, cursor):
+    """
+    Notifies the connections of the author that its tasks changed up to `cursor`. Runs after commit,
+    so a failure is logged instead of failing a write that already happened.
+    """
+    try:
+        get_broker().publish(
+            author_id, {"event": "tasks_changed", "cursor": cursor}
+        )
+    except Exception:
+        logger.exception("Could not publish the task change event")
+
+
+# ======================================================================================================================
+# Authentication of push connections: a JWT access token (Authorization header, or '?token=' since
+# browsers cannot set headers on EventSource and WebSocket), otherwise the session cookie.
+# Query strings end up in access logs: default.conf logs the push paths with the token redacted, and the
+# push service runs without its own access log. A connection authenticated by the session cookie is refused
+# when a browser opens it from another site (its Origin is neither this host nor a trusted origin), since a
+# cross-site WebSocket would otherwise carry the cookie of the user.
+
+
+def get_token_user(token):
+    from rest_framework.exceptions import AuthenticationFailed
+    from rest_framework_simplejwt.exceptions import InvalidToken
+    from accounts.authentication import CachedJWTAuthentication
+
+    # Same checks as the API: signature, expiry, revocation, active user
+    authentication = CachedJWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+def get_active_user(token, session_key):
+    from django.contrib.auth import get_user
+
+    if token:
+        return get_token_user(token)
+    if session_key:
+        engine = import_module(settings.SESSION_ENGINE)
+        user = get_user(
+            SimpleNamespace(session=engine.SessionStore(session_key))
+        )
+        if user.is_authenticated:
+            return user
+    return None
+
+
+def is_trusted_origin(origin, host):
+    """
+    Returns True when `origin` is the push service itself (the allowed host of the request) or a trusted origin.
+    """
+    trusted = [
+        *getattr(settings, "CORS_ALLOWED_ORIGINS", ()),
+        *getattr(settings, "CSRF_TRUSTED_ORIGINS", ()),
+    ]
+    if origin in trusted:
+        return True
+    allowed_hosts = settings.ALLOWED_HOSTS
+    if settings.DEBUG and not allowed_hosts:
+        allowed_hosts = [".localhost", "127.0.0.1", "[::1]"]  # As HttpRequest.get_host()
+    domain = split_domain_port(host)[0]
+    return bool(domain) and urlsplit(origin).hostname == domain and validate_host(domain, allowed_hosts)
+
+
+async def authenticate(scope):
+    """
+    Returns the user opening the connection, or None.
+    """
+    headers = dict(scope.get("headers") or [])
+    token = None
+    authorization = headers.get(b"authorization", b"").decode("latin1")
+    if authorization.startswith("Bearer "):
+        token = authorization[len("Bearer ") :]
+    else:
+        query = parse_qs(scope.get("query_string", b"").decode("latin1"))
+        token = query.get("token", [None])[0]
+
+    cookies = SimpleCookie()
+    cookies.load(headers.get(b"cookie", b"").decode("latin1"))
+    session = cookies.get(settings.SESSION_COOKIE_NAME)
+
+    if not token:
+        origin = headers.get(b"origin", b"").decode("latin1")
+        if session is None or (
+            origin
+            and not is_trusted_origin(
+                origin, headers.get(b"host", b"").decode("latin1")
+            )
+        ):
+            return None
+    return await sync_to_async(get_active_user)(
+        token, session.value if session else None
+    )
+
+
+def get_current_cursor(user_id):
+    from .models import SyncCounter
+
+    return (
+        SyncCounter.objects.filter(author_id=user_id)
+        .values_list("value", flat=True)
+        .first()
+        or 0
+    )
+
+
+# ======================================================================================================================
+# PushApplication: The ASGI application serving push connections in front of Django
+class PushApplication:
+    """
+    This ASGI application streams the task change events of the connected user over Server-Sent Events
+    (TASK_PUSH_SSE_PATH) or WebSocket (TASK_PUSH_WEBSOCKET_PATH), reports the connections of the process
+    (TASK_PUSH_STATS_PATH) and hands every other request to Django. The first event of a connection carries
+    the current cursor, so a client reconnecting after a gap knows right away whether to sync.
+    """
+
+    def __init__(self, application, broker=None):
+        self.application = application  # Django's ASGI application
+        self.broker = broker
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path")
+        if scope["type"] == "lifespan":
+            return await self.lifespan(receive, send)
+        if scope["type"] == "websocket":
+            if path == settings.TASK_PUSH_WEBSOCKET_PATH:
+                return await self.websocket_events(scope, receive, send)
+            return await send({"type": "websocket.close"})
+        if path == settings.TASK_PUSH_SSE_PATH:
+            return await self.stream_events(scope, receive, send)
+        if path == settings.TASK_PUSH_STATS_PATH:
+            return await self.send_stats(scope, send)
+        return await self.application(scope, receive, send)
+
+    def get_broker(self):
+        if self.broker is None:
+            self.broker = get_broker()
+        return self.broker
+
+    async def stream_events(self, scope, receive, send):
+        """
+        Serves a Server-Sent Events stream, with a keepalive comment every TASK_PUSH_KEEPALIVE seconds.
+        """
+        user = await authenticate(scope)
+        if user is None:
+            return await self.send_json(
+                send,
+                {"detail": "Authentication credentials were not provided."},
+                status=401,
+            )
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no"),  # Disables proxy buffering (nginx)
+                ],
+            }
+        )
+
+        async def write(event):
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": (
+                        f"id: {event['cursor']}\n"
+                        f"event: {event['event']}\n"
+                        f"data: {json.dumps(event)}\n\n"
+                    ).encode(),
+                    "more_body": True,
+                }
+            )
+
+        async def keepalive():
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": b": keepalive\n\n",
+                    "more_body": True,
+                }
+            )
+
+        await self.serve(user.pk, receive, write, keepalive)
+
+    async def websocket_events(self, scope, receive, send):
+        """
+        Serves a WebSocket sending every event as a JSON text message. Messages from the client are ignored.
+        """
+        message = await receive()
+        if message["type"] != "websocket.connect":
+            return
+        user = await authenticate(scope)
+        if user is None:
+            return await send({"type": "websocket.close", "code": 4401})
+        await send({"type": "websocket.accept"})
+
+        async def write(event):
+            await send({"type": "websocket.send", "text": json.dumps(event)})
+
+        await self.serve(user.pk, receive, write)
+
+    async def serve(self, user_id, receive, write, keepalive=None):
+        """
+        Writes the events of the user until the client disconnects.
+        """
+        broker = self.get_broker()
+        await broker.start()
+        queue = broker.hub.subscribe(user_id)
+        disconnected = asyncio.ensure_future(self.wait_disconnect(receive))
+        event = None
+        try:
+            cursor = await sync_to_async(get_current_cursor)(user_id)
+            await write({"event": "tasks_changed", "cursor": cursor})
+            while not disconnected.done():
+                if event is None:
+                    event = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait(
+                    {event, disconnected},
+                    timeout=settings.TASK_PUSH_KEEPALIVE,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if event in done:
+                    await write(event.result())
+                    event = None
+                elif not done and keepalive is not None:
+                    await keepalive()
+        finally:
+            broker.hub.unsubscribe(user_id, queue)
+            for task in (event, disconnected):
+                if task is not None:
+                    task.cancel()
+
+    @staticmethod
+    async def wait_disconnect(receive):
+        while True:
+            message = await receive()
+            if message["type"] in ("http.disconnect", "websocket.disconnect"):
+                return
+
+    async def send_stats(self, scope, send):
+        """
+        Returns the connection count of the process answering the request (used by the push load test).
+        Only superusers see it: it reveals the pid and memory of the process.
+        """
+        user = await authenticate(scope)
+        if user is None:
+            return await self.send_json(
+                send,
+                {"detail": "Authentication credentials were not provided."},
+                status=401,
+            )
+        if not user.is_superuser:
+            return await self.send_json(
+                send,
+                {"detail": "You do not have permission to perform this action."},
+                status=403,
+            )
+        await self.send_json(send, self.get_broker().hub.get_stats())
+
+    @staticmethod
+    async def send_json(send, data, status=200):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        await send(
+            {"type": "http.response.body", "body": json.dumps(data).encode()}
+        )
+
+    @staticmethod
+    async def lifespan(receive, send):
+        # Django's ASGI handler does not speak the lifespan protocol, so it is acknowledged here
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                return await send({"type": "lifespan.shutdown.complete"})
+
+
+# ======================================================================================================================
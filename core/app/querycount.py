@@ -0,0 +1,117 @@
+import logging
+from contextlib import ExitStack, contextmanager
+from time import perf_counter
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+# ======================================================================================================================
+# QueryCounter: Counts the queries (and their time) run on every database connection
+class QueryCounter:
+    """
+    This context manager installs an execute wrapper on every connection while it is active. Unlike
+    CaptureQueriesContext it does not need DEBUG, so it can run in the middleware of any deployment.
+    """
+
+    def __init__(self, record=False):
+        self.record = record  # Whether the SQL of every query is kept (for failure messages)
+        self.count = 0
+        self.duration = 0.0  # Seconds spent in the database
+        self.queries = []
+        self._stack = None
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += perf_counter() - started
+            if self.record:
+                self.queries.append(sql)
+
+
+# ======================================================================================================================
+# Query budgets: the queries one request of an endpoint may run, declared in settings.QUERY_BUDGETS
+# by "<METHOD> <view name>" (e.g. "GET app:tasks-list").
+
+
+def get_query_budget(method, view_name):
+    """
+    Returns the query budget of an endpoint, or None when none is declared.
+    """
+    return getattr(settings, "QUERY_BUDGETS", {}).get(f"{method} {view_name}")
+
+
+@contextmanager
+def query_budget(method, view_name):
+    """
+    Fails when the requests sent inside the block run more queries than the budget of the endpoint:
+
+        with query_budget("GET", "app:tasks-list"):
+            client.get(reverse("app:tasks-list"))
+    """
+    budget = get_query_budget(method, view_name)
+    if budget is None:
+        raise AssertionError(f"No query budget is declared for '{method} {view_name}' in QUERY_BUDGETS.")
+    with QueryCounter(record=True) as counter:
+        yield counter
+    if counter.count > budget:
+        queries = "\n".join(f"{index}. {sql}" for index, sql in enumerate(counter.queries, 1))
+        raise AssertionError(
+            f"'{method} {view_name}' ran {counter.count} queries, its budget is {budget}:\n{queries}"
+        )
+
+
+# ======================================================================================================================
+# QueryCountMiddleware: Reports the queries and DB time of each request in response headers
+class QueryCountMiddleware:
+    """
+    This middleware adds X-DB-Queries, X-DB-Time (milliseconds) and a Server-Timing 'db' entry to every response,
+    and logs a warning when a request goes over the budget of its endpoint. It is only installed when
+    QUERY_COUNT_HEADERS is on (by default in DEBUG). Queries run while a streaming response is consumed
+    happen after the middleware and are not counted.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "QUERY_COUNT_HEADERS", False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryCounter() as counter:
+            response = self.get_response(request)
+
+        milliseconds = counter.duration * 1000
+        response["X-DB-Queries"] = str(counter.count)
+        response["X-DB-Time"] = f"{milliseconds:.2f}"
+        timing = f'db;dur={milliseconds:.2f};desc="{counter.count} queries"'
+        if response.has_header("Server-Timing"):
+            timing = f"{response['Server-Timing']}, {timing}"
+        response["Server-Timing"] = timing
+
+        match = getattr(request, "resolver_match", None)
+        if match is not None:
+            budget = get_query_budget(request.method, match.view_name)
+            if budget is not None and counter.count > budget:
+                response["X-DB-Query-Budget"] = str(budget)
+                logger.warning(
+                    "%s %s ran %d queries, over its budget of %d",
+                    request.method, match.view_name, counter.count, budget,
+                )
+        return response
+
+
+# ======================================================================================================================
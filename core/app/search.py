@@ -0,0 +1,263 @@
+import re
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.module_loading import import_string
+from .models import ToDoApp
+
+
+# ======================================================================================================================
+# BaseSearchBackend: The interface every task search backend implements
+class BaseSearchBackend:
+    """
+    A search backend filters a task queryset by a free text query, ranks the matches and can add highlight snippets.
+    A task matches when every term is in its content, or every term is in the email of its author.
+    Backends are selected with the TASK_SEARCH_BACKEND setting, or by database engine when it is not set.
+    """
+
+    # Private use characters around every matched term in snippets: the snippet is raw task content, it is escaped
+    # before they are turned into <mark> tags (see render_highlight())
+    highlight_start = "\ue000"
+    highlight_stop = "\ue001"
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def install(self):
+        """
+        Creates the database objects the backend needs. Must be idempotent, it runs after every migrate.
+        """
+
+    def search(self, queryset, query, highlight=False):
+        """
+        Returns the tasks matching `query`, annotated with `search_rank` (higher is better) and,
+        when `highlight` is set, with `search_snippet`.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def get_terms(query):
+        """
+        Splits a free text query into words, dropping any search engine syntax.
+        """
+        return re.findall(r"\w+", query)
+
+
+# ======================================================================================================================
+# SimpleSearchBackend: A LIKE based fallback for database engines without a full-text backend
+class SimpleSearchBackend(BaseSearchBackend):
+    """
+    This backend matches every term with `icontains`. It scans the table and does not rank, so it is only a fallback.
+    """
+
+    def search(self, queryset, query, highlight=False):
+        terms = self.get_terms(query)
+        queryset = queryset.filter(
+            Q(*[Q(content__icontains=term) for term in terms])
+            | Q(*[Q(author__email__icontains=term) for term in terms])
+        )
+        queryset = queryset.annotate(search_rank=Value(0.0))
+        if highlight:
+            queryset = queryset.annotate(search_snippet=Value(None))
+        return queryset
+
+
+# ======================================================================================================================
+# SQLiteSearchBackend: Full-text search with an SQLite FTS5 index
+class SQLiteSearchBackend(BaseSearchBackend):
+    """
+    This backend keeps an FTS5 table of the task contents and author emails in sync with app_todoapp and the users
+    through triggers, so every insert, update and delete (including bulk ones) is reflected immediately.
+    Searches join the FTS5 table once: the rank and the snippet come from the matched row, not from a subquery per task.
+    """
+
+    index_table = "app_todoapp_fts"  # Name of the FTS5 virtual table
+    snippet_tokens = 16  # Number of tokens in a highlight snippet
+
+    def install(self):
+        table = ToDoApp._meta.db_table
+        users = ToDoApp._meta.get_field("author").related_model._meta.db_table
+        index = self.index_table
+        triggers = ("insert", "delete", "update", "author")
+        author = f"(SELECT email FROM {users} WHERE id = new.author_id)"
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = %s",
+                [index],
+            )
+            row = cursor.fetchone()
+            if row is not None and "author" not in row[0]:
+                # Index of the contents only (before author emails were searched): replaced below
+                for trigger in triggers:
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {index}_{trigger}")
+                cursor.execute(f"DROP TABLE {index}")
+
+            cursor.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+                [f"{index}_%"],
+            )
+            complete = cursor.fetchone()[0] == len(triggers)
+
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5(content, author)"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {index}_insert AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {index}(rowid, content, author) VALUES (new.id, new.content, {author}); "
+                f"END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {index}_delete AFTER DELETE ON {table} BEGIN "
+                f"DELETE FROM {index} WHERE rowid = old.id; "
+                f"END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {index}_update AFTER UPDATE OF content, author_id ON {table} BEGIN "
+                f"UPDATE {index} SET content = new.content, author = {author} WHERE rowid = new.id; "
+                f"END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {index}_author AFTER UPDATE OF email ON {users} BEGIN "
+                f"UPDATE {index} SET author = new.email "
+                f"WHERE rowid IN (SELECT id FROM {table} WHERE author_id = new.id); "
+                f"END"
+            )
+
+            # Rows written while the triggers were missing (a new index, or a table rebuilt by a
+            # migration, which drops its triggers) are only picked up by a full rebuild.
+            if not complete:
+                cursor.execute(f"DELETE FROM {index}")
+                cursor.execute(
+                    f"INSERT INTO {index}(rowid, content, author) "
+                    f"SELECT task.id, task.content, user.email FROM {table} AS task "
+                    f"JOIN {users} AS user ON user.id = task.author_id"
+                )
+
+    def search(self, queryset, query, highlight=False):
+        terms = self.get_terms(query)
+        if not terms:
+            return queryset.none()
+
+        # Quoting every term turns FTS5 operators typed by the user into plain words
+        phrase = " ".join(f'"{term}"' for term in terms)
+        match = f"content : ({phrase}) OR author : ({phrase})"
+        index = self.index_table
+
+        queryset = queryset.extra(
+            tables=[index],
+            where=[
+                f'{index}.rowid = "{ToDoApp._meta.db_table}"."id"',
+                f"{index} MATCH %s",
+            ],
+            params=[match],
+        ).annotate(search_rank=RawSQL(f"-bm25({index})", []))
+        if highlight:
+            queryset = queryset.annotate(
+                search_snippet=RawSQL(
+                    f"snippet({index}, 0, %s, %s, '...', %s)",
+                    [
+                        self.highlight_start,
+                        self.highlight_stop,
+                        self.snippet_tokens,
+                    ],
+                )
+            )
+        return queryset.order_by("-search_rank", "-id")
+
+
+# ======================================================================================================================
+# PostgreSQLSearchBackend: Full-text search with a tsvector GIN expression index
+class PostgreSQLSearchBackend(BaseSearchBackend):
+    """
+    This backend searches `to_tsvector(content)` through a GIN index on the same expression,
+    which PostgreSQL keeps current on every insert, update and delete.
+    """
+
+    config = "english"  # Text search configuration used for both the index and the queries
+    index_name = "todo_content_search_idx"  # Name of the GIN index
+
+    def install(self):
+        with self.connection.cursor() as cursor:
+            # Must match the expression django.contrib.postgres' SearchVector compiles to
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.index_name} ON {ToDoApp._meta.db_table} "
+                f"USING GIN (to_tsvector(%s::regconfig, COALESCE(content, '')))",
+                [self.config],
+            )
+
+    def search(self, queryset, query, highlight=False):
+        from django.contrib.postgres.search import (
+            SearchHeadline,
+            SearchQuery,
+            SearchRank,
+            SearchVector,
+        )
+
+        vector = SearchVector("content", config=self.config)
+        search_query = SearchQuery(query, config=self.config)
+        authors = ToDoApp._meta.get_field("author").related_model.objects.filter(
+            *[Q(email__icontains=term) for term in self.get_terms(query)]
+        )
+
+        queryset = (
+            queryset.alias(search_vector=vector)
+            .filter(Q(search_vector=search_query) | Q(author__in=authors.values("id")))
+            .annotate(search_rank=SearchRank(vector, search_query))
+        )
+        if highlight:
+            queryset = queryset.annotate(
+                search_snippet=SearchHeadline(
+                    "content",
+                    search_query,
+                    config=self.config,
+                    start_sel=self.highlight_start,
+                    stop_sel=self.highlight_stop,
+                )
+            )
+        return queryset.order_by("-search_rank", "-id")
+
+
+# ======================================================================================================================
+# Default backend for every database engine
+SEARCH_BACKENDS = {
+    "sqlite": SQLiteSearchBackend,
+    "postgresql": PostgreSQLSearchBackend,
+}
+
+
+def get_search_backend(using="default"):
+    """
+    Returns the search backend configured by TASK_SEARCH_BACKEND, or the default one for the database engine.
+    """
+    connection = connections[using]
+    backend_path = getattr(settings, "TASK_SEARCH_BACKEND", None)
+    if backend_path:
+        backend_class = import_string(backend_path)
+    else:
+        backend_class = SEARCH_BACKENDS.get(
+            connection.vendor, SimpleSearchBackend
+        )
+    return backend_class(connection)
+
+
+def render_highlight(snippet):
+    """
+    Returns a snippet as HTML: its content escaped, the matched terms in <mark> tags.
+    """
+    return (
+        escape(snippet)
+        .replace(BaseSearchBackend.highlight_start, "<mark>")
+        .replace(BaseSearchBackend.highlight_stop, "</mark>")
+    )
+
+
+def install_search_backend(sender, using="default", **kwargs):
+    """
+    post_migrate receiver creating (or repairing) the search index of the migrated database.
+    """
+    get_search_backend(using).install()
+
+
+# ======================================================================================================================
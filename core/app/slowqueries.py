@@ -0,0 +1,211 @@
+import datetime
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import re
+import sys
+import traceback
+from contextvars import ContextVar
+from time import perf_counter
+from celery.signals import task_postrun, task_prerun
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+
+# What issued the running queries: a request (its URL name is known once resolved) or a Celery task name
+current_source = ContextVar("slow_query_source", default=None)
+
+_logger = None
+
+
+# ======================================================================================================================
+# SQL normalization: queries differing only by their values share one normalized form (and fingerprint),
+# so the report can add them up.
+
+NORMALIZERS = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),  # String literals
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),  # Numbers (LIMIT 21, inlined ids)
+    (re.compile(r"%s"), "?"),  # Placeholders
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?+)"),  # IN (?, ?, ...) of any length
+    (re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+"), "(?+)"),  # VALUES (...), (...) of any number of rows
+    (re.compile(r"\s+"), " "),
+]
+
+
+def normalize_sql(sql):
+    """
+    Returns the SQL with its values replaced by '?' and lists collapsed, e.g. 'WHERE id IN (?+)'.
+    """
+    for pattern, replacement in NORMALIZERS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def get_fingerprint(normalized):
+    return hashlib.md5(normalized.encode()).hexdigest()[:12]
+
+
+def redact_params(params, many=False):
+    """
+    Returns the parameters as their types (and lengths): the values may be emails, passwords or tokens.
+    """
+    if many:
+        params = list(params)
+        return {"rows": len(params), "first": redact_params(params[0]) if params else []}
+    if isinstance(params, dict):
+        return {key: redact_value(value) for key, value in params.items()}
+    return [redact_value(value) for value in params or ()]
+
+
+def redact_value(value):
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (str, bytes, memoryview)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def get_stack(limit):
+    """
+    Returns the innermost `limit` frames of the project's own code (no Django, DRF or library frames).
+    """
+    root = str(settings.BASE_DIR) + os.sep
+    frames = [
+        f"{frame.filename[len(root):]}:{frame.lineno} in {frame.name}"
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(root) and "site-packages" not in frame.filename
+        and not frame.filename.endswith(os.path.join("app", "slowqueries.py"))
+    ]
+    return frames[-limit:]
+
+
+def get_source():
+    source = current_source.get()
+    if source is None:
+        return "manage.py " + sys.argv[1] if len(sys.argv) > 1 and sys.argv[0].endswith("manage.py") else "-"
+    if isinstance(source, str):
+        return source
+    match = getattr(source, "resolver_match", None)  # A request
+    return match.view_name if match is not None else source.path
+
+
+def get_logger():
+    """
+    Returns the logger writing one JSON record per line to SLOW_QUERY_LOG, rotated at SLOW_QUERY_LOG_MAX_BYTES.
+    With several processes, a line may be lost when two of them rotate at the same time.
+    """
+    global _logger
+    if _logger is None:
+        path = settings.SLOW_QUERY_LOG
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(
+            path,
+            maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+            backupCount=settings.SLOW_QUERY_LOG_BACKUPS,
+            encoding="utf-8",
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger = logging.getLogger(__name__)
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        _logger = logger
+    return _logger
+
+
+# ======================================================================================================================
+# SlowQueryRecorder: Execute wrapper logging the queries slower than a threshold
+class SlowQueryRecorder:
+    """
+    This wrapper times every query. The ones slower than `threshold_ms` are written to the slow query log with their
+    normalized SQL, redacted parameters, duration, source (URL name or task) and the project's frames of the stack.
+    Faster queries cost two perf_counter() calls.
+    """
+
+    def __init__(self, threshold_ms, stack_depth=8, log=None):
+        self.threshold = threshold_ms / 1000
+        self.stack_depth = stack_depth
+        self.log = log  # Callable taking one record (defaults to the JSONL log)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = perf_counter() - started
+            if duration >= self.threshold:
+                self.record(sql, params, many, duration, context)
+
+    def record(self, sql, params, many, duration, context):
+        normalized = normalize_sql(sql)
+        record = {
+            "time": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "duration_ms": round(duration * 1000, 3),
+            "fingerprint": get_fingerprint(normalized),
+            "sql": normalized,
+            "params": redact_params(params, many),
+            "many": many,
+            "database": context["connection"].alias,
+            "source": get_source(),
+            "stack": get_stack(self.stack_depth),
+        }
+        if self.log is not None:
+            self.log(record)
+        else:
+            get_logger().info(json.dumps(record))
+
+
+def install_recorder(sender, connection, **kwargs):
+    """
+    Adds the recorder to every new database connection (connection_created signal).
+    """
+    connection.execute_wrappers.append(
+        SlowQueryRecorder(settings.SLOW_QUERY_THRESHOLD_MS, settings.SLOW_QUERY_STACK_DEPTH)
+    )
+
+
+def install():
+    # Called from AppConfig.ready(): nothing is installed without a threshold
+    if getattr(settings, "SLOW_QUERY_THRESHOLD_MS", None) is not None:
+        connection_created.connect(install_recorder, dispatch_uid="slow_query_recorder")
+
+
+# ======================================================================================================================
+# SlowQueryMiddleware: Makes the request the source of the queries it runs
+class SlowQueryMiddleware:
+    """
+    This middleware only sets `current_source`: the URL name is read from the request when a slow query is logged.
+    """
+
+    def __init__(self, get_response):
+        if getattr(settings, "SLOW_QUERY_THRESHOLD_MS", None) is None:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = current_source.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            current_source.reset(token)
+
+
+_task_tokens = {}
+
+
+@task_prerun.connect
+def set_task_source(task_id=None, task=None, **kwargs):
+    if task is not None:
+        _task_tokens[task_id] = current_source.set(f"celery:{task.name}")
+
+
+@task_postrun.connect
+def reset_task_source(task_id=None, **kwargs):
+    token = _task_tokens.pop(task_id, None)
+    if token is not None:
+        current_source.reset(token)
+
+
+# ======================================================================================================================
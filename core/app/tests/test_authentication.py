@@ -0,0 +1,131 @@
+import base64
+from datetime import timedelta
+from django.core.management import call_command
+from django.utils import timezone
+from prometheus_client import REGISTRY
+from rest_framework.authtoken.models import Token
+from django.shortcuts import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.authentication import clear_local, get_cached_user
+from accounts.models import User
+import accounts.authentication
+from app.models import ToDoApp
+from app.querycount import QueryCounter
+import pytest
+
+# ======================================================================================================================
+@pytest.fixture
+def user():
+    user = User.objects.create_user(email='admin@admin.com', password='m1387m2008m', is_staff=False)
+    return user
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+    return client
+def basic(email, password):
+    return "Basic " + base64.b64encode(f"{email}:{password}".encode()).decode()
+def user_queries(counter):
+    return [query for query in counter.queries if 'FROM "accounts_user"' in query or '"authtoken_token"' in query]
+def lookups(result):
+    return REGISTRY.get_sample_value("todoapp_cache_lookups_total", {"kind": "auth_token", "result": result}) or 0
+# ======================================================================================================================
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+    def test_cached_user_makes_no_query(self, client, user):
+        ToDoApp.objects.create(author=user, content="task")
+        with QueryCounter(record=True) as first:
+            assert client.get(reverse("app:tasks-list")).status_code == 200
+        with QueryCounter(record=True) as second:
+            response = client.get(reverse("app:tasks-list") + "?page_size=5")
+        assert len(user_queries(first)) == 1
+        assert user_queries(second) == []
+        assert response.data["total_objects"] == 1
+    def test_shared_cache_serves_other_processes(self, user):
+        get_cached_user(user.pk)
+        clear_local()  # As in another worker
+        with QueryCounter() as counter:
+            cached = get_cached_user(user.pk)
+        assert counter.count == 0
+        assert (cached.pk, cached.email, cached.is_staff, cached.is_verified) == (user.pk, user.email, False, False)
+    def test_deactivated_user_is_rejected(self, client, user):
+        assert client.get(reverse("app:tasks-list")).status_code == 200
+        user.is_active = False
+        user.save()
+        response = client.get(reverse("app:tasks-list"))
+        assert response.status_code == 401
+        assert response.data["code"] == "user_inactive"
+    def test_deleted_user_is_rejected(self, client, user):
+        assert client.get(reverse("app:tasks-list")).status_code == 200
+        user.delete()
+        assert client.get(reverse("app:tasks-list")).data["code"] == "user_not_found"
+    def test_password_is_loaded_when_needed(self, client, user):
+        cached = get_cached_user(user.pk)
+        assert cached.check_password('m1387m2008m')
+        cached.set_password('n1387n2008n')
+        cached.save()
+        assert User.objects.get(pk=user.pk).check_password('n1387n2008n')
+        assert get_cached_user(user.pk).email == user.email
+@pytest.mark.django_db
+class TestCachedBasicAuthentication:
+    def test_verified_pair_skips_the_hasher(self, user, monkeypatch):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=basic('admin@admin.com', 'm1387m2008m'))
+        assert client.get(reverse("app:tasks-list")).status_code == 200
+        monkeypatch.setattr(User, "check_password", lambda *args: pytest.fail("password hashed again"))
+        with QueryCounter(record=True) as counter:
+            assert client.get(reverse("app:tasks-list") + "?page_size=5").status_code == 200
+        assert user_queries(counter) == []
+    def test_wrong_password_is_not_cached(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=basic('admin@admin.com', 'wrong'))
+        assert client.get(reverse("app:tasks-list")).status_code == 401
+        assert client.get(reverse("app:tasks-list")).status_code == 401
+    def test_password_change_evicts_the_old_pair(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=basic('admin@admin.com', 'm1387m2008m'))
+        response = client.put(reverse("accounts:api-v1:change-password"), {
+            "old_password": 'm1387m2008m', "new_password": 'n1387n2008n', "password_confirmation": 'n1387n2008n'})
+        assert response.status_code == 200
+        assert client.get(reverse("app:tasks-list")).status_code == 401
+        client.credentials(HTTP_AUTHORIZATION=basic('admin@admin.com', 'n1387n2008n'))
+        assert client.get(reverse("app:tasks-list")).status_code == 200
+    def test_pairs_are_never_kept_in_plaintext(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=basic('admin@admin.com', 'm1387m2008m'))
+        client.get(reverse("app:tasks-list"))
+        keys = list(accounts.authentication._credentials._entries)
+        assert len(keys) == 1 and b"m1387m2008m" not in keys[0]
+@pytest.mark.django_db
+class TestCachedTokenAuthentication:
+    def test_token_and_user_come_from_the_cache(self, user):
+        client = APIClient()
+        response = client.post(reverse("accounts:api-v1:login"), {"email": 'admin@admin.com', "password": 'm1387m2008m'})
+        client.credentials(HTTP_AUTHORIZATION=f"Token {response.data['token']}")
+        hits, misses = lookups("hit"), lookups("miss")
+        assert client.get(reverse("app:tasks-list")).status_code == 200
+        with QueryCounter(record=True) as counter:
+            assert client.get(reverse("app:tasks-list") + "?page_size=5").status_code == 200
+        assert user_queries(counter) == []
+        assert (lookups("hit"), lookups("miss")) == (hits + 1, misses + 1)
+    def test_logout_invalidates_the_token(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}")
+        assert client.get(reverse("app:tasks-list")).status_code == 200
+        assert client.post(reverse("accounts:api-v1:delete-token")).status_code == 204
+        assert client.get(reverse("app:tasks-list")).status_code == 401
+    def test_expire_tokens_in_chunks(self, user, capsys):
+        other = User.objects.create_user(email='other@admin.com', password=None)
+        third = User.objects.create_user(email='third@admin.com', password=None)
+        stale = [Token.objects.create(user=user).key, Token.objects.create(user=other).key]
+        fresh = Token.objects.create(user=third).key
+        Token.objects.filter(key__in=stale).update(created=timezone.now() - timedelta(days=31))
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {stale[0]}")
+        assert client.get(reverse("app:tasks-list")).status_code == 200
+        call_command("expire_tokens", chunk_size=1)
+        assert "2 stale tokens deleted in 3 chunks" in capsys.readouterr().out  # Every token read once
+        assert list(Token.objects.values_list("key", flat=True)) == [fresh]
+        assert client.get(reverse("app:tasks-list")).status_code == 401
+# ======================================================================================================================
@@ -0,0 +1,63 @@
+from rest_framework.test import APIClient
+from django.shortcuts import reverse
+from accounts.models import User
+from app.models import ToDoApp
+import pytest
+
+# ======================================================================================================================
+@pytest.fixture
+def client():
+    return APIClient()
+@pytest.fixture
+def user():
+    user = User.objects.create_user(email='admin@admin.com', password='m1387m2008m')
+    return user
+@pytest.fixture
+def other():
+    user = User.objects.create_user(email='other@admin.com', password='m1387m2008m')
+    return user
+# ======================================================================================================================
+@pytest.mark.django_db
+class TestBulkAPI:
+    def test_bulk_create_response_201_status(self, client, user):
+        url = reverse("app:tasks-list")
+        client.force_login(user=user)
+        response = client.post(url, [{"content": f"task {i}"} for i in range(3)], format="json")
+        assert response.status_code == 201
+        ids = [result["data"]["id"] for result in response.data["results"]]
+        assert list(ToDoApp.objects.filter(author=user).order_by("id").values_list("id", flat=True)) == ids
+        assert [result["data"]["content"] for result in response.data["results"]] == ["task 0", "task 1", "task 2"]
+    def test_bulk_create_reports_invalid_items(self, client, user):
+        url = reverse("app:tasks-list")
+        client.force_login(user=user)
+        response = client.post(url, [{"content": "ok"}, {"content": ""}], format="json")
+        assert response.status_code == 207
+        assert [result["status"] for result in response.data["results"]] == [201, 400]
+        assert ToDoApp.objects.count() == 1
+    def test_bulk_update_enforces_ownership(self, client, user, other):
+        url = reverse("app:tasks-list")
+        mine = ToDoApp.objects.create(author=user, content="mine")
+        theirs = ToDoApp.objects.create(author=other, content="theirs")
+        client.force_login(user=user)
+        items = [{"id": mine.id, "content": "changed"}, {"id": theirs.id, "content": "changed"}, {"id": 999}]
+        response = client.patch(url, items, format="json")
+        assert response.status_code == 207
+        assert [result["status"] for result in response.data["results"]] == [200, 403, 404]
+        mine.refresh_from_db()
+        theirs.refresh_from_db()
+        assert (mine.content, theirs.content) == ("changed", "theirs")
+    def test_bulk_destroy_in_one_delete(self, client, user, other, django_assert_max_num_queries):
+        url = reverse("app:tasks-list")
+        mine = [ToDoApp.objects.create(author=user, content=f"mine {i}") for i in range(5)]
+        theirs = ToDoApp.objects.create(author=other, content="theirs")
+        client.force_login(user=user)
+        with django_assert_max_num_queries(11):
+            response = client.delete(url, {"ids": [task.id for task in mine] + [theirs.id]}, format="json")
+        assert response.status_code == 207
+        assert [result["status"] for result in response.data["results"]] == [204] * 5 + [403]
+        assert list(ToDoApp.objects.values_list("id", flat=True)) == [theirs.id]
+    def test_bulk_request_response_401_status(self, client):
+        url = reverse("app:tasks-list")
+        response = client.post(url, [{"content": "task"}], format="json")
+        assert response.status_code == 401
+# ======================================================================================================================
@@ -0,0 +1,62 @@
+from rest_framework.test import APIClient
+from django.shortcuts import reverse
+from accounts.models import User
+from app.caching import bump_generations as bump
+from app.models import ToDoApp
+import app.models
+import pytest
+
+# ======================================================================================================================
+@pytest.fixture
+def client():
+    return APIClient()
+@pytest.fixture
+def user():
+    user = User.objects.create_user(email='admin@admin.com', password='m1387m2008m')
+    return user
+# ======================================================================================================================
+@pytest.mark.django_db
+class TestTaskCache:
+    def test_list_is_served_from_cache(self, client, user, django_assert_num_queries):
+        ToDoApp.objects.create(author=user, content="task")
+        url = reverse("app:tasks-list")
+        first = client.get(url)
+        with django_assert_num_queries(0):
+            second = client.get(url)
+        assert second.data == first.data
+    def test_save_and_delete_invalidate_list(self, client, user):
+        url = reverse("app:tasks-list")
+        task = ToDoApp.objects.create(author=user, content="task")
+        assert client.get(url).data["total_objects"] == 1
+        ToDoApp.objects.create(author=user, content="task")
+        assert client.get(url).data["total_objects"] == 2
+        task.delete()
+        assert client.get(url).data["total_objects"] == 1
+    def test_author_scope_and_author_change(self, client, user):
+        other = User.objects.create_user(email='other@admin.com', password='m1387m2008m')
+        task = ToDoApp.objects.create(author=user, content="task")
+        url = reverse("app:tasks-list") + f"?author={user.id}"
+        assert client.get(url).data["total_objects"] == 1
+        task = ToDoApp.objects.get(pk=task.pk)
+        task.author = other
+        task.save()
+        assert client.get(url).data["total_objects"] == 0
+    def test_bulk_update_invalidates_retrieve(self, client, user):
+        task = ToDoApp.objects.create(author=user, content="before")
+        url = reverse("app:tasks-detail", kwargs={"pk": task.pk})
+        assert client.get(url).data["content"] == "before"
+        client.force_login(user=user)
+        client.patch(reverse("app:tasks-list"), [{"id": task.pk, "content": "after"}], format="json")
+        assert client.get(url).data["content"] == "after"
+    def test_queryset_delete_invalidates_once(self, client, user, monkeypatch):
+        tasks = [ToDoApp.objects.create(author=user, content=f"task {i}") for i in range(5)]
+        url = reverse("app:tasks-detail", kwargs={"pk": tasks[0].pk})
+        assert client.get(url).status_code == 200
+        assert client.get(reverse("app:tasks-list")).data["total_objects"] == 5
+        calls = []
+        monkeypatch.setattr(app.models, "bump_generations", lambda **scopes: calls.append(scopes) or bump(**scopes))
+        ToDoApp.objects.filter(pk__in=[task.pk for task in tasks[:3]]).delete()
+        assert len(calls) == 1 and sorted(calls[0]["task_ids"]) == [task.pk for task in tasks[:3]]
+        assert client.get(url).status_code == 404
+        assert client.get(reverse("app:tasks-list")).data["total_objects"] == 2
+# ======================================================================================================================
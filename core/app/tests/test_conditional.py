@@ -0,0 +1,58 @@
+from rest_framework.test import APIClient
+from django.shortcuts import reverse
+from accounts.models import User
+from app.models import ToDoApp
+import pytest
+
+# ======================================================================================================================
+@pytest.fixture
+def client():
+    return APIClient()
+@pytest.fixture
+def user():
+    user = User.objects.create_user(email='admin@admin.com', password='m1387m2008m')
+    return user
+# ======================================================================================================================
+@pytest.mark.django_db
+class TestConditionalRequests:
+    def test_list_response_304_status(self, client, user):
+        ToDoApp.objects.create(author=user, content="task")
+        url = reverse("app:tasks-list")
+        etag = client.get(url)["ETag"]
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+        ToDoApp.objects.create(author=user, content="task")
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+    def test_list_etag_changes_on_delete(self, client, user):
+        first = ToDoApp.objects.create(author=user, content="first")
+        ToDoApp.objects.create(author=user, content="second")
+        url = reverse("app:tasks-list")
+        etag = client.get(url)["ETag"]
+        first.delete()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+    def test_detail_response_304_status(self, client, user):
+        task = ToDoApp.objects.create(author=user, content="task")
+        url = reverse("app:tasks-detail", kwargs={"pk": task.pk})
+        response = client.get(url)
+        assert "Last-Modified" in response
+        assert client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code == 304
+        assert client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]).status_code == 304
+    def test_if_match_response_412_status(self, client, user):
+        task = ToDoApp.objects.create(author=user, content="task")
+        url = reverse("app:tasks-detail", kwargs={"pk": task.pk})
+        client.force_login(user=user)
+        etag = client.get(url)["ETag"]
+        response = client.patch(url, {"content": "first"}, format="json", HTTP_IF_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+        response = client.patch(url, {"content": "second"}, format="json", HTTP_IF_MATCH=etag)
+        assert response.status_code == 412
+        assert client.delete(url, HTTP_IF_MATCH=etag).status_code == 412
+        task.refresh_from_db()
+        assert task.content == "first"
+    def test_html_list_response_304_status(self, client, user):
+        url = reverse("app:task-list")
+        etag = client.get(url)["ETag"]
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+# ======================================================================================================================
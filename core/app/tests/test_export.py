@@ -0,0 +1,64 @@
+from rest_framework.test import APIClient
+from django.shortcuts import reverse
+from accounts.models import User
+from app.models import ToDoApp
+import csv
+import gzip
+import io
+import json
+import pytest
+
+# ======================================================================================================================
+@pytest.fixture
+def client():
+    return APIClient()
+@pytest.fixture
+def user():
+    user = User.objects.create_user(email='admin@admin.com', password='m1387m2008m', is_staff=False)
+    return user
+# ======================================================================================================================
+@pytest.mark.django_db
+class TestTaskExport:
+    def test_export_ndjson_own_tasks(self, client, user):
+        other = User.objects.create_user(email='other@admin.com', password='m1387m2008m')
+        tasks = [ToDoApp.objects.create(author=user, content=f"task {i}") for i in range(3)]
+        ToDoApp.objects.create(author=other, content="not mine")
+        client.force_login(user=user)
+        response = client.get(reverse("app:tasks-export"))
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        assert [line["id"] for line in lines] == [task.id for task in tasks]
+        assert lines[0]["author"] == user.id and lines[0]["content"] == "task 0"
+    def test_export_csv_with_filters(self, client, user):
+        task = ToDoApp.objects.create(author=user, content='a, "quoted" task')
+        ToDoApp.objects.create(author=user, content="other")
+        client.force_login(user=user)
+        response = client.get(reverse("app:tasks-export"), {"output": "csv", "id": task.id})
+        rows = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))
+        assert rows[0] == ["id", "author", "content", "created_date", "updated_date"]
+        assert rows[1][:3] == [str(task.id), str(user.id), task.content]
+        assert len(rows) == 2
+    def test_export_gzip(self, client, user):
+        ToDoApp.objects.create(author=user, content="task")
+        client.force_login(user=user)
+        response = client.get(reverse("app:tasks-export"), HTTP_ACCEPT_ENCODING="gzip, deflate")
+        assert response["Content-Encoding"] == "gzip"
+        body = gzip.decompress(b"".join(response.streaming_content))
+        assert json.loads(body)["content"] == "task"
+        for header in ("gzip;q=0, deflate", "identity", "*;q=0", "br, gzip;q=0.0"):
+            response = client.get(reverse("app:tasks-export"), HTTP_ACCEPT_ENCODING=header)
+            assert not response.has_header("Content-Encoding"), header
+        response = client.get(reverse("app:tasks-export"), HTTP_ACCEPT_ENCODING="br;q=1, *;q=0.5")
+        assert response["Content-Encoding"] == "gzip"
+    def test_export_all_tasks_for_superusers_only(self, client, user):
+        staff = User.objects.create_user(email='staff@admin.com', password='m1387m2008m', is_staff=True)
+        superuser = User.objects.create_superuser(email='root@admin.com', password='m1387m2008m')
+        ToDoApp.objects.create(author=user, content="task")
+        for exporter, count in ((staff, 0), (superuser, 1)):
+            client.force_login(user=exporter)
+            response = client.get(reverse("app:tasks-export"))
+            assert len(b"".join(response.streaming_content).splitlines()) == count
+    def test_export_response_401_status(self, client):
+        assert client.get(reverse("app:tasks-export")).status_code == 401
+# ======================================================================================================================
@@ -0,0 +1,109 @@
+import os
+import signal
+import threading
+from django.contrib.auth.hashers import make_password
+from django.shortcuts import reverse
+from django.test import Client
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+from accounts.hashing import HashingBusy, HashingService, get_service
+from accounts.models import User
+import pytest
+
+# ======================================================================================================================
+@pytest.fixture
+def client():
+    return APIClient()
+@pytest.fixture
+def inline(settings):
+    settings.PASSWORD_HASHING_WORKERS = 0  # Hashes in this process, with the overridden settings
+    settings.PASSWORD_HASH_ITERATIONS = 1000
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+# ======================================================================================================================
+class TestHashingService:
+    def test_hashes_run_in_the_pool(self):
+        assert get_service().run("test", os.getpid) != os.getpid()
+    def test_busy_service_rejects_after_the_queue_timeout(self):
+        service = HashingService(workers=0, concurrency=1, queue_size=1, queue_timeout=0.05)
+        held, release = threading.Event(), threading.Event()
+        holder = threading.Thread(target=service.run, args=("verify", lambda: held.set() or release.wait()))
+        holder.start()
+        held.wait()
+        try:
+            rejected = sample("todoapp_password_hashing_rejected_total", operation="verify")
+            with pytest.raises(HashingBusy):
+                service.run("verify", lambda: None)
+            assert sample("todoapp_password_hashing_rejected_total", operation="verify") == rejected + 1
+        finally:
+            release.set()
+            holder.join()
+        assert service.run("verify", lambda: "done") == "done"
+    def test_full_queue_rejects_at_once(self):
+        service = HashingService(workers=0, concurrency=1, queue_size=0, queue_timeout=60)
+        held, release = threading.Event(), threading.Event()
+        holder = threading.Thread(target=service.run, args=("verify", lambda: held.set() or release.wait()))
+        holder.start()
+        held.wait()
+        try:
+            with pytest.raises(HashingBusy):
+                service.run("verify", lambda: None)  # Would wait 60 seconds with room in the queue
+        finally:
+            release.set()
+            holder.join()
+    def test_broken_pool_is_replaced(self):
+        service = HashingService(workers=1, concurrency=1, queue_size=0, queue_timeout=0)
+        try:
+            child = service.run("test", os.getpid)
+            os.kill(child, signal.SIGKILL)
+            assert service.run("test", os.getpid) not in (child, os.getpid())
+            with pytest.raises(HashingBusy):
+                service.run("test", os._exit, 1)  # Kills the new pool as well
+            assert service.run("test", os.getpid) != os.getpid()
+        finally:
+            service.shutdown()
+@pytest.mark.django_db
+class TestHasherPolicy:
+    def test_set_and_check_password_use_the_pool(self):
+        waits = sample("todoapp_password_hashing_queue_wait_seconds_count", operation="verify")
+        user = User.objects.create_user(email='admin@admin.com', password='m1387m2008m')
+        assert user.password.startswith("pbkdf2_sha256$260000$")
+        assert user.check_password('m1387m2008m') and not user.check_password('wrong')
+        assert sample("todoapp_password_hashing_queue_wait_seconds_count", operation="verify") == waits + 2
+    def test_login_rehashes_with_the_preferred_hasher(self, client, inline):
+        user = User.objects.create_user(email='admin@admin.com', password=None)
+        User.objects.filter(pk=user.pk).update(password=make_password('m1387m2008m', hasher="pbkdf2_sha1"))
+        response = client.post(reverse("accounts:api-v1:token_obtain_pair"), {
+            "email": 'admin@admin.com', "password": 'm1387m2008m'})
+        assert response.status_code == 200
+        user.refresh_from_db()
+        assert user.password.startswith("pbkdf2_sha256$1000$")
+    def test_iteration_change_rehashes_once(self, inline, settings):
+        user = User.objects.create_user(email='admin@admin.com', password='m1387m2008m')
+        settings.PASSWORD_HASH_ITERATIONS = 2000
+        assert user.check_password('m1387m2008m')
+        encoded = User.objects.get(pk=user.pk).password
+        assert encoded.startswith("pbkdf2_sha256$2000$")
+        assert user.check_password('m1387m2008m')
+        assert User.objects.get(pk=user.pk).password == encoded
+@pytest.fixture
+def saturated(monkeypatch):
+    service = HashingService(workers=0, concurrency=1, queue_size=0, queue_timeout=0)
+    service._slots.acquire()  # Every slot taken, no room in the queue
+    monkeypatch.setattr("accounts.hashing._service", service)
+@pytest.fixture
+def hashed_user():
+    user = User.objects.create_user(email='admin@admin.com', password=None)
+    User.objects.filter(pk=user.pk).update(password=make_password('m1387m2008m'))  # Without the service
+    return user
+@pytest.mark.django_db
+class TestSaturatedHashing:
+    def test_api_login_response_503_status(self, client, hashed_user, saturated):
+        response = client.post(reverse("accounts:api-v1:token_obtain_pair"), {
+            "email": 'admin@admin.com', "password": 'm1387m2008m'})
+        assert response.status_code == 503 and response.data["detail"].code == "hashing_busy"
+        assert response["Retry-After"] == "1"
+    def test_html_login_response_503_status(self, hashed_user, saturated):
+        response = Client().post(reverse("accounts:login"), {"username": 'admin@admin.com', "password": 'm1387m2008m'})
+        assert response.status_code == 503 and response["Retry-After"] == "1"
+# ======================================================================================================================
@@ -0,0 +1,44 @@
+from rest_framework.test import APIClient
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.shortcuts import reverse
+from accounts.models import User
+from app.models import ToDoApp
+import json
+import pytest
+
+# ======================================================================================================================
+@pytest.fixture
+def client():
+    return APIClient()
+@pytest.fixture
+def user():
+    user = User.objects.create_user(email='admin@admin.com', password='m1387m2008m')
+    return user
+# ======================================================================================================================
+@pytest.mark.django_db
+class TestTaskImport:
+    def test_import_ndjson_reports_rejected_rows(self, client, user):
+        lines = [json.dumps({"content": f"task {i}"}) for i in range(5)] + ["not json", json.dumps({"content": ""})]
+        upload = SimpleUploadedFile("tasks.ndjson", "\n".join(lines).encode())
+        client.force_login(user=user)
+        response = client.post(reverse("app:tasks-import"), {"file": upload}, format="multipart")
+        assert response.status_code == 201
+        assert (response.data["created"], response.data["rejected"]) == (5, 2)
+        assert [error["line"] for error in response.data["errors"]] == [6, 7]
+        assert ToDoApp.objects.filter(author=user).count() == 5
+    def test_import_csv_round_trip_with_export(self, client, user):
+        ToDoApp.objects.create(author=user, content='multi\nline, "quoted"')
+        client.force_login(user=user)
+        exported = b"".join(client.get(reverse("app:tasks-export"), {"output": "csv"}).streaming_content)
+        upload = SimpleUploadedFile("tasks.csv", exported)
+        response = client.post(reverse("app:tasks-import"), {"file": upload}, format="multipart")
+        assert response.data["created"] == 1
+        assert list(ToDoApp.objects.values_list("content", flat=True).distinct()) == ['multi\nline, "quoted"']
+    def test_import_command_in_batches(self, user, tmp_path):
+        path = tmp_path / "tasks.ndjson"
+        rows = [{"author": user.id, "content": f"task {i}"} for i in range(25)] + [{"author": 999, "content": "x"}]
+        path.write_text("\n".join(json.dumps(row) for row in rows))
+        call_command("import_tasks", str(path), "--batch-size", "10")
+        assert ToDoApp.objects.filter(author=user).count() == 25
+# ======================================================================================================================
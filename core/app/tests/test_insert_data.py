@@ -0,0 +1,30 @@
+from django.core.management import call_command
+from accounts.models import Profile, User
+from app.fakedata import generate_users
+from app.models import SyncCounter, ToDoApp
+import pytest
+
+# ======================================================================================================================
+@pytest.mark.django_db
+class TestInsertDataCommand:
+    def test_creates_users_profiles_and_tasks(self):
+        call_command("insert_data", users=5, tasks_per_user=3, seed=1, batch_size=4, workers=1)
+        assert User.objects.count() == 5
+        assert Profile.objects.count() == 5  # One profile per user, not one from the signal plus one more
+        assert Profile.objects.exclude(first_name="").count() == 5
+        assert ToDoApp.objects.count() == 15
+        user = User.objects.first()
+        assert user.check_password("m1387m2008m")
+        assert sorted(ToDoApp.objects.filter(author=user).values_list("change_seq", flat=True)) == [1, 2, 3]
+        assert SyncCounter.objects.get(author_id=user.pk).value == 3
+    def test_seed_makes_data_reproducible(self):
+        assert generate_users((7, 1, 3, 2)) == generate_users((7, 1, 3, 2))
+        assert generate_users((7, 1, 3, 2)) != generate_users((8, 1, 3, 2))
+    def test_precomputed_password_hash(self):
+        call_command("insert_data", users=2, tasks_per_user=0, password_hash="!unusable", workers=1)
+        assert set(User.objects.values_list("password", flat=True)) == {"!unusable"}
+    def test_accounts_file_lists_created_emails(self, tmp_path):
+        path = tmp_path / "accounts.csv"
+        call_command("insert_data", users=3, tasks_per_user=1, accounts_file=str(path), workers=1)
+        assert sorted(path.read_text().split()) == sorted(User.objects.values_list("email", flat=True))
+# ======================================================================================================================
@@ -0,0 +1,99 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from celery.app.task import Context
+from django.core import mail
+from django.shortcuts import reverse
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+from accounts.models import User
+from accounts.tasks import purge_tasks
+from app.metrics import observe_task_start, stamp_published_at
+from app.models import PurgeJob, ToDoApp
+from core.celery import app as celery_app
+import pytest
+
+# ======================================================================================================================
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+@pytest.fixture
+def client():
+    return APIClient()
+@pytest.fixture
+def user():
+    user = User.objects.create_user(email='admin@admin.com', password='m1387m2008m')
+    return user
+# ======================================================================================================================
+@pytest.mark.django_db
+class TestMetrics:
+    def test_request_latency_by_url_name_and_status(self, client, user):
+        labels = {"view": "app:tasks-list", "method": "GET", "status": "200"}
+        before = sample("todoapp_http_request_duration_seconds_count", **labels)
+        client.get(reverse("app:tasks-list"))
+        assert sample("todoapp_http_request_duration_seconds_count", **labels) == before + 1
+        before = sample("todoapp_http_request_duration_seconds_count", view="<unresolved>", method="GET", status="404")
+        client.get("/no-such-page/")
+        assert sample(
+            "todoapp_http_request_duration_seconds_count", view="<unresolved>", method="GET", status="404"
+        ) == before + 1
+    def test_db_queries_per_request(self, client, user):
+        ToDoApp.objects.create(author=user, content="task")
+        before = sample("todoapp_http_request_db_queries_sum", view="app:tasks-list")
+        client.get(reverse("app:tasks-list"))
+        assert sample("todoapp_http_request_db_queries_sum", view="app:tasks-list") >= before + 2
+    def test_cache_hits_and_misses(self, client, user):
+        ToDoApp.objects.create(author=user, content="task")
+        misses = sample("todoapp_cache_lookups_total", kind="response", result="miss")
+        hits = sample("todoapp_cache_lookups_total", kind="response", result="hit")
+        client.get(reverse("app:tasks-list"))
+        client.get(reverse("app:tasks-list"))
+        assert sample("todoapp_cache_lookups_total", kind="response", result="miss") == misses + 1
+        assert sample("todoapp_cache_lookups_total", kind="response", result="hit") == hits + 1
+    def test_metrics_endpoint(self, client):
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/plain")
+        assert b"todoapp_http_request_duration_seconds_bucket" in response.content
+    def test_celery_task_runtime(self, user, monkeypatch):
+        monkeypatch.setitem(celery_app.conf, "task_always_eager", True)
+        labels = {"task": "accounts.tasks.purge_tasks", "state": "SUCCESS"}
+        before = sample("todoapp_celery_task_duration_seconds_count", **labels)
+        purge_tasks.delay(str(PurgeJob.objects.create().pk))
+        assert sample("todoapp_celery_task_duration_seconds_count", **labels) == before + 1
+    def test_celery_queue_wait(self):
+        headers = {}
+        stamp_published_at(headers=headers)
+        headers["published_at"] -= 2  # Published two seconds ago
+        task = SimpleNamespace(name="accounts.tasks.delete_task", request=Context(headers))
+        before = sample("todoapp_celery_task_queue_wait_seconds_sum", task=task.name)
+        observe_task_start(task_id="id", task=task)
+        assert sample("todoapp_celery_task_queue_wait_seconds_sum", task=task.name) >= before + 2
+    def test_email_sending_is_timed(self, settings):
+        settings.EMAIL_BACKEND = "app.metrics.InstrumentedEmailBackend"
+        settings.METRICS_EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+        before = sample("todoapp_email_send_duration_seconds_count", outcome="sent")
+        mail.send_mail("subject", "body", "from@admin.com", ["to@admin.com"])
+        assert len(mail.outbox) == 1
+        assert sample("todoapp_email_send_duration_seconds_count", outcome="sent") == before + 1
+class TestMultiprocessMetrics:
+    def test_samples_of_all_processes_are_merged(self, tmp_path):
+        # Each process stands for one gunicorn worker writing to the shared directory
+        env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+        cwd = Path(__file__).resolve().parents[2]
+        increment = "from app.metrics import CACHE_LOOKUPS; CACHE_LOOKUPS.labels(kind='state', result='hit').inc()"
+        for _ in range(3):
+            subprocess.run([sys.executable, "-c", increment], env=env, cwd=cwd, check=True)
+        merged = subprocess.run(
+            [sys.executable, "-c", "from app.metrics import get_registry; print(get_registry().get_sample_value("
+             "'todoapp_cache_lookups_total', {'kind': 'state', 'result': 'hit'}))"],
+            env=env, cwd=cwd, check=True, capture_output=True, text=True,
+        )
+        assert float(merged.stdout) == 3
+    def test_missing_directory_is_created(self, tmp_path):
+        env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path / "metrics"))
+        cwd = Path(__file__).resolve().parents[2]
+        subprocess.run([sys.executable, "-c", "import app.metrics"], env=env, cwd=cwd, check=True)
+        assert (tmp_path / "metrics").is_dir()
+# ======================================================================================================================
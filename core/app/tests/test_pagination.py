@@ -0,0 +1,56 @@
+import json
+from base64 import b64encode
+from rest_framework.test import APIClient
+from django.shortcuts import reverse
+from accounts.models import User
+from app.models import ToDoApp
+import pytest
+
+# ======================================================================================================================
+@pytest.fixture
+def client():
+    return APIClient()
+@pytest.fixture
+def tasks():
+    user = User.objects.create_user(email='admin@admin.com', password='m1387m2008m')
+    return [ToDoApp.objects.create(author=user, content=f"task {i}") for i in range(7)]
+# ======================================================================================================================
+@pytest.mark.django_db
+class TestKeysetPagination:
+    def walk(self, client, url):
+        ids = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            ids += [item["id"] for item in response.data["results"]]
+            url = response.data["links"]["next"]
+        return ids
+    def test_cursor_walks_every_task_once(self, client, tasks):
+        url = reverse("app:tasks-list") + "?pagination=cursor&page_size=3&ordering=id"
+        assert self.walk(client, url) == [task.id for task in tasks]
+    def test_cursor_created_date_descending(self, client, tasks):
+        url = reverse("app:tasks-list") + "?pagination=cursor&page_size=2&ordering=-created_date"
+        assert self.walk(client, url) == [task.id for task in reversed(tasks)]
+    def test_previous_link_returns_previous_page(self, client, tasks):
+        url = reverse("app:tasks-list") + "?pagination=cursor&page_size=3&ordering=id"
+        first = client.get(url).data
+        second = client.get(first["links"]["next"]).data
+        assert [item["id"] for item in second["results"]] == [task.id for task in tasks[3:6]]
+        back = client.get(second["links"]["previous"]).data
+        assert back["results"] == first["results"]
+    def test_count_opt_out_and_max_page_size(self, client, tasks):
+        url = reverse("app:tasks-list") + "?pagination=cursor&page_size=1000"
+        response = client.get(url)
+        assert response.data["total_objects"] == 7
+        assert len(response.data["results"]) == 7
+        response = client.get(url + "&count=false")
+        assert "total_objects" not in response.data
+    def test_invalid_cursor_response_404_status(self, client, tasks):
+        url = reverse("app:tasks-list") + "?pagination=cursor&cursor=garbage"
+        assert client.get(url).status_code == 404
+    @pytest.mark.parametrize("key", [["not a date", 1], ["2024-01-01T00:00:00", "x"], [None, 1], [[], 1]])
+    def test_cursor_with_invalid_key_response_404_status(self, client, tasks, key):
+        token = b64encode(json.dumps({"o": "-created_date", "k": key, "r": 0}).encode()).decode()
+        url = reverse("app:tasks-list") + f"?pagination=cursor&cursor={token}"
+        assert client.get(url).status_code == 404
+# ======================================================================================================================
@@ -0,0 +1,85 @@
+import pstats
+import time
+from django.core.management import call_command
+from django.shortcuts import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.models import User
+from app.models import ToDoApp
+from app.profiling import StackSampler, sign_profile_request
+import pytest
+
+# ======================================================================================================================
+@pytest.fixture
+def client():
+    return APIClient()
+@pytest.fixture
+def superuser():
+    return User.objects.create_superuser(email='admin@admin.com', password='m1387m2008m')
+@pytest.fixture
+def member():
+    return User.objects.create_user(email='member@admin.com', password='m1387m2008m')  # Staff by default
+@pytest.fixture
+def url(member):
+    ToDoApp.objects.create(author=member, content="task")
+    return reverse("app:tasks-list")
+# ======================================================================================================================
+@pytest.mark.django_db
+class TestOnDemandProfiling:
+    def test_superuser_gets_cprofile_stats(self, client, superuser, url, tmp_path):
+        client.force_login(superuser)
+        response = client.get(url + "?profile=cprofile")
+        assert response["Content-Type"] == "application/octet-stream"
+        assert response["Content-Disposition"].endswith('.prof"')
+        assert response["X-Profiled-Status"] == "200"
+        path = tmp_path / "request.prof"
+        path.write_bytes(response.content)
+        assert any(function[2] == "list" for function in pstats.Stats(str(path)).stats)
+    def test_superuser_with_jwt_gets_collapsed_stacks(self, client, superuser, url):
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(superuser).access_token}")
+        response = client.get(url, HTTP_X_PROFILE="stacks")
+        assert response["Content-Type"].startswith("text/plain")
+        assert response["Content-Disposition"].endswith('.collapsed"')
+        assert response["X-Profiled-Status"] == "200"
+    def test_other_users_get_the_normal_response(self, client, member, url):
+        client.force_login(member)
+        response = client.get(url + "?profile=cprofile")
+        assert "X-Profiled-Status" not in response
+        assert response.data["total_objects"] == 1
+        client.logout()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(member).access_token}")
+        assert "X-Profiled-Status" not in client.get(url, HTTP_X_PROFILE="stacks")
+    def test_signed_request(self, client, url, settings):
+        settings.PROFILING_SECRET = "secret"
+        full_path = url + "?profile=cprofile"
+        signature = sign_profile_request("secret", "GET", full_path)
+        assert client.get(full_path, HTTP_X_PROFILE_SIGNATURE=signature)["X-Profiled-Status"] == "200"
+        expired = sign_profile_request("secret", "GET", full_path, timestamp=time.time() - 3600)
+        assert "X-Profiled-Status" not in client.get(full_path, HTTP_X_PROFILE_SIGNATURE=expired)
+        forged = sign_profile_request("other", "GET", full_path)
+        assert "X-Profiled-Status" not in client.get(full_path, HTTP_X_PROFILE_SIGNATURE=forged)
+    def test_stack_sampler_collapses_stacks(self):
+        def busy():
+            end = time.perf_counter() + 0.05
+            while time.perf_counter() < end:
+                pass
+            return "done"
+        result, collapsed = StackSampler(interval=0.001).run(busy)
+        assert result == "done"
+        line = collapsed.decode().splitlines()[0]
+        stack, count = line.rsplit(" ", 1)
+        assert stack.split(";")[-1].startswith("busy (") and int(count) > 0
+@pytest.mark.django_db
+class TestSampledProfiling:
+    def test_sampled_requests_are_aggregated_per_view(self, client, url, settings, tmp_path, capsys):
+        settings.PROFILING_SAMPLE_RATE = 1  # Every request
+        settings.PROFILING_DIR = str(tmp_path)
+        client.get(url)
+        client.get(url)
+        assert len(list((tmp_path / "app.tasks-list").glob("*.prof"))) == 2
+        call_command("profiling_report")
+        assert "2  app.tasks-list" in capsys.readouterr().out
+        call_command("profiling_report", "app:tasks-list", output=str(tmp_path / "merged.prof"))
+        assert "2 requests of app:tasks-list" in capsys.readouterr().out
+        assert (tmp_path / "merged.prof").exists()
+# ======================================================================================================================
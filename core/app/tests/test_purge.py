@@ -0,0 +1,108 @@
+from datetime import timedelta
+from django.test import Client
+from django.shortcuts import reverse
+from django.utils import timezone
+from accounts.models import User
+from django.core.exceptions import ImproperlyConfigured
+from accounts.tasks import check_shared_backends, purge_tasks
+from app.models import PurgeJob, TaskTombstone, ToDoApp
+from app.purge import TaskPurge
+from core import celery_app
+import pytest
+
+# ======================================================================================================================
+@pytest.fixture
+def client():
+    return Client()
+@pytest.fixture
+def user():
+    user = User.objects.create_user(email='admin@admin.com', password='m1387m2008m')
+    return user
+@pytest.fixture
+def other():
+    user = User.objects.create_user(email='other@admin.com', password='m1387m2008m', is_staff=False)
+    return user
+@pytest.fixture
+def eager(monkeypatch):
+    monkeypatch.setitem(celery_app.conf, "task_always_eager", True)
+# ======================================================================================================================
+@pytest.mark.django_db
+class TestTaskPurge:
+    def test_purge_deletes_in_chunks(self, user, other):
+        mine = [ToDoApp.objects.create(author=user, content=f"mine {i}") for i in range(7)]
+        theirs = ToDoApp.objects.create(author=other, content="theirs")
+        job = PurgeJob.objects.create(author=user, chunk_size=3)
+        progress = []
+        TaskPurge(job, on_progress=lambda job: progress.append(job.deleted)).run()
+        assert progress == [3, 6, 7]
+        assert list(ToDoApp.objects.values_list("id", flat=True)) == [theirs.id]
+        job.refresh_from_db()
+        assert (job.status, job.total, job.deleted, job.last_id) == ("finished", 7, 7, mine[-1].id)
+        assert TaskTombstone.objects.filter(author_id=user.pk).count() == 7
+    def test_purge_by_age(self, user):
+        old = ToDoApp.objects.create(author=user, content="old")
+        ToDoApp.objects.filter(pk=old.pk).update(created_date=timezone.now() - timedelta(days=40))
+        recent = ToDoApp.objects.create(author=user, content="recent")
+        job = PurgeJob.objects.create(created_before=timezone.now() - timedelta(days=30))
+        TaskPurge(job).run()
+        assert list(ToDoApp.objects.values_list("id", flat=True)) == [recent.id]
+    def test_purge_resumes_from_checkpoint(self, user):
+        tasks = [ToDoApp.objects.create(author=user, content=f"task {i}") for i in range(5)]
+        job = PurgeJob.objects.create(chunk_size=2)
+        TaskPurge(job).delete_chunk()  # The worker dies after the first chunk
+        job = PurgeJob.objects.get(pk=job.pk)
+        assert (job.deleted, job.last_id) == (2, tasks[1].id)
+        purge_tasks(str(job.pk))
+        job.refresh_from_db()
+        assert (job.status, job.deleted) == ("finished", 5)
+        assert not ToDoApp.objects.exists()
+    def test_deletetask_returns_job_id(self, client, other, user, eager):
+        ToDoApp.objects.create(author=user, content="kept")
+        ToDoApp.objects.create(author=other, content="purged")
+        client.force_login(other)
+        response = client.post(reverse("accounts:email"), {"author": user.pk})
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+        assert response.json()["status_url"] == reverse("accounts:purge-status", kwargs={"job_id": job_id})
+        assert list(ToDoApp.objects.values_list("content", flat=True)) == ["kept"]
+        status = client.get(response.json()["status_url"]).json()
+        assert (status["job_id"], status["status"], status["deleted"]) == (job_id, "finished", 1)
+    def test_purge_status_hides_other_users_jobs(self, client, user, other):
+        job = PurgeJob.objects.create(author=user)
+        client.force_login(other)
+        response = client.get(reverse("accounts:purge-status", kwargs={"job_id": job.pk}))
+        assert response.status_code == 404
+    def test_deletetask_requires_login(self, client):
+        response = client.post(reverse("accounts:email"))
+        assert response.status_code == 302
+        assert not PurgeJob.objects.exists()
+    def test_staff_user_purges_own_tasks_only(self, client, user, eager):
+        # Every user is staff by default: only superusers purge the tasks of others
+        ToDoApp.objects.create(author=user, content="mine")
+        staff = User.objects.create_user(email='staff@admin.com', password='m1387m2008m', is_staff=True)
+        client.force_login(staff)
+        assert client.post(reverse("accounts:email"), {"author": user.pk}).status_code == 202
+        assert PurgeJob.objects.get().author_id == staff.pk
+        assert ToDoApp.objects.count() == 1
+    def test_superuser_purges_any_author(self, client, user, other, eager):
+        ToDoApp.objects.create(author=user, content="purged")
+        ToDoApp.objects.create(author=other, content="kept")
+        job = PurgeJob.objects.create(author=other)
+        client.force_login(User.objects.create_superuser(email='root@admin.com', password='m1387m2008m'))
+        assert client.post(reverse("accounts:email"), {"author": user.pk}).status_code == 202
+        assert list(ToDoApp.objects.values_list("content", flat=True)) == ["kept"]
+        assert client.get(reverse("accounts:purge-status", kwargs={"job_id": job.pk})).status_code == 200
+    def test_deletetask_requires_post_with_csrf_token(self, user):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(user)
+        assert client.get(reverse("accounts:email")).status_code == 405
+        assert client.post(reverse("accounts:email")).status_code == 403
+        assert not PurgeJob.objects.exists()
+class TestWorkerSettings:
+    def test_worker_requires_the_shared_cache_and_broker(self, settings):
+        with pytest.raises(ImproperlyConfigured, match="LocMemCache"):
+            check_shared_backends()  # The per-process cache of the tests
+        settings.REDIS_URL = "redis://redis:6379/1"
+        settings.CACHES = {"default": {"BACKEND": "django_redis.cache.RedisCache", "LOCATION": settings.REDIS_URL}}
+        check_shared_backends()
+# ======================================================================================================================
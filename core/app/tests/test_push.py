@@ -0,0 +1,134 @@
+import asyncio
+import json
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import Client
+from rest_framework_simplejwt.tokens import AccessToken
+from accounts.models import User
+from accounts.revocation import revoke_token
+from app.models import ToDoApp
+from app.push import ConnectionHub, InProcessBroker, PushApplication
+import pytest
+
+# ======================================================================================================================
+@pytest.fixture
+def user():
+    user = User.objects.create_user(email='admin@admin.com', password='m1387m2008m')
+    return user
+@pytest.fixture
+def other():
+    user = User.objects.create_user(email='other@admin.com', password='m1387m2008m')
+    return user
+@pytest.fixture
+def push(monkeypatch):
+    monkeypatch.setattr("app.push._broker", InProcessBroker(ConnectionHub()))
+    return PushApplication(application=None)
+@pytest.fixture
+def store_file(settings, tmp_path):
+    settings.JWT_REVOCATION_STORE = "file"
+    settings.JWT_REVOCATION_FILE = str(tmp_path / "revoked-tokens.jsonl")
+    settings.JWT_REVOCATION_SYNC_INTERVAL = 0
+# ======================================================================================================================
+def connect(push, scope, on_event, events=2):
+    """
+    Runs one push connection until `events` events were received, calling `on_event(index)` after each one.
+    Returns the ASGI messages sent by the application.
+    """
+    sent, received, done = [], [], asyncio.Event()
+    async def receive():
+        if scope["type"] == "websocket" and not sent:
+            return {"type": "websocket.connect"}
+        await done.wait()
+        return {"type": "http.disconnect" if scope["type"] == "http" else "websocket.disconnect"}
+    async def send(message):
+        sent.append(message)
+        if message.get("more_body") or message["type"] == "websocket.send":
+            if message["type"] == "websocket.send" or message["body"].startswith(b"id:"):
+                received.append(message)
+                await on_event(len(received))
+                if len(received) == events:
+                    done.set()
+        elif message["type"] in ("http.response.body", "websocket.close"):
+            done.set()
+    async def run():
+        await asyncio.wait_for(push(scope, receive, send), timeout=5)
+    async_to_sync(run)()
+    return sent
+def create_task(author, content, django_capture_on_commit_callbacks):
+    @sync_to_async
+    def create():
+        with django_capture_on_commit_callbacks(execute=True):
+            ToDoApp.objects.create(author=author, content=content)
+    return create
+@pytest.mark.django_db
+class TestPushChannel:
+    def test_sse_response_401_status(self, push):
+        scope = {"type": "http", "path": "/events/tasks/", "headers": [], "query_string": b""}
+        sent = connect(push, scope, on_event=None)
+        assert sent[0]["status"] == 401
+    def test_sse_streams_own_task_changes(self, push, user, other, django_capture_on_commit_callbacks):
+        headers = [(b"authorization", f"Bearer {AccessToken.for_user(user)}".encode())]
+        scope = {"type": "http", "path": "/events/tasks/", "headers": headers, "query_string": b""}
+        async def on_event(index):
+            if index == 1:
+                await create_task(other, "theirs", django_capture_on_commit_callbacks)()
+                await create_task(user, "mine", django_capture_on_commit_callbacks)()
+        sent = connect(push, scope, on_event)
+        assert sent[0]["status"] == 200
+        assert (b"content-type", b"text/event-stream") in sent[0]["headers"]
+        events = [message["body"].decode() for message in sent[1:]]
+        assert events[0].startswith("id: 0\nevent: tasks_changed\n")
+        data = json.loads(events[1].split("data: ")[1])
+        assert data == {"event": "tasks_changed", "cursor": ToDoApp.objects.get(content="mine").change_seq}
+        assert push.broker.hub.get_stats()["connections"] == 0
+    def test_websocket_streams_task_changes_with_query_token(self, push, user, django_capture_on_commit_callbacks):
+        ToDoApp.objects.create(author=user, content="before")
+        scope = {"type": "websocket", "path": "/ws/tasks/", "headers": [],
+                 "query_string": f"token={AccessToken.for_user(user)}".encode()}
+        async def on_event(index):
+            if index == 1:
+                await create_task(user, "after", django_capture_on_commit_callbacks)()
+        sent = connect(push, scope, on_event)
+        assert sent[0] == {"type": "websocket.accept"}
+        assert [json.loads(message["text"])["cursor"] for message in sent[1:]] == [1, 2]
+    def test_websocket_rejects_invalid_token(self, push):
+        scope = {"type": "websocket", "path": "/ws/tasks/", "headers": [], "query_string": b"token=invalid"}
+        sent = connect(push, scope, on_event=None)
+        assert sent == [{"type": "websocket.close", "code": 4401}]
+    def test_revoked_token_is_refused(self, push, user, store_file):
+        token = AccessToken.for_user(user)
+        revoke_token(token)
+        headers = [(b"authorization", f"Bearer {token}".encode())]
+        scope = {"type": "http", "path": "/events/tasks/", "headers": headers, "query_string": b""}
+        assert connect(push, scope, on_event=None)[0]["status"] == 401
+        scope = {"type": "websocket", "path": "/ws/tasks/", "headers": [], "query_string": f"token={token}".encode()}
+        assert connect(push, scope, on_event=None) == [{"type": "websocket.close", "code": 4401}]
+    def test_websocket_session_cookie_requires_trusted_origin(self, push, user, settings):
+        settings.ALLOWED_HOSTS = ["todo.example.com"]
+        session = Client()
+        session.force_login(user)
+        cookie = f"{settings.SESSION_COOKIE_NAME}={session.cookies[settings.SESSION_COOKIE_NAME].value}".encode()
+        for origin, accepted in (("https://evil.example.net", False), ("https://todo.example.com", True),
+                                 ("http://127.0.0.1:5500", True)):
+            headers = [(b"cookie", cookie), (b"host", b"todo.example.com"), (b"origin", origin.encode())]
+            scope = {"type": "websocket", "path": "/ws/tasks/", "headers": headers, "query_string": b""}
+            async def on_event(index):
+                pass
+            sent = connect(push, scope, on_event, events=1)
+            assert (sent[0] == {"type": "websocket.accept"}) == accepted, origin
+    def test_stats_for_superusers_only(self, push, user):
+        superuser = User.objects.create_superuser(email='root@admin.com', password='m1387m2008m')
+        for account, status in ((user, 403), (superuser, 200)):
+            headers = [(b"authorization", f"Bearer {AccessToken.for_user(account)}".encode())]
+            scope = {"type": "http", "path": "/events/stats/", "headers": headers, "query_string": b""}
+            sent = connect(push, scope, on_event=None)
+            assert sent[0]["status"] == status
+        assert json.loads(sent[1]["body"])["connections"] == 0
+    def test_full_queue_keeps_latest_events(self):
+        hub = ConnectionHub(queue_size=2)
+        async def run():
+            queue = hub.subscribe(1)
+            for cursor in range(5):
+                hub.dispatch(1, {"cursor": cursor})
+            return [queue.get_nowait()["cursor"] for _ in range(queue.qsize())]
+        assert async_to_sync(run)() == [3, 4]
+# ======================================================================================================================
@@ -0,0 +1,114 @@
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.conf import settings
+from django.shortcuts import reverse
+from accounts.authentication import get_cached_user
+from accounts.models import User
+from app.models import ToDoApp
+from app.querycount import QueryCounter, query_budget
+import pytest
+
+# Requests checked against settings.QUERY_BUDGETS: (id, method, view name, url, body).
+# Lists and bulk requests are sent in two sizes, their number of queries must not depend on it.
+CASES = [
+    ("list", "GET", "app:tasks-list", lambda ids: reverse("app:tasks-list"), None),
+    ("list-page-3", "GET", "app:tasks-list", lambda ids: reverse("app:tasks-list") + "?page=3", None),
+    ("list-cursor-10", "GET", "app:tasks-list",
+     lambda ids: reverse("app:tasks-list") + "?pagination=cursor&page_size=10", None),
+    ("list-cursor-100", "GET", "app:tasks-list",
+     lambda ids: reverse("app:tasks-list") + "?pagination=cursor&page_size=100", None),
+    ("list-search", "GET", "app:tasks-list", lambda ids: reverse("app:tasks-list") + "?search=word", None),
+    ("retrieve", "GET", "app:tasks-detail", lambda ids: reverse("app:tasks-detail", args=[ids[0]]), None),
+    ("create", "POST", "app:tasks-list", lambda ids: reverse("app:tasks-list"), lambda user, ids: {
+        "author": user.id, "content": "task"}),
+    ("bulk-create-5", "POST", "app:tasks-list", lambda ids: reverse("app:tasks-list"), lambda user, ids: [
+        {"content": "task"}] * 5),
+    ("bulk-create-50", "POST", "app:tasks-list", lambda ids: reverse("app:tasks-list"), lambda user, ids: [
+        {"content": "task"}] * 50),
+    ("bulk-update", "PUT", "app:tasks-list", lambda ids: reverse("app:tasks-list"), lambda user, ids: [
+        {"id": pk, "content": "edited"} for pk in ids[:50]]),
+    ("bulk-patch-5", "PATCH", "app:tasks-list", lambda ids: reverse("app:tasks-list"), lambda user, ids: [
+        {"id": pk, "content": "edited"} for pk in ids[:5]]),
+    ("bulk-patch-50", "PATCH", "app:tasks-list", lambda ids: reverse("app:tasks-list"), lambda user, ids: [
+        {"id": pk, "content": "edited"} for pk in ids[:50]]),
+    ("bulk-delete-5", "DELETE", "app:tasks-list", lambda ids: reverse("app:tasks-list"), lambda user, ids: {
+        "ids": ids[:5]}),
+    ("bulk-delete-50", "DELETE", "app:tasks-list", lambda ids: reverse("app:tasks-list"), lambda user, ids: {
+        "ids": ids[:50]}),
+    ("patch", "PATCH", "app:tasks-detail", lambda ids: reverse("app:tasks-detail", args=[ids[0]]),
+     lambda user, ids: {"content": "edited"}),
+    ("delete", "DELETE", "app:tasks-detail", lambda ids: reverse("app:tasks-detail", args=[ids[0]]), None),
+    ("sync-10", "GET", "app:tasks-sync", lambda ids: reverse("app:tasks-sync") + "?since=0&limit=10", None),
+    ("sync-500", "GET", "app:tasks-sync", lambda ids: reverse("app:tasks-sync") + "?since=0&limit=500", None),
+    ("export", "GET", "app:tasks-export", lambda ids: reverse("app:tasks-export"), None),
+    ("html-list", "GET", "app:task-list", lambda ids: reverse("app:task-list"), None),
+]
+
+# ======================================================================================================================
+@pytest.fixture
+def user():
+    user = User.objects.create_user(email='admin@admin.com', password='m1387m2008m')
+    return user
+@pytest.fixture
+def task_ids(user):
+    other = User.objects.create_user(email='other@admin.com', password='m1387m2008m')
+    for author in (user, other):
+        tasks = [ToDoApp(author=author, content=f"task word {i}") for i in range(60)]
+        ToDoApp.stamp_changes(tasks)  # Creates the change counters, as in a database in use
+        ToDoApp.objects.bulk_create(tasks)
+    return list(ToDoApp.objects.filter(author=user).values_list("id", flat=True))
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+    get_cached_user(user.pk)  # Authenticated users are cached, as in a server in use
+    return client
+# ======================================================================================================================
+@pytest.mark.django_db
+class TestQueryBudgets:
+    @pytest.mark.parametrize("name,method,view_name,url,body", CASES, ids=[case[0] for case in CASES])
+    def test_request_within_budget(self, client, user, task_ids, name, method, view_name, url, body):
+        if view_name == "app:task-list":
+            client.login(email='admin@admin.com', password='m1387m2008m')  # The HTML views use the session
+        with query_budget(method, view_name):
+            response = getattr(client, method.lower())(
+                url(task_ids), body(user, task_ids) if body else None, format="json"
+            )
+            if response.streaming:
+                b"".join(response.streaming_content)  # Streamed rows are fetched while consumed
+        assert response.status_code < 300
+        assert response.resolver_match.view_name == view_name
+    def test_every_budget_is_checked(self):
+        assert set(settings.QUERY_BUDGETS) == {f"{method} {view_name}" for _, method, view_name, *_ in CASES}
+    def test_admin_list_loads_authors_with_tasks(self, task_ids):
+        admin = User.objects.create_superuser(email='super@admin.com', password='m1387m2008m')
+        client = APIClient()
+        client.force_login(admin)
+        url = reverse("admin:app_todoapp_changelist")
+        ToDoApp.objects.filter(pk__in=task_ids[1:]).delete()
+        with QueryCounter() as few:
+            client.get(url)
+        ToDoApp.objects.bulk_create([ToDoApp(author=admin, content="task") for _ in range(50)])
+        with QueryCounter() as many:
+            assert client.get(url).status_code == 200
+        assert many.count == few.count
+@pytest.mark.django_db
+class TestQueryCountMiddleware:
+    def test_headers_report_queries(self, settings, user, task_ids):
+        settings.QUERY_COUNT_HEADERS = True
+        response = APIClient().get(reverse("app:tasks-list"))
+        assert int(response["X-DB-Queries"]) >= 2
+        assert float(response["X-DB-Time"]) >= 0
+        assert response["Server-Timing"].startswith("db;dur=")
+        assert "X-DB-Query-Budget" not in response
+    def test_over_budget_is_flagged(self, settings, user, task_ids, caplog):
+        settings.QUERY_COUNT_HEADERS = True
+        settings.QUERY_BUDGETS = {"GET app:tasks-list": 1}
+        response = APIClient().get(reverse("app:tasks-list"))
+        assert response["X-DB-Query-Budget"] == "1"
+        assert "over its budget of 1" in caplog.text
+    def test_disabled_without_setting(self, settings, user):
+        settings.QUERY_COUNT_HEADERS = False
+        response = APIClient().get(reverse("app:tasks-list"))
+        assert "X-DB-Queries" not in response
+# ======================================================================================================================
@@ -0,0 +1,121 @@
+from django.db import connection, transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from accounts.models import User
+from app.models import ToDoApp
+from app.api.v1.views import TaskViewSet
+from app.views import TaskListView
+from django.test import RequestFactory
+import re
+import pytest
+
+# ======================================================================================================================
+# Every list / filter / order combination exposed by TaskViewSet
+FILTERS = {
+    "none": {},
+    "id": {"id": "1"},
+    "content": {"content": "task 1"},
+    "author": {"author": "1"},
+    "author__in": {"author__in": "1,2"},
+    "search": {"search": "task"},
+}
+ORDERINGS = [None, "id", "-id", "created_date", "-created_date"]
+PAGINATIONS = ["page", "cursor"]
+
+# Plans that read the table (not an index) from one end to the other
+FULL_SCAN = {
+    "sqlite": re.compile(r"\bSCAN (TABLE )?app_todoapp\b(?! USING (COVERING )?INDEX)"),
+    "postgresql": re.compile(r"\bSeq Scan on app_todoapp\b"),
+}
+# Plans that sort the whole table instead of walking an index in order
+FULL_SORT = {
+    "sqlite": re.compile(r"USE TEMP B-TREE FOR ORDER BY"),
+    "postgresql": re.compile(r"\bSort\b"),
+}
+
+
+def explain(queryset):
+    """
+    Returns the query plan of a queryset, disabling sequential scans where the planner could pick them for tiny tables.
+    """
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+
+def list_queries(params, pagination):
+    """
+    Returns the querysets TaskViewSet.list runs for the given query parameters.
+    """
+    request = Request(APIRequestFactory().get("/api/v1/tasks/", params))
+    view = TaskViewSet(action="list", request=request, format_kwarg=None, kwargs={})
+    queryset = view.filter_queryset(view.get_queryset())
+    paginator = view.paginator
+    if pagination == "page":
+        return {"count": queryset.order_by(), "page": queryset[: paginator.page_size]}
+    paginator.request = request
+    paginator.ordering = paginator.get_ordering(request, queryset, view)
+    fields = paginator.orderings[paginator.ordering.lstrip("-")]
+    descending = paginator.ordering.startswith("-")
+    ordered = queryset.order_by(*[("-" if descending else "") + field for field in fields])
+    key = [1] if len(fields) == 1 else ["2025-01-01T00:00:00+00:00", 1]
+    return {
+        "first": ordered[: paginator.page_size + 1],
+        "seek": ordered.filter(paginator.get_seek_filter(fields, key, descending))[: paginator.page_size + 1],
+    }
+
+
+def combinations():
+    for filter_name, filters in FILTERS.items():
+        for ordering in ORDERINGS:
+            for pagination in PAGINATIONS:
+                params = dict(filters)
+                if ordering:
+                    params["ordering"] = ordering
+                if pagination == "cursor":
+                    params["pagination"] = "cursor"
+                yield pytest.param(params, pagination, id=f"{filter_name}-{ordering or 'default'}-{pagination}")
+
+
+# ======================================================================================================================
+@pytest.fixture
+def tasks():
+    users = [User.objects.create_user(email=f'user{i}@admin.com', password='m1387m2008m') for i in range(2)]
+    for i in range(20):
+        ToDoApp.objects.create(author=users[i % 2], content=f"task {i}")
+# ======================================================================================================================
+@pytest.mark.django_db
+class TestQueryPlans:
+    @pytest.mark.parametrize("params, pagination", list(combinations()))
+    def test_no_full_table_scan(self, tasks, params, pagination):
+        if connection.vendor not in FULL_SCAN:
+            pytest.skip(f"No plan patterns for {connection.vendor}")
+        filtered = any(name in params for name in ("id", "content", "author", "author__in", "search"))
+        for name, queryset in list_queries(params, pagination).items():
+            plan = explain(queryset)
+            # An unfiltered page reads the table in key order and stops at the LIMIT, so it
+            # may walk the table. It must however never sort the whole table to get there.
+            # An unfiltered COUNT(*) visits every row by definition ('?count=false' skips it).
+            if filtered or name == "seek":
+                assert not FULL_SCAN[connection.vendor].search(plan), f"{name}:\n{plan}"
+            elif name != "count" and queryset.ordered:
+                assert not FULL_SORT[connection.vendor].search(plan), f"{name}:\n{plan}"
+    def test_html_task_list_walks_author_index(self, tasks):
+        if connection.vendor not in FULL_SCAN:
+            pytest.skip(f"No plan patterns for {connection.vendor}")
+        request = RequestFactory().get("/")
+        request.user = User.objects.get(email='user0@admin.com')
+        view = TaskListView(request=request, kwargs={})
+        plan = explain(view.get_queryset()[: view.paginate_by])
+        assert not FULL_SCAN[connection.vendor].search(plan), plan
+        assert not FULL_SORT[connection.vendor].search(plan), plan
+    def test_content_filter_matches_beyond_the_indexed_prefix(self, tasks):
+        author = User.objects.get(email='user0@admin.com')
+        long_content = "x" * 5000
+        task = ToDoApp.objects.create(author=author, content=long_content)
+        ToDoApp.objects.create(author=author, content=long_content + "y")
+        matches = list_queries({"content": long_content}, "page")["page"]
+        assert [row["id"] if isinstance(row, dict) else row.id for row in matches] == [task.id]
+# ======================================================================================================================
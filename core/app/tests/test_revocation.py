@@ -0,0 +1,114 @@
+import time
+from django.core.exceptions import ImproperlyConfigured
+from django.shortcuts import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.models import User
+from accounts.revocation import BloomFilter, FileStore, RedisStore, RevocationList, get_revocations
+from accounts.tasks import prune_revoked_tokens
+from app.querycount import QueryCounter
+import pytest
+
+# ======================================================================================================================
+@pytest.fixture
+def client():
+    return APIClient()
+@pytest.fixture
+def user():
+    user = User.objects.create_user(email='admin@admin.com', password='m1387m2008m')
+    return user
+@pytest.fixture
+def store_file(settings, tmp_path):
+    settings.JWT_REVOCATION_STORE = "file"
+    settings.JWT_REVOCATION_FILE = str(tmp_path / "revoked-tokens.jsonl")
+    settings.JWT_REVOCATION_SYNC_INTERVAL = 0  # Every lookup reads what the other processes appended
+    return settings.JWT_REVOCATION_FILE
+@pytest.fixture
+def store_down(settings):
+    settings.JWT_REVOCATION_STORE = "redis"
+    settings.REDIS_URL = "redis://127.0.0.1:1/0"  # Nothing listens there
+    settings.JWT_REVOCATION_SYNC_INTERVAL = 0
+@pytest.fixture
+def redis_url(settings):
+    import redis
+    if not settings.REDIS_URL:
+        pytest.skip("REDIS_URL is not set")
+    try:
+        redis.Redis.from_url(settings.REDIS_URL).ping()
+    except (redis.RedisError, OSError):
+        pytest.skip("No Redis server reachable at REDIS_URL")
+    return settings.REDIS_URL
+# ======================================================================================================================
+@pytest.mark.django_db
+class TestTokenVerifyAndRevoke:
+    def test_verify_checks_the_token_locally(self, client, user, store_file):
+        access = str(RefreshToken.for_user(user).access_token)
+        with QueryCounter() as counter:
+            response = client.post(reverse("accounts:api-v1:token_verify"), {"token": access})
+        assert response.status_code == 200 and counter.count == 0
+        assert client.post(reverse("accounts:api-v1:token_verify"), {"token": access[:-2]}).status_code == 401
+        assert client.post(reverse("accounts:api-v1:token_verify"), {"email": 'admin@admin.com',
+                                                                     "password": 'm1387m2008m'}).status_code == 400
+    def test_revoked_access_token_is_refused(self, client, user, store_file):
+        access = str(RefreshToken.for_user(user).access_token)
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        assert client.get(reverse("app:tasks-list")).status_code == 200
+        assert client.post(reverse("accounts:api-v1:token_revoke"), {"token": access}).status_code == 200
+        response = client.get(reverse("app:tasks-list"))
+        assert response.status_code == 401 and response.data["code"] == "token_revoked"
+        assert client.post(reverse("accounts:api-v1:token_verify"), {"token": access}).status_code == 401
+    def test_revoked_refresh_token_cannot_refresh(self, client, user, store_file):
+        refresh = str(RefreshToken.for_user(user))
+        assert client.post(reverse("accounts:api-v1:token_refresh"), {"refresh": refresh}).status_code == 200
+        client.post(reverse("accounts:api-v1:token_revoke"), {"token": refresh})
+        assert client.post(reverse("accounts:api-v1:token_refresh"), {"refresh": refresh}).status_code == 401
+    def test_store_down_fails_open_and_refuses_revocations(self, client, user, store_down, caplog):
+        access = str(RefreshToken.for_user(user).access_token)
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        assert client.get(reverse("app:tasks-list")).status_code == 200
+        assert "Could not read the revoked tokens" in caplog.text
+        response = client.post(reverse("accounts:api-v1:token_revoke"), {"token": access})
+        assert response.status_code == 503 and response.data["detail"].code == "revocation_unavailable"
+class TestRevocationList:
+    def test_revocations_reach_other_processes(self, store_file):
+        here, there = RevocationList(FileStore(store_file), 1000, 0), RevocationList(FileStore(store_file), 1000, 0)
+        assert not there.is_revoked("jti-1")
+        here.revoke("jti-1", time.time() + 60)
+        assert here.is_revoked("jti-1") and there.is_revoked("jti-1")
+        assert not there.is_revoked("jti-2")
+    def test_expired_entries_are_pruned(self, store_file):
+        other = RevocationList(FileStore(store_file), 1000, 0)
+        get_revocations().revoke("expired", time.time() - 1)
+        get_revocations().revoke("live", time.time() + 60)
+        assert other.is_revoked("live") and not other.is_revoked("expired")
+        assert prune_revoked_tokens() == 1
+        assert open(store_file).read().count("\n") == 1
+        assert other.is_revoked("live") and "expired" not in other._revoked
+    def test_redis_store_reads_only_new_revocations(self, redis_url):
+        here, there = RedisStore(redis_url), RedisStore(redis_url)
+        here.client.delete(RedisStore.key, RedisStore.log_key)
+        here.add("jti-1", time.time() + 60)
+        assert there.read_changes() == (True, [("jti-1", pytest.approx(time.time() + 60, abs=5))])
+        assert there.read_changes() == (False, [])
+        here.add("jti-2", time.time() + 60)
+        reset, entries = there.read_changes()
+        assert not reset and [jti for jti, _ in entries] == ["jti-2"]
+        here.client.delete(RedisStore.key, RedisStore.log_key)
+    def test_prune_refuses_another_store(self, store_file, settings, tmp_path):
+        get_revocations().revoke("live", time.time() + 60)
+        settings.JWT_REVOCATION_FILE = str(tmp_path / "elsewhere.jsonl")  # As a worker without the backend's store
+        with pytest.raises(ImproperlyConfigured, match="revoked-tokens.jsonl"):
+            prune_revoked_tokens()
+    def test_bloom_filter_grows_past_its_capacity(self, store_file):
+        revocations = RevocationList(FileStore(store_file), 10, 0)
+        for i in range(50):
+            revocations.revoke(f"jti-{i}", time.time() + 60)
+        assert revocations._bloom.capacity >= 50
+        assert all(revocations.is_revoked(f"jti-{i}") for i in range(50))
+    def test_bloom_filter_false_positive_rate(self):
+        bloom = BloomFilter(10_000, error_rate=0.01)
+        for i in range(10_000):
+            bloom.add(f"revoked-{i}")
+        assert all(f"revoked-{i}" in bloom for i in range(10_000))
+        assert sum(f"valid-{i}" in bloom for i in range(10_000)) < 200
+# ======================================================================================================================
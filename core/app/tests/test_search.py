@@ -0,0 +1,64 @@
+from rest_framework.test import APIClient
+from django.db import connection
+from django.shortcuts import reverse
+from django.test.utils import CaptureQueriesContext
+from accounts.models import User
+from app.models import ToDoApp
+import pytest
+
+# ======================================================================================================================
+@pytest.fixture
+def client():
+    return APIClient()
+@pytest.fixture
+def user():
+    user = User.objects.create_user(email='admin@admin.com', password='m1387m2008m')
+    return user
+# ======================================================================================================================
+@pytest.mark.django_db
+class TestTaskSearch:
+    def search(self, client, query, **params):
+        url = reverse("app:tasks-list")
+        return client.get(url, {"search": query, **params}).data["results"]
+    def test_search_ranks_best_match_first(self, client, user):
+        ToDoApp.objects.create(author=user, content="buy milk and bread")
+        best = ToDoApp.objects.create(author=user, content="milk milk milk")
+        ToDoApp.objects.create(author=user, content="walk the dog")
+        results = self.search(client, "milk")
+        assert [item["id"] for item in results][0] == best.id
+        assert len(results) == 2
+    def test_search_follows_update_and_delete(self, client, user):
+        task = ToDoApp.objects.create(author=user, content="call the plumber")
+        task.content = "call the electrician"
+        task.save()
+        assert self.search(client, "plumber") == []
+        assert len(self.search(client, "electrician")) == 1
+        task.delete()
+        assert self.search(client, "electrician") == []
+    def test_search_highlight_snippet(self, client, user):
+        ToDoApp.objects.create(author=user, content="renew the passport")
+        results = self.search(client, "passport", highlight="true")
+        assert "<mark>passport</mark>" in results[0]["highlight"]
+        assert "highlight" not in self.search(client, "passport")[0]
+    def test_search_highlight_escapes_the_content(self, client, user):
+        ToDoApp.objects.create(author=user, content="<img src=x onerror=alert(1)> foo")
+        highlight = self.search(client, "foo", highlight="true")[0]["highlight"]
+        assert highlight == "&lt;img src=x onerror=alert(1)&gt; <mark>foo</mark>"
+    def test_search_ignores_query_syntax(self, client, user):
+        ToDoApp.objects.create(author=user, content="pay rent")
+        assert len(self.search(client, 'rent"* (')) == 1
+    def test_search_matches_the_author(self, client, user):
+        other = User.objects.create_user(email='someone@example.com', password='m1387m2008m')
+        mine = ToDoApp.objects.create(author=user, content="water the plants")
+        ToDoApp.objects.create(author=other, content="water the garden")
+        assert [item["id"] for item in self.search(client, "admin")] == [mine.id]
+        assert len(self.search(client, "water")) == 2
+        User.objects.filter(pk=other.pk).update(email='gardener@example.com')
+        assert len(self.search(client, "gardener")) == 1 and self.search(client, "someone") == []
+    def test_search_joins_the_index_once(self, client, user):
+        ToDoApp.objects.create(author=user, content="pay rent")
+        with CaptureQueriesContext(connection) as queries:
+            self.search(client, "rent", highlight="true")
+        search = [query["sql"] for query in queries.captured_queries if "MATCH" in query["sql"]]
+        assert search and all(query.count("MATCH") == 1 for query in search)
+# ======================================================================================================================
@@ -0,0 +1,36 @@
+from rest_framework.test import APIClient
+from django.core.cache import cache
+from django.shortcuts import reverse
+from accounts.models import User
+from app.models import ToDoApp
+from app.api.v1.views import TaskViewSet
+import pytest
+
+# ======================================================================================================================
+@pytest.fixture
+def client():
+    return APIClient()
+@pytest.fixture
+def tasks():
+    user = User.objects.create_user(email='admin@admin.com', password='m1387m2008m')
+    return [ToDoApp.objects.create(author=user, content=f"task {i} ünïcode") for i in range(5)]
+# ======================================================================================================================
+@pytest.mark.django_db
+class TestTaskListReadSerializer:
+    @pytest.mark.parametrize("query", [
+        "",
+        "?page=2",
+        "?ordering=-id&author=1",
+        "?search=task&highlight=true",
+        "?pagination=cursor&page_size=2&ordering=created_date",
+        "?format=json&author__in=1",
+    ])
+    def test_output_is_byte_identical(self, client, tasks, monkeypatch, query):
+        url = reverse("app:tasks-list") + query
+        fast = client.get(url)
+        cache.clear()
+        monkeypatch.setattr(TaskViewSet, "list_read_serializer_class", None)
+        slow = client.get(url)
+        assert fast.status_code == slow.status_code == 200
+        assert fast.content == slow.content
+# ======================================================================================================================
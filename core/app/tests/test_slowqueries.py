@@ -0,0 +1,77 @@
+import json
+import logging
+from django.core.management import call_command
+from django.db import connection
+from django.shortcuts import reverse
+from rest_framework.test import APIClient
+from accounts.models import User
+from accounts.tasks import purge_tasks
+from app.models import PurgeJob, ToDoApp
+from app.slowqueries import SlowQueryRecorder, normalize_sql, redact_params
+from core.celery import app as celery_app
+import app.slowqueries
+import pytest
+
+# ======================================================================================================================
+@pytest.fixture
+def client():
+    return APIClient()
+@pytest.fixture
+def user():
+    user = User.objects.create_user(email='admin@admin.com', password='m1387m2008m')
+    return user
+@pytest.fixture
+def log_file(settings, tmp_path, monkeypatch):
+    settings.SLOW_QUERY_LOG = str(tmp_path / "slow-queries.jsonl")
+    monkeypatch.setattr(app.slowqueries, "_logger", None)
+    yield tmp_path / "slow-queries.jsonl"
+    logger = logging.getLogger("app.slowqueries")
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+# ======================================================================================================================
+class TestNormalization:
+    def test_values_and_lists_are_collapsed(self):
+        assert normalize_sql(
+            "SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x''y' LIMIT 21"
+        ) == "SELECT * FROM t WHERE id IN (?+) AND name = ? LIMIT ?"
+        assert normalize_sql("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)") == \
+            normalize_sql("INSERT INTO t (a, b) VALUES (%s, %s)")
+    def test_params_are_redacted(self):
+        assert redact_params(["admin@admin.com", 3, None, True]) == ["<str:15>", "<int>", None, True]
+        assert redact_params([("a", 1), ("b", 2)], many=True) == {"rows": 2, "first": ["<str:1>", "<int>"]}
+@pytest.mark.django_db
+class TestSlowQueryRecorder:
+    def test_request_queries_carry_view_and_stack(self, client, user, settings):
+        settings.SLOW_QUERY_THRESHOLD_MS = 0  # Installs SlowQueryMiddleware, every query is "slow"
+        ToDoApp.objects.create(author=user, content="task")
+        records = []
+        with connection.execute_wrapper(SlowQueryRecorder(0, log=records.append)):
+            client.get(reverse("app:tasks-list"))
+        assert records and {record["source"] for record in records} == {"app:tasks-list"}
+        aggregate = next(record for record in records if "MAX" in record["sql"])
+        assert any(frame.startswith("app/api/v1/mixins.py") for frame in aggregate["stack"])
+        assert aggregate["duration_ms"] >= 0
+    def test_fast_queries_are_not_recorded(self, user):
+        records = []
+        with connection.execute_wrapper(SlowQueryRecorder(10_000, log=records.append)):
+            ToDoApp.objects.count()
+        assert records == []
+    def test_celery_task_source(self, user, monkeypatch):
+        monkeypatch.setitem(celery_app.conf, "task_always_eager", True)
+        job = PurgeJob.objects.create()
+        records = []
+        with connection.execute_wrapper(SlowQueryRecorder(0, log=records.append)):
+            purge_tasks.delay(str(job.pk))
+        assert {record["source"] for record in records} == {"celery:accounts.tasks.purge_tasks"}
+    def test_log_file_and_report(self, user, log_file, capsys):
+        with connection.execute_wrapper(SlowQueryRecorder(0)):
+            User.objects.filter(email="admin@admin.com").first()
+            User.objects.filter(email="other@admin.com").first()
+        records = [json.loads(line) for line in log_file.read_text().splitlines()]
+        assert len(records) == 2 and records[0]["fingerprint"] == records[1]["fingerprint"]
+        assert "admin@admin.com" not in log_file.read_text()
+        call_command("slowquery_report", log=str(log_file))
+        output = capsys.readouterr().out
+        assert "2 slow queries" in output and "2x" in output and 'FROM "accounts_user"' in output
+# ======================================================================================================================
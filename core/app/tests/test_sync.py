@@ -0,0 +1,102 @@
+from rest_framework.test import APIClient
+from django.shortcuts import reverse
+from accounts.models import User
+from app.models import TaskTombstone, ToDoApp
+import pytest
+
+# ======================================================================================================================
+@pytest.fixture
+def client():
+    return APIClient()
+@pytest.fixture
+def user():
+    user = User.objects.create_user(email='admin@admin.com', password='m1387m2008m')
+    return user
+@pytest.fixture
+def other():
+    user = User.objects.create_user(email='other@admin.com', password='m1387m2008m')
+    return user
+# ======================================================================================================================
+@pytest.mark.django_db
+class TestSyncAPI:
+    def sync(self, client, since=None, limit=None):
+        params = {}
+        if since is not None:
+            params["since"] = since
+        if limit is not None:
+            params["limit"] = limit
+        return client.get(reverse("app:tasks-sync"), params)
+    def test_sync_response_401_status(self, client):
+        response = self.sync(client)
+        assert response.status_code == 401
+    def test_sync_returns_own_changes_in_order(self, client, user, other):
+        first = ToDoApp.objects.create(author=user, content="first")
+        second = ToDoApp.objects.create(author=user, content="second")
+        ToDoApp.objects.create(author=other, content="theirs")
+        first.content = "first changed"
+        first.save()
+        client.force_login(user=user)
+        response = self.sync(client)
+        assert response.status_code == 200
+        assert [(task["id"], task["content"]) for task in response.data["changes"]] == [
+            (second.id, "second"), (first.id, "first changed")]
+        assert response.data["deleted"] == []
+        assert response.data["cursor"] == first.change_seq
+        assert response.data["has_more"] is False
+        response = self.sync(client, since=response.data["cursor"])
+        assert (response.data["changes"], response.data["cursor"]) == ([], first.change_seq)
+    def test_sync_reports_deletes_as_tombstones(self, client, user):
+        tasks = [ToDoApp.objects.create(author=user, content=f"task {i}") for i in range(4)]
+        client.force_login(user=user)
+        cursor = self.sync(client).data["cursor"]
+        ids = [task.id for task in tasks]
+        tasks[0].delete()
+        client.delete(reverse("app:tasks-detail", kwargs={"pk": tasks[1].id}))
+        client.delete(reverse("app:tasks-list"), {"ids": [tasks[2].id]}, format="json")
+        response = self.sync(client, since=cursor)
+        assert response.data["changes"] == []
+        assert [tombstone["id"] for tombstone in response.data["deleted"]] == ids[:3]
+    def test_sync_records_bulk_writes(self, client, user):
+        client.force_login(user=user)
+        created = client.post(reverse("app:tasks-list"), [{"content": "a"}, {"content": "b"}], format="json")
+        ids = [result["data"]["id"] for result in created.data["results"]]
+        cursor = self.sync(client).data["cursor"]
+        client.patch(reverse("app:tasks-list"), [{"id": ids[0], "content": "a2"}], format="json")
+        response = self.sync(client, since=cursor)
+        assert [(task["id"], task["content"]) for task in response.data["changes"]] == [(ids[0], "a2")]
+    def test_sync_task_moved_to_another_author(self, client, user, other):
+        task = ToDoApp.objects.create(author=user, content="moving")
+        client.force_login(user=user)
+        cursor = self.sync(client).data["cursor"]
+        task = ToDoApp.objects.get(pk=task.pk)
+        task.author = other
+        task.save()
+        response = self.sync(client, since=cursor)
+        assert [tombstone["id"] for tombstone in response.data["deleted"]] == [task.id]
+        client.force_login(user=other)
+        assert [change["id"] for change in self.sync(client).data["changes"]] == [task.id]
+    def test_sync_pages_through_changes(self, client, user):
+        tasks = [ToDoApp.objects.create(author=user, content=f"task {i}") for i in range(7)]
+        ids = [task.id for task in tasks]
+        for task in tasks[:3]:
+            task.delete()
+        client.force_login(user=user)
+        seen, deleted, cursor, pages = [], [], 0, 0
+        while True:
+            response = self.sync(client, since=cursor, limit=3)
+            pages += 1
+            seen += [task["id"] for task in response.data["changes"]]
+            deleted += [tombstone["id"] for tombstone in response.data["deleted"]]
+            assert len(response.data["changes"]) + len(response.data["deleted"]) <= 3
+            cursor = response.data["cursor"]
+            if not response.data["has_more"]:
+                break
+        assert seen == ids[3:]
+        assert deleted == ids[:3]
+        assert pages == 3
+        assert TaskTombstone.objects.filter(author_id=user.pk).count() == 3
+    def test_sync_invalid_cursor_response_400_status(self, client, user):
+        client.force_login(user=user)
+        assert self.sync(client, since="abc").status_code == 400
+        assert self.sync(client, since=-1).status_code == 400
+# ======================================================================================================================
@@ -0,0 +1,46 @@
+from django.test import Client
+from django.shortcuts import reverse
+from accounts.models import User
+from app.models import ToDoApp
+import pytest
+
+# ======================================================================================================================
+@pytest.fixture
+def client():
+    return Client()
+@pytest.fixture
+def user():
+    user = User.objects.create_user(email='admin@admin.com', password='m1387m2008m')
+    return user
+# ======================================================================================================================
+@pytest.mark.django_db
+class TestTaskListView:
+    def test_anonymous_sees_no_tasks(self, client, user):
+        ToDoApp.objects.create(author=user, content="secret task")
+        response = client.get(reverse("app:task-list"))
+        assert response.status_code == 200
+        assert b"secret task" not in response.content
+    def test_lists_own_tasks_paginated(self, client, user):
+        other = User.objects.create_user(email='other@admin.com', password='m1387m2008m')
+        ToDoApp.objects.create(author=other, content="not mine")
+        tasks = [ToDoApp.objects.create(author=user, content=f"task {i}") for i in range(25)]
+        client.force_login(user)
+        first = client.get(reverse("app:task-list"))
+        assert [task.id for task in first.context["posts"]] == [task.id for task in reversed(tasks[5:])]
+        second = client.get(reverse("app:task-list"), {"page": 2})
+        assert [task.id for task in second.context["posts"]] == [task.id for task in reversed(tasks[:5])]
+        assert b"not mine" not in first.content + second.content
+    def test_rows_are_cached_on_id_and_updated_date(self, client, user):
+        task = ToDoApp.objects.create(author=user, content="original")
+        client.force_login(user)
+        client.get(reverse("app:task-list"))
+        # A write that keeps updated_date is not seen: the row comes from the fragment cache
+        ToDoApp.objects.filter(pk=task.pk).update(content="hidden")
+        ToDoApp.objects.create(author=user, content="another")
+        assert b"original" in client.get(reverse("app:task-list")).content
+        task.refresh_from_db()
+        task.content = "edited"
+        task.save()
+        content = client.get(reverse("app:task-list")).content
+        assert b"edited" in content and b"original" not in content
+# ======================================================================================================================
@@ -5,26 +5,72 @@ from django.views.generic import (
     UpdateView,
 )
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.utils import timezone
 from .models import ToDoApp
+from .conditional import (
+    get_not_modified_response,
+    get_queryset_state,
+    get_state_etag,
+    set_validators,
+)
+from .api.v1.paginations import CountedPaginator
 
 
 # ======================================================================================================================
 # TaskListView: A class-based view for displaying a list of tasks
 class TaskListView(ListView):
     """
-    This view retrieves and displays a list of all tasks.
+    This view displays the tasks of the logged-in user, newest first, one page at a time.
     """
 
     template_name = "main/todo.html"  # Specifies the template used to render the task list
     context_object_name = "posts"  # Sets the name used to reference the tasks in the template
+    paginate_by = 20  # Number of tasks per page ('?page=')
 
     def get_queryset(self):
         """
-        Returns the queryset containing all tasks from the database.
+        Returns the tasks of the logged-in user (none for anonymous visitors), served by the (author, created_date, id) index.
         """
-        task = ToDoApp.objects.all()  # Retrieves all tasks
+        if not self.request.user.is_authenticated:
+            return ToDoApp.objects.none()
+        task = ToDoApp.objects.filter(author=self.request.user).order_by(
+            "-created_date", "-id"
+        )  # Retrieves the user's tasks
         return task
 
+    def get_paginator(self, queryset, per_page, **kwargs):
+        """
+        Returns a paginator that already knows the number of tasks (counted with the ETag in `get`).
+        """
+        return CountedPaginator(
+            queryset, per_page, count=getattr(self, "list_count", None), **kwargs
+        )
+
+    def get_context_data(self, **kwargs):
+        """
+        Adds today's date, which the per-row fragment cache varies on because of `naturalday`.
+        """
+        context = super().get_context_data(**kwargs)
+        context["today"] = timezone.localdate()
+        return context
+
+    def get(self, request, *args, **kwargs):
+        """
+        Returns 304 when the task list did not change since the client's copy, otherwise renders it with an ETag.
+        """
+        state = get_queryset_state(self.get_queryset())
+        self.list_count = state["count"]  # Given to the paginator instead of a second COUNT
+        etag = get_state_etag(
+            state,
+            request.user.pk,  # The page shows login / logout links
+            timezone.localdate(),  # `naturalday` output changes with the date
+        )
+        not_modified = get_not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+        response = super().get(request, *args, **kwargs)
+        return set_validators(response, etag)
+
 
 # ======================================================================================================================
 # CreateTaskView: A class-based view for creating new tasks
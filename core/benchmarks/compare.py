@@ -0,0 +1,113 @@
+"""
+Compares the results of a benchmark run with the stored baseline and flags regressions.
+
+    pytest benchmarks --benchmark-json=benchmarks/results.json
+    python benchmarks/compare.py benchmarks/results.json                  # Exit status 1 on regressions
+    python benchmarks/compare.py benchmarks/results.json --save-baseline  # Makes the run the new baseline
+
+Timings depend on the machine, so the baseline should be recorded on the machine (or CI runner type) it is
+compared on. The minimum is compared by default: noise only ever adds time, so it is the most stable statistic.
+"""
+import argparse
+import json
+import platform
+import sys
+from pathlib import Path
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+
+# ======================================================================================================================
+def load_results(path, stat):
+    """
+    Returns `{benchmark full name: statistic in seconds}` from a pytest-benchmark JSON file.
+    """
+    data = json.loads(Path(path).read_text())
+    return {
+        benchmark["fullname"]: benchmark["stats"][stat]
+        for benchmark in data["benchmarks"]
+    }
+
+
+def save_baseline(path, results, stat, source):
+    Path(path).write_text(
+        json.dumps(
+            {
+                "stat": stat,
+                "machine": {
+                    "system": platform.system(),
+                    "processor": platform.processor() or platform.machine(),
+                    "python": platform.python_version(),
+                },
+                "source": str(source),
+                "benchmarks": dict(sorted(results.items())),
+            },
+            indent=2,
+        )
+        + "\n"
+    )
+
+
+def compare(baseline, results, threshold):
+    """
+    Returns one row per benchmark: `(name, baseline, current, relative change, verdict)`.
+    """
+    rows = []
+    for name in sorted(set(baseline) | set(results)):
+        before, after = baseline.get(name), results.get(name)
+        if before is None or after is None:
+            rows.append((name, before, after, None, "new" if before is None else "missing"))
+            continue
+        change = after / before - 1
+        if change > threshold:
+            verdict = "REGRESSION"
+        elif change < -threshold:
+            verdict = "improved"
+        else:
+            verdict = "ok"
+        rows.append((name, before, after, change, verdict))
+    return rows
+
+
+def format_time(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.3f}ms"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("results", help="JSON written by --benchmark-json")
+    parser.add_argument("--baseline", default=BASELINE, help="Stored baseline (default: %(default)s)")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Relative slowdown flagged as a regression (default: %(default)s)")
+    parser.add_argument("--stat", default="min", choices=["min", "median", "mean"],
+                        help="Statistic compared (default: %(default)s)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = load_results(args.results, args.stat)
+    if args.save_baseline:
+        save_baseline(args.baseline, results, args.stat, args.results)
+        print(f"Saved {len(results)} benchmarks to {args.baseline}")
+        return 0
+
+    stored = json.loads(Path(args.baseline).read_text())
+    if stored["stat"] != args.stat:
+        results = load_results(args.results, stored["stat"])
+    rows = compare(stored["benchmarks"], results, args.threshold)
+
+    width = max(len(row[0]) for row in rows) if rows else 0
+    print(f"{'benchmark':<{width}} {'baseline':>12} {'current':>12} {'change':>8}  verdict")
+    for name, before, after, change, verdict in rows:
+        change = "-" if change is None else f"{change:+.1%}"
+        print(f"{name:<{width}} {format_time(before):>12} {format_time(after):>12} {change:>8}  {verdict}")
+
+    regressions = [row for row in rows if row[4] == "REGRESSION"]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) slower than the baseline by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+# ======================================================================================================================
@@ -0,0 +1,64 @@
+import os
+from types import SimpleNamespace
+from django.core.cache import caches
+from faker import Faker
+from rest_framework.test import APIClient
+from accounts.models import User
+from app.models import ToDoApp
+import pytest
+
+# ======================================================================================================================
+# Datasets: one per size in BENCHMARK_SIZES (comma separated), created once per module and shared by its benchmarks.
+# Every benchmark still runs in its own rolled back transaction, so writes do not leak into the next one.
+DATASET_SIZES = [int(size) for size in os.environ.get("BENCHMARK_SIZES", "100,1000,10000").split(",")]
+ROUNDS = int(os.environ.get("BENCHMARK_ROUNDS", "30"))  # Rounds of the benchmarks run on a cold cache
+
+
+@pytest.fixture(scope="module", params=DATASET_SIZES, ids=lambda size: f"{size}rows")
+def dataset(request, django_db_setup, django_db_blocker):
+    size = request.param
+    fake = Faker()
+    fake.seed_instance(size)
+    with django_db_blocker.unblock():
+        user = User.objects.create_user(email=f"bench{size}@example.com", password=None)
+        other = User.objects.create_user(email=f"other{size}@example.com", password=None)
+        # Three tasks out of four belong to the benchmarked user, the rest to another author
+        ToDoApp.objects.bulk_create(
+            [ToDoApp(author=other if i % 4 == 0 else user, content=fake.paragraph(nb_sentences=1))
+             for i in range(size)],
+            batch_size=1000,
+        )
+        task = ToDoApp.objects.filter(author=user).order_by("id").last()
+        yield SimpleNamespace(
+            size=size,
+            user=user,
+            other=other,
+            task=task,
+            search_term=task.content.split()[0].strip(".").lower(),  # Matches at least one task
+        )
+        User.objects.filter(pk__in=[user.pk, other.pk]).delete()
+
+
+@pytest.fixture
+def client(dataset):
+    client = APIClient()
+    client.force_authenticate(user=dataset.user)
+    return client
+
+
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+
+
+@pytest.fixture
+def run_cold(benchmark):
+    """
+    Returns a function benchmarking its argument with every cache cleared before each round,
+    so that cached responses are not what gets measured.
+    """
+    def run(function, *args, **kwargs):
+        return benchmark.pedantic(function, args=args, kwargs=kwargs, setup=clear_caches, rounds=ROUNDS,
+                                  iterations=1)
+    return run
+# ======================================================================================================================
@@ -0,0 +1,45 @@
+from django.shortcuts import reverse
+import pytest
+
+# ======================================================================================================================
+# Requests through APIClient: the whole stack (authentication, permissions, filters, pagination, serializer,
+# renderer) on every dataset size. Lists run on a cold cache unless their name says otherwise.
+@pytest.mark.django_db
+class TestTaskAPIBenchmarks:
+    def test_list(self, run_cold, client):
+        response = run_cold(client.get, reverse("app:tasks-list"))
+        assert response.status_code == 200
+    def test_list_cached(self, benchmark, client):
+        response = benchmark(client.get, reverse("app:tasks-list"))
+        assert response.status_code == 200
+    def test_list_last_page(self, run_cold, client, dataset):
+        url = reverse("app:tasks-list")
+        last_page = client.get(url).data["total_pages"]
+        response = run_cold(client.get, url, {"page": last_page})
+        assert response.status_code == 200
+    def test_list_cursor_pagination(self, run_cold, client):
+        response = run_cold(client.get, reverse("app:tasks-list"), {"pagination": "cursor"})
+        assert response.status_code == 200
+    def test_filter_by_author(self, run_cold, client, dataset):
+        response = run_cold(client.get, reverse("app:tasks-list"), {"author": dataset.other.pk})
+        assert response.status_code == 200
+    def test_ordering(self, run_cold, client):
+        response = run_cold(client.get, reverse("app:tasks-list"), {"ordering": "-created_date"})
+        assert response.status_code == 200
+    def test_search(self, run_cold, client, dataset):
+        response = run_cold(client.get, reverse("app:tasks-list"), {"search": dataset.search_term})
+        assert response.status_code == 200
+        assert response.data["total_objects"] > 0
+    def test_retrieve(self, run_cold, client, dataset):
+        url = reverse("app:tasks-detail", kwargs={"pk": dataset.task.pk})
+        response = run_cold(client.get, url)
+        assert response.status_code == 200
+    def test_create(self, run_cold, client, dataset):
+        data = {"author": dataset.user.pk, "content": "benchmark task"}
+        response = run_cold(client.post, reverse("app:tasks-list"), data, format="json")
+        assert response.status_code == 201
+    def test_update(self, run_cold, client, dataset):
+        url = reverse("app:tasks-detail", kwargs={"pk": dataset.task.pk})
+        response = run_cold(client.patch, url, {"content": "updated"}, format="json")
+        assert response.status_code == 200
+# ======================================================================================================================
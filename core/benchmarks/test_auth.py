@@ -0,0 +1,31 @@
+import base64
+from django.shortcuts import reverse
+from rest_framework.test import APIClient
+from accounts.models import User
+import pytest
+
+HASHED_ROUNDS = 10  # Each round of the uncached benchmark runs the password hasher (hundreds of milliseconds)
+
+# ======================================================================================================================
+@pytest.fixture
+def basic_client():
+    User.objects.create_user(email="basic@example.com", password="m1387m2008m", is_staff=False)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Basic " + base64.b64encode(b"basic@example.com:m1387m2008m").decode())
+    return client
+# ======================================================================================================================
+# Basic-auth requests per second (the OPS column) with and without the verified-credential cache. The list is
+# empty and its response cached, so what is measured is mostly the authentication.
+@pytest.mark.django_db
+class TestBasicAuthBenchmarks:
+    def test_basic_auth_cached(self, benchmark, basic_client):
+        url = reverse("app:tasks-list")
+        assert basic_client.get(url).status_code == 200  # Verifies the pair once
+        response = benchmark(basic_client.get, url)
+        assert response.status_code == 200
+    def test_basic_auth_uncached(self, benchmark, basic_client, settings):
+        settings.AUTH_CREDENTIALS_TIMEOUT = 0  # Every request runs the password hasher
+        url = reverse("app:tasks-list")
+        response = benchmark.pedantic(basic_client.get, args=(url,), rounds=HASHED_ROUNDS, iterations=1)
+        assert response.status_code == 200
+# ======================================================================================================================
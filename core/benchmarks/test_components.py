@@ -0,0 +1,68 @@
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.filters import OrderingFilter
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+from app.api.v1.filters import FullTextSearchFilter
+from app.api.v1.paginations import CustomPagination, KeysetPagination
+from app.api.v1.permissions import IsOwnerOrReadOnly
+from app.api.v1.serializers import TaskListReadSerializer, UserSerializer
+from app.api.v1.views import TaskViewSet
+from app.models import ToDoApp
+import pytest
+
+SERIALIZED_ROWS = 1000  # Upper bound of the rows serialized at once, like a large page
+
+# ======================================================================================================================
+def make_request(user, method="get", data=None):
+    request = getattr(APIRequestFactory(), method)("/api/v1/tasks/", data)
+    force_authenticate(request, user=user)
+    return Request(request, parser_context={"kwargs": {}})
+def make_view(request):
+    view = TaskViewSet(request=request, action="list", kwargs={}, format_kwarg=None)
+    return view
+# ======================================================================================================================
+# The classes used by TaskViewSet on their own, without the request / response cycle
+@pytest.mark.django_db
+class TestComponentBenchmarks:
+    def test_user_serializer(self, benchmark, dataset):
+        request = make_request(dataset.user)
+        tasks = list(ToDoApp.objects.order_by("id")[:SERIALIZED_ROWS])
+        data = benchmark(lambda: UserSerializer(tasks, many=True, context={"request": request}).data)
+        assert len(data) == len(tasks)
+    def test_list_read_serializer(self, benchmark, dataset):
+        request = make_request(dataset.user)
+        rows = list(ToDoApp.objects.order_by("id").values(*TaskListReadSerializer.values_fields)[:SERIALIZED_ROWS])
+        data = benchmark(lambda: TaskListReadSerializer(rows, context={"request": request}).data)
+        assert len(data) == len(rows)
+    def test_page_number_pagination(self, benchmark, dataset):
+        request = make_request(dataset.user, data={"page": 2})
+        queryset = ToDoApp.objects.order_by("-id")
+        page = benchmark(CustomPagination().paginate_queryset, queryset, request)
+        assert len(page) == CustomPagination.page_size
+    def test_keyset_pagination(self, benchmark, dataset):
+        request = make_request(dataset.user, data={"pagination": "cursor"})
+        queryset = ToDoApp.objects.all()
+        page = benchmark(KeysetPagination().paginate_queryset, queryset, request, make_view(request))
+        assert len(page) == min(KeysetPagination.page_size, dataset.size)
+    def test_owner_permission_read(self, benchmark, dataset):
+        request = make_request(dataset.user)
+        assert benchmark(IsOwnerOrReadOnly().has_object_permission, request, None, dataset.task)
+    def test_owner_permission_write(self, benchmark, dataset):
+        request = make_request(dataset.user, method="patch")
+        task = ToDoApp.objects.get(pk=dataset.task.pk)
+        assert benchmark(IsOwnerOrReadOnly().has_object_permission, request, None, task)
+    @pytest.mark.parametrize("backend, params", [
+        (DjangoFilterBackend, {"author": "other"}),
+        (OrderingFilter, {"ordering": "-created_date"}),
+        (FullTextSearchFilter, {"search": "term"}),
+    ], ids=["django_filter", "ordering", "search"])
+    def test_filter_backend(self, benchmark, dataset, backend, params):
+        # The placeholders are replaced by values of the dataset
+        params = {key: {"other": dataset.other.pk, "term": dataset.search_term}.get(value, value)
+                  for key, value in params.items()}
+        request = make_request(dataset.user, data=params)
+        view = make_view(request)
+        queryset = ToDoApp.objects.all()
+        rows = benchmark(lambda: list(backend().filter_queryset(request, queryset, view)[:20]))
+        assert rows
+# ======================================================================================================================
@@ -0,0 +1,13 @@
+from django.core.cache import caches
+from accounts.authentication import clear_local
+import pytest
+
+# ======================================================================================================================
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Cached responses and generation counters must not leak from one test database to the next
+    for cache in caches.all():
+        cache.clear()
+    clear_local()  # Users cached by this process
+    yield
+# ======================================================================================================================
@@ -0,0 +1,4 @@
+# Loads the Celery app with Django, so that shared tasks queued by the web process use its configuration
+from .celery import app as celery_app
+
+__all__ = ("celery_app",)
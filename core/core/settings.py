@@ -46,13 +46,18 @@ INSTALLED_APPS = [
 # Middleware: Defines request handling layers
 
 MIDDLEWARE = [
+    "app.metrics.MetricsMiddleware",  # Request latency and DB work for /metrics (only with METRICS_ENABLED)
+    "app.slowqueries.SlowQueryMiddleware",  # Attributes slow queries to the view (only with SLOW_QUERY_THRESHOLD_MS)
+    "app.querycount.QueryCountMiddleware",  # Reports DB queries / time in headers (only with QUERY_COUNT_HEADERS)
     "django.middleware.security.SecurityMiddleware",  # Improves security features
     "django.contrib.sessions.middleware.SessionMiddleware",  # Manages session data
     "django.middleware.common.CommonMiddleware",  # Handles common request/response operations
     "django.middleware.csrf.CsrfViewMiddleware",  # Protects against CSRF attacks
     "django.contrib.auth.middleware.AuthenticationMiddleware",  # Manages user authentication
+    "accounts.hashing.HashingBusyMiddleware",  # Answers 503 when the password hashing pool is saturated
     "django.contrib.messages.middleware.MessageMiddleware",  # Handles messaging framework
     "django.middleware.clickjacking.XFrameOptionsMiddleware",  # Protects against clickjacking attacks
+    "app.profiling.ProfilingMiddleware",  # Profiles requests on demand or 1 in PROFILING_SAMPLE_RATE
 ]
 
 # ======================================================================================================================
@@ -147,20 +152,157 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"  # Uses BigAutoField as the
 AUTH_USER_MODEL = "accounts.User"  # Defines a custom user model (instead of Django's default user model)
 LOGIN_REDIRECT_URL = "/"  # Redirects users after login
 
+# Password hashing: PASSWORD_HASHER hashes new passwords, the other hashers still verify older hashes. A password
+# hashed with another hasher or iteration count is rehashed at its next successful login (see accounts/hashing.py).
+PASSWORD_HASHER = config("PASSWORD_HASHER", default="accounts.hashing.PBKDF2PasswordHasher")
+PASSWORD_HASHERS = [PASSWORD_HASHER] + [
+    hasher for hasher in [
+        "accounts.hashing.PBKDF2PasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+        "django.contrib.auth.hashers.Argon2PasswordHasher",  # Needs argon2-cffi
+        "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",  # Needs bcrypt
+    ] if hasher != PASSWORD_HASHER
+]
+PASSWORD_HASH_ITERATIONS = config("PASSWORD_HASH_ITERATIONS", default=260000, cast=int)  # PBKDF2 iterations
+# Hashes and checks run on a process pool of each worker process, PASSWORD_HASHING_CONCURRENCY at once at most;
+# PASSWORD_HASHING_QUEUE_SIZE more wait up to PASSWORD_HASHING_QUEUE_TIMEOUT seconds, the others get a 503
+PASSWORD_HASHING_WORKERS = config("PASSWORD_HASHING_WORKERS", default=1, cast=int)  # 0 hashes in the request thread
+PASSWORD_HASHING_CONCURRENCY = config("PASSWORD_HASHING_CONCURRENCY", default=1, cast=int)
+PASSWORD_HASHING_QUEUE_SIZE = config("PASSWORD_HASHING_QUEUE_SIZE", default=2, cast=int)
+PASSWORD_HASHING_QUEUE_TIMEOUT = config("PASSWORD_HASHING_QUEUE_TIMEOUT", default=5, cast=float)
+PASSWORD_HASHING_NICE = config("PASSWORD_HASHING_NICE", default=10, cast=int)  # Lower CPU priority of the pool
+
 # ======================================================================================================================
 # Django REST Framework Configuration
 REST_FRAMEWORK = {
+    "EXCEPTION_HANDLER": "accounts.hashing.exception_handler",  # DRF's handler, plus 503 for a saturated hashing pool
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.BasicAuthentication",  # Basic authentication
+        "accounts.authentication.CachedBasicAuthentication",  # Basic authentication, verified pairs cached
         "rest_framework.authentication.SessionAuthentication",  # Session-based authentication
-        "rest_framework_simplejwt.authentication.JWTAuthentication",  # JWT authentication
+        "accounts.authentication.CachedJWTAuthentication",  # JWT authentication, users from the user cache
+        "accounts.authentication.CachedTokenAuthentication",  # DRF tokens ('Token <key>'), from the token cache
     ]
 }
+# ======================================================================================================================
+# Cache Configuration: Redis (django-redis) when REDIS_URL is set, otherwise a per-process in-memory cache
+
+REDIS_URL = config("REDIS_URL", default=None)
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",  # Shared between all workers
+            "LOCATION": REDIS_URL,
+            "OPTIONS": {
+                "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            },
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",  # Local to each process
+            "LOCATION": "todoapp",
+        }
+    }
+
+# Authenticated users (see accounts/authentication.py): a per-process LRU in front of the shared cache, both with a
+# short lifetime; a saved user is dropped from the shared cache at once
+AUTH_USER_CACHE_ALIAS = "default"
+AUTH_USER_CACHE_TIMEOUT = config("AUTH_USER_CACHE_TIMEOUT", default=60, cast=int)  # Seconds in the shared cache
+AUTH_USER_LOCAL_TIMEOUT = config("AUTH_USER_LOCAL_TIMEOUT", default=5, cast=int)  # Seconds in each process (0 disables)
+AUTH_USER_LOCAL_SIZE = 10000  # Users kept in each process
+# Basic auth email / password pairs verified by the password hasher, kept by their HMAC in each process
+AUTH_CREDENTIALS_TIMEOUT = config("AUTH_CREDENTIALS_TIMEOUT", default=60, cast=int)  # Seconds (0 disables)
+AUTH_CREDENTIALS_SIZE = 10000  # Pairs kept in each process
+# DRF tokens: token -> user id, in each process and in the shared cache; a deleted token (logout) is dropped at once
+AUTH_TOKEN_CACHE_TIMEOUT = config("AUTH_TOKEN_CACHE_TIMEOUT", default=300, cast=int)  # Seconds in the shared cache
+AUTH_TOKEN_LOCAL_TIMEOUT = config("AUTH_TOKEN_LOCAL_TIMEOUT", default=5, cast=int)  # Seconds in each process
+AUTH_TOKEN_LOCAL_SIZE = 10000  # Tokens kept in each process
+AUTH_TOKEN_MAX_AGE_DAYS = config("AUTH_TOKEN_MAX_AGE_DAYS", default=30, cast=int)  # Deleted by expire_tokens
+# Revoked JWTs (see accounts/revocation.py): kept in memory by every process and synced through Redis (a sorted set)
+# or a JSON Lines file on a volume shared by the workers; expired ones are pruned by Celery beat
+JWT_REVOCATION_STORE = config("JWT_REVOCATION_STORE", default="redis" if REDIS_URL else "file")  # "redis" or "file"
+JWT_REVOCATION_FILE = config("JWT_REVOCATION_FILE", default=str(BASE_DIR / "data" / "revoked-tokens.jsonl"))
+JWT_REVOCATION_SYNC_INTERVAL = config("JWT_REVOCATION_SYNC_INTERVAL", default=1, cast=float)  # Seconds
+JWT_REVOCATION_CAPACITY = 100000  # Revoked tokens the Bloom filter is sized for (it grows past them)
+JWT_REVOCATION_PRUNE_INTERVAL = config("JWT_REVOCATION_PRUNE_INTERVAL", default=3600, cast=int)  # Seconds
+
+TASK_CACHE_ALIAS = "default"  # Cache holding task API responses and their generation counters
+TASK_CACHE_TIMEOUT = config("TASK_CACHE_TIMEOUT", default=60, cast=int)  # Seconds a cached task response lives at most
+
+# ======================================================================================================================
+# Task Search: Dotted path of the backend answering '?search=' on the task API
+# Leave unset to pick SQLite FTS5 or PostgreSQL tsvector search from the database engine (see app/search.py)
+TASK_SEARCH_BACKEND = config("TASK_SEARCH_BACKEND", default=None)
+
+# ======================================================================================================================
+# Task Push: SSE / WebSocket streams of task change events served by core/asgi.py (see app/push.py)
+# Events fan out through Redis pub/sub when REDIS_URL is set, otherwise within the writing process only
+
+TASK_PUSH_SSE_PATH = "/events/tasks/"  # Server-Sent Events stream
+TASK_PUSH_WEBSOCKET_PATH = "/ws/tasks/"  # WebSocket stream
+TASK_PUSH_STATS_PATH = "/events/stats/"  # Connection count of the answering process
+TASK_PUSH_KEEPALIVE = config("TASK_PUSH_KEEPALIVE", default=15, cast=int)  # Seconds between SSE keepalive comments
+TASK_PUSH_QUEUE_SIZE = 100  # Undelivered events kept per connection
+
+# ======================================================================================================================
+# Metrics: Prometheus metrics served at /metrics (see app/metrics.py)
+# Set the PROMETHEUS_MULTIPROC_DIR environment variable to a writable directory when the server runs several
+# processes (gunicorn workers, Celery pool): every scrape then reports the totals of all of them.
+
+METRICS_ENABLED = config("METRICS_ENABLED", default=True, cast=bool)  # Request latency / DB histograms
+CELERY_METRICS_PORT = config("CELERY_METRICS_PORT", default=None)  # Port of the metrics server of Celery workers
+
+# ======================================================================================================================
+# Profiling: '?profile=cprofile|stacks' (or 'X-Profile:') returns the profile of that request instead of its response,
+# for superusers and for requests signed with PROFILING_SECRET (see app/profiling.py). Not for staff: every user is.
+
+PROFILING_SUPERUSERS = config("PROFILING_SUPERUSERS", default=True, cast=bool)  # Whether superusers may profile requests
+PROFILING_SECRET = config("PROFILING_SECRET", default=None)  # HMAC key of X-Profile-Signature (unset: no signing)
+PROFILING_SAMPLE_RATE = config("PROFILING_SAMPLE_RATE", default=0, cast=int)  # Profiles 1 in N requests to disk (0: off)
+PROFILING_SAMPLE_INTERVAL = 0.001  # Seconds between two stack samples of '?profile=stacks'
+PROFILING_DIR = config("PROFILING_DIR", default=str(BASE_DIR / "profiles"))  # Sampled profiles, one folder per view
+
+# ======================================================================================================================
+# Slow Query Log: queries slower than the threshold are written to a rotating JSONL file with their normalized SQL,
+# redacted parameters, view or Celery task and stack (see app/slowqueries.py, summarized by `manage.py slowquery_report`)
+
+SLOW_QUERY_THRESHOLD_MS = config(
+    "SLOW_QUERY_THRESHOLD_MS", default="", cast=lambda v: float(v) if v else None
+)  # Milliseconds (unset: no log)
+SLOW_QUERY_LOG = config("SLOW_QUERY_LOG", default=str(BASE_DIR / "logs" / "slow-queries.jsonl"))
+SLOW_QUERY_LOG_MAX_BYTES = 10 * 1024 * 1024  # Size at which the log is rotated
+SLOW_QUERY_LOG_BACKUPS = 5  # Rotated files kept (slow-queries.jsonl.1 ... .5)
+SLOW_QUERY_STACK_DEPTH = 8  # Innermost frames of the project's code kept per query
+
+# ======================================================================================================================
+# Query Budgets: Database queries one request may run, by "<METHOD> <view name>" (see app/querycount.py)
+# Every budget is enforced by app/tests/test_query_budgets.py; with QUERY_COUNT_HEADERS on, each response reports
+# its queries and DB time, and requests over budget are logged.
+
+QUERY_COUNT_HEADERS = config("QUERY_COUNT_HEADERS", default=DEBUG, cast=bool)  # X-DB-Queries / X-DB-Time headers
+
+QUERY_BUDGETS = {
+    "GET app:tasks-list": 2,  # ETag aggregate (also the count), page - whatever the page size
+    "GET app:tasks-detail": 2,  # ETag timestamp, task
+    "POST app:tasks-list": 6,  # One task, or a bulk create whatever its size
+    "PUT app:tasks-list": 6,  # Bulk update, whatever its size
+    "PATCH app:tasks-list": 6,  # Bulk partial update, whatever its size
+    "DELETE app:tasks-list": 9,  # Bulk delete with the tombstones, whatever its size
+    "PATCH app:tasks-detail": 6,  # Task, change counter, update (in a savepoint)
+    "DELETE app:tasks-detail": 7,  # Same as PATCH, with the tombstone
+    "GET app:tasks-sync": 2,  # Changes, tombstones - whatever the page size
+    "GET app:tasks-export": 1,  # One streamed query
+    "GET app:task-list": 4,  # HTML list: session, user, ETag aggregate (also the count), page
+}
+
 # ======================================================================================================================
 # Email Configuration
 
 # EMAIL_BACKEND: Defines the email backend used for sending emails
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+EMAIL_BACKEND = "app.metrics.InstrumentedEmailBackend"  # Times the sending for /metrics
+METRICS_EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"  # Backend that actually sends
 
 # SMTP Configuration
 EMAIL_HOST = "smtp4dev"  # Defines the SMTP email server
@@ -179,5 +321,15 @@ CORS_ALLOWED_ORIGINS = [
 # ======================================================================================================================
 
 CELERY_BROKER_URL = "redis://redis:6379/0"
+CELERY_RESULT_BACKEND = config("CELERY_RESULT_BACKEND", default="redis://redis:6379/0")  # Progress of purge jobs
+
+CELERY_BEAT_SCHEDULE = {
+    "prune-revoked-tokens": {
+        "task": "accounts.tasks.prune_revoked_tokens",
+        "schedule": JWT_REVOCATION_PRUNE_INTERVAL,
+    },
+}
+
+TASK_PURGE_CHUNK_SIZE = config("TASK_PURGE_CHUNK_SIZE", default=1000, cast=int)  # Tasks deleted per transaction by purges
 
 # ======================================================================================================================
\ No newline at end of file
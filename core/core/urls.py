@@ -5,6 +5,7 @@ from django.conf import settings
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
+from app.metrics import metrics_view
 
 # ======================================================================================================================
 # Generating API documentation using drf-yasg (Django REST Framework - Yet Another Swagger Generator)
@@ -35,6 +36,8 @@ urlpatterns = [
     path("", include("app.urls")),
     # Including authentication-related routes for user management
     path("accounts/", include("accounts.urls")),
+    # Prometheus metrics (blocked at the proxy: scraped from the backend directly)
+    path("metrics", metrics_view, name="metrics"),
     # Django REST framework built-in authentication views (login, logout, etc.)
     path("api-auth/", include("rest_framework.urls")),
     # API documentation routes using Swagger UI and ReDoc
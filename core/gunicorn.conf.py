@@ -0,0 +1,18 @@
+# Gunicorn settings, read from the working directory (core/) when gunicorn starts.
+# With PROMETHEUS_MULTIPROC_DIR set, every worker writes its metrics to that directory (see app/metrics.py).
+
+
+# ======================================================================================================================
+def on_starting(server):
+    # Samples of the previous run would be added to the new totals
+    from app.metrics import clear_multiprocess_dir
+
+    clear_multiprocess_dir()
+
+
+def child_exit(server, worker):
+    # Keeps the counters of the worker, drops its live gauges
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
+# ======================================================================================================================
@@ -1,16 +1,11 @@
-from locust import HttpUser, task, between
+"""
+Task API workload. The accounts come from LOCUST_ACCOUNTS (see workload/accounts.py):
 
-# ======================================================================================================================
-class QuickstartUser(HttpUser):
-    def on_start(self):
-        response=self.client.post("/accounts/api/v1/jwt/token/create/",data={
-          "email": "mohammadmatin13872008@gmail.com",
-          "password": "m1387m2008m"
-        }).json()
-        self.client.headers = {"Authorization": f"Bearer {response['accessToken']}"}
-
-    @task
-    def task_list(self):
-        self.client.get("/api/v1/tasks/")
+    python manage.py insert_data --users 1000 --accounts-file locust/accounts.csv
+    locust -f locust/locustfile.py --host http://127.0.0.1:8000
+    python locust/run_headless.py --host http://127.0.0.1:8000 --users 50 --run-time 60 --output results.json
+"""
+from workload.users import BulkSyncerUser, ReaderUser, SearcherUser, WriterUser
 
-# ======================================================================================================================
\ No newline at end of file
+__all__ = ["ReaderUser", "WriterUser", "SearcherUser", "BulkSyncerUser"]
+# ======================================================================================================================
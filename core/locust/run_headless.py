@@ -0,0 +1,171 @@
+"""
+Runs the task API workload without the Locust web UI and writes latency percentiles and throughput to JSON.
+
+    python locust/run_headless.py --host http://127.0.0.1:8000 --users 50 --run-time 60 --output results.json
+    python locust/run_headless.py ... --output after.json --compare before.json   # Prints the changes
+    python locust/run_headless.py ... --user-classes reader --login-storm 20      # Reads before / during a login storm
+
+The accounts are read as by the locustfile (LOCUST_ACCOUNTS, LOCUST_PASSWORD, LOCUST_ZIPF_SKEW, LOCUST_SEED).
+Runs are only comparable with the same users, run time, data set and machine, which are stored with the results.
+With --login-storm, LoginStormUser users start logging in non-stop after --storm-after seconds: the stats of the
+calm phase are stored under "before_storm" and compared with the storm phase (the main results) at the end.
+"""
+from locust.env import Environment  # Imported first: Locust patches the standard library for gevent
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+import gevent
+from locust.stats import stats_printer
+from workload.users import BulkSyncerUser, LoginStormUser, ReaderUser, SearcherUser, WriterUser
+
+USER_CLASSES = {
+    "reader": ReaderUser,
+    "writer": WriterUser,
+    "searcher": SearcherUser,
+    "syncer": BulkSyncerUser,
+}
+PERCENTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+# ======================================================================================================================
+def summarize(entry, duration):
+    """
+    Returns the numbers of one stats entry (a request name, or the total) in milliseconds and requests/s.
+    """
+    summary = {
+        "requests": entry.num_requests,
+        "failures": entry.num_failures,
+        "rps": round(entry.num_requests / duration, 2) if duration else 0,
+        "avg_ms": round(entry.avg_response_time, 2),
+        "min_ms": round(entry.min_response_time or 0, 2),
+        "max_ms": round(entry.max_response_time, 2),
+    }
+    for percentile in PERCENTILES:
+        summary[f"p{percentile * 100:g}_ms"] = (
+            entry.get_response_time_percentile(percentile) if entry.num_requests else 0
+        )
+    return summary
+
+
+def collect(stats, duration):
+    return {
+        "total": summarize(stats.total, duration),
+        "requests": {
+            f"{method} {name}": summarize(entry, duration)
+            for (name, method), entry in sorted(stats.entries.items())
+        },
+    }
+
+
+def run(args):
+    user_classes = [USER_CLASSES[name] for name in args.user_classes]
+    environment = Environment(
+        user_classes=user_classes + ([LoginStormUser] if args.login_storm else []), host=args.host
+    )
+    runner = environment.create_local_runner()
+    if not args.quiet:
+        gevent.spawn(stats_printer(environment.stats))
+
+    started = datetime.now(timezone.utc)
+    phase_started = started
+    phases = {}
+
+    def start_storm():
+        nonlocal phase_started
+        now = datetime.now(timezone.utc)
+        phases["before_storm"] = collect(environment.stats, (now - phase_started).total_seconds())
+        environment.stats.reset_all()
+        phase_started = now
+        runner.spawn_users({LoginStormUser.__name__: args.login_storm})
+
+    runner.start(args.users, spawn_rate=args.spawn_rate, user_classes=user_classes)
+    if args.login_storm:
+        gevent.spawn_later(args.storm_after or args.run_time / 2, start_storm)
+    gevent.spawn_later(args.run_time, runner.quit)
+    runner.greenlet.join()
+    finished = datetime.now(timezone.utc)
+    duration = (finished - started).total_seconds()
+
+    stats = environment.stats
+    return {
+        "meta": {
+            "host": args.host,
+            "users": args.users,
+            "spawn_rate": args.spawn_rate,
+            "run_time": args.run_time,
+            "user_classes": args.user_classes,
+            "login_storm": args.login_storm,
+            "started": started.isoformat(),
+            "duration": round(duration, 2),
+            "python": platform.python_version(),
+        },
+        **collect(stats, (finished - phase_started).total_seconds()),
+        **phases,
+        "errors": [
+            {"method": error.method, "name": error.name, "error": str(error.error), "occurrences": error.occurrences}
+            for error in stats.errors.values()
+        ],
+    }
+
+
+def print_comparison(before, after):
+    """
+    Prints the p50 / p95 latencies and throughput of two runs side by side.
+    """
+    rows = [("total", before["total"], after["total"])] + [
+        (name, before["requests"].get(name), entry) for name, entry in after["requests"].items()
+    ]
+    width = max(len(name) for name, *_ in rows)
+    print(f"{'request':<{width}} {'p50 ms':>15} {'p95 ms':>15} {'req/s':>15}")
+
+    def change(old, new):
+        if not old:
+            return f"{new:>15g}"
+        return f"{new:>7g} ({new / old - 1:+.0%})".rjust(15)
+
+    for name, old, new in rows:
+        old = old or {}
+        print(
+            f"{name:<{width}} {change(old.get('p50_ms'), new['p50_ms'])} "
+            f"{change(old.get('p95_ms'), new['p95_ms'])} {change(old.get('rps'), new['rps'])}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="http://127.0.0.1:8000", help="Base URL of the server")
+    parser.add_argument("--users", type=int, default=20, help="Simulated users (default: %(default)s)")
+    parser.add_argument("--spawn-rate", type=float, default=5, help="Users started per second (default: %(default)s)")
+    parser.add_argument("--run-time", type=float, default=60, help="Seconds of load (default: %(default)s)")
+    parser.add_argument("--user-classes", nargs="+", choices=USER_CLASSES, default=list(USER_CLASSES),
+                        help="User classes run, with their weights (default: all)")
+    parser.add_argument("--output", default="results.json", help="JSON file written (default: %(default)s)")
+    parser.add_argument("--compare", help="Results of a previous run to compare with")
+    parser.add_argument("--login-storm", type=int, default=0, metavar="USERS",
+                        help="Login storm users started after --storm-after seconds (default: none)")
+    parser.add_argument("--storm-after", type=float, default=None,
+                        help="Seconds before the login storm (default: half the run time)")
+    parser.add_argument("--quiet", action="store_true", help="Do not print the stats while running")
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+    total = results["total"]
+    print(
+        f"\n{total['requests']} requests, {total['failures']} failures, {total['rps']} req/s, "
+        f"p50 {total['p50_ms']}ms, p95 {total['p95_ms']}ms, p99 {total['p99_ms']}ms -> {args.output}"
+    )
+    if "before_storm" in results:
+        print("\nBefore the login storm -> during it:")
+        print_comparison(results["before_storm"], results)
+    if args.compare:
+        print_comparison(json.loads(Path(args.compare).read_text()), results)
+    return 1 if total["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+# ======================================================================================================================
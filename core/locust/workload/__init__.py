@@ -0,0 +1,5 @@
+"""
+Locust workload for the task API: an account pool picked with a Zipf skew (accounts.py) and the reader,
+writer, searcher and bulk syncer user classes (users.py). locustfile.py exposes the user classes to Locust
+and run_headless.py runs them without the web UI, writing the results to JSON.
+"""
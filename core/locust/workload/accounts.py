@@ -0,0 +1,58 @@
+import bisect
+import csv
+import itertools
+import os
+import random
+from pathlib import Path
+
+DEFAULT_ACCOUNTS = Path(__file__).resolve().parent.parent / "accounts.csv"  # core/locust/accounts.csv
+
+
+# ======================================================================================================================
+# AccountPool: The pre-seeded accounts the simulated users log in with
+class AccountPool:
+    """
+    This class picks accounts with a Zipf skew: the account of rank k is chosen with a probability proportional
+    to 1 / k^s, so a few accounts are very active and most are rarely used, as with real users.
+
+    The accounts are the emails listed in LOCUST_ACCOUNTS (default: core/locust/accounts.csv), one per line as
+    written by `manage.py insert_data --accounts-file`, all with the password LOCUST_PASSWORD.
+    """
+
+    def __init__(self, emails, password, skew=1.1, seed=None):
+        if not emails:
+            raise ValueError("The account pool is empty.")
+        self.emails = list(emails)
+        self.password = password
+        self.random = random.Random(seed)
+        # Shuffled once, so that the busiest accounts are not always the first seeded ones
+        self.random.shuffle(self.emails)
+        self.cum_weights = list(
+            itertools.accumulate(
+                1 / rank ** skew for rank in range(1, len(self.emails) + 1)
+            )
+        )
+
+    @classmethod
+    def from_environment(cls):
+        path = os.environ.get("LOCUST_ACCOUNTS", DEFAULT_ACCOUNTS)
+        with open(path, newline="") as file:
+            emails = [row[0] for row in csv.reader(file) if row and row[0] != "email"]
+        seed = os.environ.get("LOCUST_SEED")
+        return cls(
+            emails,
+            password=os.environ.get("LOCUST_PASSWORD", "m1387m2008m"),
+            skew=float(os.environ.get("LOCUST_ZIPF_SKEW", "1.1")),
+            seed=int(seed) if seed is not None else None,
+        )
+
+    def pick(self):
+        """
+        Returns `(email, password)` of an account drawn with the Zipf skew.
+        """
+        point = self.random.random() * self.cum_weights[-1]
+        index = bisect.bisect_left(self.cum_weights, point)
+        return self.emails[min(index, len(self.emails) - 1)], self.password
+
+
+# ======================================================================================================================
@@ -0,0 +1,321 @@
+import base64
+import json
+import random
+import time
+from locust import HttpUser, between, constant, task
+from .accounts import AccountPool
+
+API = "/api/v1/tasks/"
+TOKEN_CREATE = "/accounts/api/v1/jwt/token/create/"
+TOKEN_REFRESH = "/accounts/api/v1/jwt/token/refresh/"
+
+# Words of the generated task contents (Faker's lorem provider), used as search terms
+SEARCH_WORDS = [
+    "whatever", "american", "population", "movement", "recently", "describe", "political",
+    "business", "property", "economy", "language", "research", "military", "strategy", "yourself",
+    "tonight", "dinner", "project", "meeting", "report", "growth", "future", "market", "system",
+]
+
+_account_pool = None
+
+
+def get_account_pool():
+    # Loaded once per Locust process and shared by all its simulated users
+    global _account_pool
+    if _account_pool is None:
+        _account_pool = AccountPool.from_environment()
+    return _account_pool
+
+
+def decode_claims(token):
+    """
+    Returns the claims of a JWT without verifying it (the client only needs 'exp' and 'user_id').
+    """
+    payload = token.split(".")[1]
+    return json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+
+
+# ======================================================================================================================
+# TaskApiUser: Logs in with a pooled account and keeps its JWT fresh
+class TaskApiUser(HttpUser):
+    """
+    This base class logs in with an account of the pool, refreshes the access token shortly before it
+    expires (or after a 401) and logs in again once the refresh token is no longer accepted.
+    """
+
+    abstract = True
+    wait_time = between(1, 3)
+    refresh_margin = 30  # Seconds before expiry the access token is refreshed
+
+    def on_start(self):
+        self.email, self.password = get_account_pool().pick()
+        self.task_ids = []  # IDs of tasks of this account seen in responses
+        self.login()
+
+    def login(self):
+        response = self.client.post(
+            TOKEN_CREATE, json={"email": self.email, "password": self.password}, name="jwt create"
+        )
+        response.raise_for_status()
+        data = response.json()
+        self.set_tokens(data["access"], data["refresh"])
+
+    def refresh(self):
+        with self.client.post(
+            TOKEN_REFRESH, json={"refresh": self.refresh_token}, name="jwt refresh", catch_response=True
+        ) as response:
+            if response.status_code == 401:
+                response.success()  # The refresh token expired: not an error of the server
+                return self.login()
+            response.raise_for_status()
+            data = response.json()
+            # The refresh token is only returned again when ROTATE_REFRESH_TOKENS is on
+            self.set_tokens(data["access"], data.get("refresh", self.refresh_token))
+
+    def set_tokens(self, access, refresh):
+        claims = decode_claims(access)
+        self.access_token, self.refresh_token = access, refresh
+        self.access_expires = claims["exp"]
+        self.user_id = claims["user_id"]
+
+    def api(self, method, path, name=None, **kwargs):
+        """
+        Sends an authenticated request, refreshing the token first when needed and once more after a 401.
+        """
+        if time.time() > self.access_expires - self.refresh_margin:
+            self.refresh()
+        headers = kwargs.pop("headers", {})
+        for attempt in range(2):
+            response = self.client.request(
+                method, path, name=name or path,
+                headers={**headers, "Authorization": f"Bearer {self.access_token}"}, **kwargs,
+            )
+            if response.status_code != 401 or attempt:
+                return response
+            self.refresh()
+
+    def remember_tasks(self, results):
+        for item in results:
+            if item.get("author") == self.user_id and item["id"] not in self.task_ids:
+                self.task_ids.append(item["id"])
+        del self.task_ids[:-200]  # Keeps the most recent ones
+
+    def own_task_id(self):
+        return random.choice(self.task_ids) if self.task_ids else None
+
+
+# ======================================================================================================================
+# ReaderUser: Browses task lists and tasks
+class ReaderUser(TaskApiUser):
+    """
+    The most common client: lists, pages through, opens and revalidates tasks.
+    """
+
+    weight = 6
+
+    @task(5)
+    def first_page(self):
+        response = self.api("GET", API, name="list")
+        if response.ok:
+            self.remember_tasks(response.json()["results"])
+
+    @task(2)
+    def my_tasks(self):
+        response = self.api("GET", API, name="list ?author=me", params={"author": self.user_id})
+        if response.ok:
+            self.remember_tasks(response.json()["results"])
+
+    @task(2)
+    def paginate(self):
+        # Follows the 'next' links of page number pagination for a few pages
+        url = API
+        for _ in range(random.randint(2, 4)):
+            response = self.api("GET", url, name="list ?page=n")
+            if not response.ok or not response.json()["links"]["next"]:
+                break
+            url = response.json()["links"]["next"]
+
+    @task(2)
+    def paginate_cursor(self):
+        url, params = API, {"pagination": "cursor"}
+        for _ in range(random.randint(2, 4)):
+            response = self.api("GET", url, name="list ?pagination=cursor", params=params)
+            if not response.ok or not response.json()["links"]["next"]:
+                break
+            url, params = response.json()["links"]["next"], None
+
+    @task(3)
+    def retrieve(self):
+        pk = self.own_task_id()
+        if pk is not None:
+            self.api("GET", f"{API}{pk}/", name="retrieve")
+
+    @task(2)
+    def revalidate(self):
+        # Conditional GET, as a client with a cached copy of its list does
+        response = self.api("GET", API, name="list")
+        etag = response.headers.get("ETag")
+        if etag:
+            self.api("GET", API, name="list If-None-Match", headers={"If-None-Match": etag})
+
+
+# ======================================================================================================================
+# WriterUser: Creates, edits and deletes tasks
+class WriterUser(TaskApiUser):
+    """
+    Keeps its own task list changing: creates more than it deletes, so accounts slowly grow.
+    """
+
+    weight = 2
+
+    @task(4)
+    def create(self):
+        response = self.api(
+            "POST", API, name="create",
+            json={"author": self.user_id, "content": " ".join(random.sample(SEARCH_WORDS, 6))},
+        )
+        if response.status_code == 201:
+            self.task_ids.append(response.json()["id"])
+
+    @task(3)
+    def update(self):
+        pk = self.own_task_id()
+        if pk is not None:
+            response = self.api(
+                "PATCH", f"{API}{pk}/", name="update", json={"content": " ".join(random.sample(SEARCH_WORDS, 6))}
+            )
+            if response.status_code == 404:
+                self.task_ids.remove(pk)
+
+    @task(1)
+    def delete(self):
+        pk = self.own_task_id()
+        if pk is not None:
+            self.task_ids.remove(pk)
+            self.api("DELETE", f"{API}{pk}/", name="delete")
+
+    @task(1)
+    def my_tasks(self):
+        response = self.api("GET", API, name="list ?author=me", params={"author": self.user_id})
+        if response.ok:
+            self.remember_tasks(response.json()["results"])
+
+
+# ======================================================================================================================
+# SearcherUser: Runs full-text searches
+class SearcherUser(TaskApiUser):
+    """
+    Searches one or two words, sometimes with highlighting, sometimes within its own tasks.
+    """
+
+    weight = 2
+
+    @task(4)
+    def search(self):
+        self.api("GET", API, name="search", params={"search": random.choice(SEARCH_WORDS)})
+
+    @task(2)
+    def search_two_words(self):
+        self.api("GET", API, name="search 2 words", params={"search": " ".join(random.sample(SEARCH_WORDS, 2))})
+
+    @task(1)
+    def search_highlight(self):
+        self.api(
+            "GET", API, name="search ?highlight",
+            params={"search": random.choice(SEARCH_WORDS), "highlight": "true"},
+        )
+
+    @task(1)
+    def search_mine(self):
+        self.api(
+            "GET", API, name="search ?author=me",
+            params={"search": random.choice(SEARCH_WORDS), "author": self.user_id},
+        )
+
+
+# ======================================================================================================================
+# BulkSyncerUser: An offline-first client syncing deltas and pushing batches
+class BulkSyncerUser(TaskApiUser):
+    """
+    Catches up with the sync endpoint from its cursor, then uploads, edits and deletes tasks in bulk requests.
+    """
+
+    weight = 1
+    wait_time = between(5, 15)
+    batch_size = 20  # Tasks per bulk request
+
+    def on_start(self):
+        super().on_start()
+        self.cursor = 0
+
+    @task(4)
+    def sync(self):
+        # Pages through the changes since the last cursor
+        while True:
+            response = self.api("GET", f"{API}sync/", name="sync", params={"since": self.cursor, "limit": 500})
+            if not response.ok:
+                break
+            data = response.json()
+            self.remember_tasks(data["changes"])
+            deleted = {item["id"] for item in data["deleted"]}
+            self.task_ids = [pk for pk in self.task_ids if pk not in deleted]
+            self.cursor = data["cursor"]
+            if not data["has_more"]:
+                break
+
+    @task(2)
+    def bulk_create(self):
+        items = [{"content": " ".join(random.sample(SEARCH_WORDS, 6))} for _ in range(self.batch_size)]
+        response = self.api("POST", API, name="bulk create", json=items)
+        if response.ok:
+            self.task_ids += [result["data"]["id"] for result in response.json()["results"] if "data" in result]
+
+    @task(2)
+    def bulk_update(self):
+        ids = random.sample(self.task_ids, min(self.batch_size, len(self.task_ids)))
+        if ids:
+            items = [{"id": pk, "content": " ".join(random.sample(SEARCH_WORDS, 6))} for pk in ids]
+            self.api("PATCH", API, name="bulk update", json=items)
+
+    @task(1)
+    def bulk_delete(self):
+        ids = random.sample(self.task_ids, min(self.batch_size // 2, len(self.task_ids)))
+        if ids:
+            self.task_ids = [pk for pk in self.task_ids if pk not in ids]
+            self.api("DELETE", API, name="bulk delete", json={"ids": ids})
+
+
+# ======================================================================================================================
+# LoginStormUser: Logs in over and over, as in a burst of logins or a credential-stuffing attack
+class LoginStormUser(TaskApiUser):
+    """
+    Every iteration runs the password hasher on the server (a JWT login, and a wrong password one time out of four).
+    Not part of the default mix: run_headless.py --login-storm starts these users halfway through the run.
+    """
+
+    weight = 1
+    wait_time = constant(0)
+
+    def on_start(self):
+        self.email, self.password = get_account_pool().pick()
+
+    @task(3)
+    def login_storm(self):
+        with self.client.post(
+            TOKEN_CREATE, json={"email": self.email, "password": self.password}, name="jwt create (storm)",
+            catch_response=True,
+        ) as response:
+            if response.status_code == 503:
+                response.success()  # Shed by the hashing service: what it is for
+
+    @task(1)
+    def wrong_password(self):
+        with self.client.post(
+            TOKEN_CREATE, json={"email": self.email, "password": "wrong"}, name="jwt create (wrong password)",
+            catch_response=True,
+        ) as response:
+            if response.status_code in (401, 503):
+                response.success()
+
+
+# ======================================================================================================================